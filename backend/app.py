@@ -3,12 +3,57 @@
 # -----------------------------------------------------------------------------
 # Main backend execution entry point; initializes websocket server defined in
 # websocket_server.py 
+#
+# Model registry options (command line, or environment variables for the
+# bundled binary spawned by Electron):
+#   --model-memory-mb / IDS_MODEL_MEMORY_MB   memory budget for loaded models
+#   --model-mmap / IDS_MODEL_MMAP             joblib mmap mode: none, r, r+ or c
 # -----------------------------------------------------------------------------
 
+import argparse
+import multiprocessing
+import os
+
 from websocket_server import app, socketio
+from src.ml_pipeline.model_registry import registry as model_registry, DEFAULT_MEMORY_BUDGET_MB
+
+MMAP_MODES = ("none", "r", "r+", "c")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="IDS backend websocket server")
+    parser.add_argument(
+        "--model-memory-mb", type=float,
+        default=os.environ.get("IDS_MODEL_MEMORY_MB", DEFAULT_MEMORY_BUDGET_MB),
+        help="Approximate memory budget for loaded models; unused models are evicted beyond it"
+    )
+    parser.add_argument(
+        "--model-mmap",
+        default=os.environ.get("IDS_MODEL_MMAP", "none"),
+        help="joblib mmap mode for model artifacts (none, r, r+ or c)"
+    )
+    # Ignore arguments added by the Electron/PyInstaller launcher
+    args, _ = parser.parse_known_args(argv)
+
+    if args.model_memory_mb <= 0:
+        parser.error("--model-memory-mb must be positive")
+    if args.model_mmap not in MMAP_MODES:
+        parser.error(f"--model-mmap must be one of {MMAP_MODES}")
+    return args
 
 def main():
+    args = parse_args()
     print("Starting IDS backend...")
+
+    # Apply the model memory budget and loading mode before anything is loaded
+    model_registry.configure(
+        memory_budget_mb=args.model_memory_mb,
+        mmap_mode="" if args.model_mmap == "none" else args.model_mmap
+    )
+    print(f"Model memory budget: {args.model_memory_mb:g} MB, mmap mode: {args.model_mmap}")
+
+    # Warm up the default model in the background so the first scan does
+    # not wait on joblib.load
+    model_registry.preload_async()
     
     # Start WebSocket server
     socketio.run(
@@ -19,4 +64,6 @@ def main():
     )
 
 if __name__ == "__main__":
+    # Required for inference worker processes in the PyInstaller bundle
+    multiprocessing.freeze_support()
     main()
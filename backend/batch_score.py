@@ -0,0 +1,97 @@
+# ids-project/backend/batch_score.py
+
+# -----------------------------------------------------------------------------
+# Command line entry point for headless bulk scoring of CIC-IDS-2017 CSV files
+# (same code path as start_scan with mode "batch", without the websocket
+# server). Prints throughput, the confusion matrix and per-class metrics, and
+# writes the summary JSON (and optionally the predictions CSV) to logs/.
+#
+# Run from backend/:
+#   python batch_score.py path/to/day.csv
+#   python batch_score.py path/to/day.csv --model "Logistic Regression" --predictions
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+
+from src.ml_pipeline.model_registry import registry as model_registry, resolve_model_name, DEFAULT_MODEL, MODEL_PATHS
+from src.services.batch_scoring import run_batch_scoring, DEFAULT_BATCH_CHUNK_ROWS
+from src.services.scan_log import LOG_DIR
+
+
+def print_summary(summary):
+    print(f"\nScored {summary['total_flows']} flows ({summary['skipped_non_finite']} skipped, non-finite features) "
+          f"in {summary['duration_seconds']}s: {summary['throughput_flows_per_second']:.0f} flows/s")
+    timing = summary["timing"]
+    print(f"  read {timing['read_seconds']}s, score {timing['score_seconds']}s, write {timing['write_seconds']}s")
+
+    metrics = summary["metrics"]
+    if not metrics["total"]:
+        return
+
+    labels = metrics["labels"]
+    width = max(len("weighted_avg"), max(len(label) for label in labels)) + 1
+    print(f"\nAccuracy: {metrics['accuracy'] * 100:.2f}% ({metrics['correct']}/{metrics['total']})")
+    print("\nConfusion matrix (rows = true, columns = predicted):")
+    print(" " * width + "".join(f"{label[:width - 1]:>{width}}" for label in labels))
+    for label, row in zip(labels, metrics["confusion_matrix"]):
+        print(f"{label[:width - 1]:<{width}}" + "".join(f"{count:>{width}}" for count in row))
+
+    print(f"\n{'class':<{width}} {'precision':>10} {'recall':>10} {'f1':>10} {'support':>10}")
+    for label, stats in metrics["per_class"].items():
+        print(f"{label[:width - 1]:<{width}} {stats['precision']:>10.4f} {stats['recall']:>10.4f} "
+              f"{stats['f1']:>10.4f} {stats['support']:>10}")
+    for name in ("macro_avg", "weighted_avg"):
+        stats = metrics[name]
+        print(f"{name:<{width}} {stats['precision']:>10.4f} {stats['recall']:>10.4f} {stats['f1']:>10.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a whole CIC-IDS-2017 CSV file in bulk")
+    parser.add_argument("csv_path")
+    parser.add_argument("--model", default=DEFAULT_MODEL, choices=list(MODEL_PATHS))
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_BATCH_CHUNK_ROWS,
+                        help="CSV rows parsed and scored per call")
+    parser.add_argument("--max-flows", type=int, default=None)
+    parser.add_argument("--start-row", type=int, default=None)
+    parser.add_argument("--end-row", type=int, default=None)
+    parser.add_argument("--compiled", action="store_true", help="Use the compiled NumPy scorer")
+    parser.add_argument("--predictions", nargs="?", const=True, default=None,
+                        help="Write a predictions CSV (optionally to the given path)")
+    parser.add_argument("--output-dir", default=LOG_DIR)
+    args = parser.parse_args(argv)
+
+    params = {
+        "mode": "batch",
+        "csv_path": args.csv_path,
+        "model": args.model,
+        "chunk_rows": args.chunk_rows,
+        "max_flows": args.max_flows,
+        "start_row": args.start_row,
+        "end_row": args.end_row,
+        "compiled": args.compiled,
+        "write_predictions": args.predictions is True
+    }
+    predictions_path = args.predictions if isinstance(args.predictions, str) else None
+
+    model_name = resolve_model_name(args.model)
+    preprocessor = model_registry.get_preprocessor()
+    model = model_registry.acquire(model_name)
+    try:
+        summary = run_batch_scoring(params, preprocessor, model,
+                                    output_dir=args.output_dir, predictions_path=predictions_path)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Batch scoring failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        model_registry.release(model_name)
+
+    print_summary(summary)
+    print(f"\nSummary written to {summary['summary_path']}")
+    if summary["predictions_path"]:
+        print(f"Predictions written to {summary['predictions_path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# ids-project/backend/benchmarks/bench_forest.py
+
+# -----------------------------------------------------------------------------
+# Benchmarks the flattened-array random forest engine (forest_engine.FlatForest)
+# against the sklearn path used by ModelInference.predict_with_confidence()
+# (predict + predict_proba), and checks that both give identical outputs.
+#
+# Run from backend/:
+#   python -m benchmarks.bench_forest
+#   python -m benchmarks.bench_forest --csv path/to/replay.csv --rows 50000
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.ml_pipeline.feature_mapping import DATASET_FEATURES
+from src.ml_pipeline.flow_replay import iter_csv_chunks
+from src.ml_pipeline.forest_engine import FlatForest
+
+
+def _load_features(csv_path, rows, scaler):
+    """Raw feature matrix from a replay CSV, or synthetic rows around the scaler's mean."""
+    if csv_path:
+        chunks = [
+            chunk.reindex(columns=DATASET_FEATURES, fill_value=0).to_numpy(dtype=np.float64)
+            for chunk in iter_csv_chunks(csv_path, None, None, rows, 65536)
+        ]
+        X = np.vstack(chunks)
+        return X[np.isfinite(X).all(axis=1)]
+
+    rng = np.random.default_rng(0)
+    mean = getattr(scaler, "mean_", np.zeros(len(DATASET_FEATURES)))
+    scale = getattr(scaler, "scale_", np.ones(len(DATASET_FEATURES)))
+    return rng.normal(mean, scale, size=(rows, len(DATASET_FEATURES)))
+
+
+def _sklearn_path(model, X):
+    preds = model.predict(X)
+    confidences = np.max(model.predict_proba(X), axis=1)
+    return preds, confidences
+
+
+def _flat_path(forest, X):
+    indices, proba = forest.predict_with_confidence(X)
+    return forest.classes_[indices], proba.max(axis=1)
+
+
+def _throughput(fn, X, batch_size, min_seconds=1.0):
+    """Flows/sec of fn over X split into batch_size batches (repeated for min_seconds)."""
+    flows = 0
+    start = time.perf_counter()
+    while True:
+        for i in range(0, X.shape[0], batch_size):
+            fn(X[i:i + batch_size])
+            flows += min(batch_size, X.shape[0] - i)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return flows / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FlatForest against sklearn's random forest")
+    parser.add_argument("--model", default="models/rf_model.joblib")
+    parser.add_argument("--scaler", default="models/scaler.joblib")
+    parser.add_argument("--csv", default=None, help="Replay CSV to score (default: synthetic rows)")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-sizes", default="1,64,1024")
+    args = parser.parse_args(argv)
+
+    # Raw arrays are passed to sklearn on purpose; silence the feature-name warning
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    model = joblib.load(args.model)
+    scaler = joblib.load(args.scaler)
+
+    start = time.perf_counter()
+    forest = FlatForest(model)
+    print(f"Exported {forest.n_trees} trees ({forest.feature.shape[0]} nodes) in {time.perf_counter() - start:.3f}s")
+
+    X = scaler.transform(pd.DataFrame(_load_features(args.csv, args.rows, scaler), columns=DATASET_FEATURES))
+    print(f"Scoring {X.shape[0]} flows")
+
+    ref_preds, ref_conf = _sklearn_path(model, X)
+    preds, conf = _flat_path(forest, X)
+    labels_match = bool(np.array_equal(ref_preds, preds))
+    conf_match = bool(np.array_equal(ref_conf, conf))
+    print(f"Labels identical: {labels_match}  Confidences identical: {conf_match}")
+
+    print(f"{'batch':>7} {'sklearn flows/s':>17} {'flat flows/s':>14} {'speedup':>8}")
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        sk = _throughput(lambda batch: _sklearn_path(model, batch), X, batch_size)
+        flat = _throughput(lambda batch: _flat_path(forest, batch), X, batch_size)
+        print(f"{batch_size:>7} {sk:>17.0f} {flat:>14.0f} {flat / sk:>7.1f}x")
+
+    return 0 if labels_match and conf_match else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+# ids-project/backend/benchmarks/bench_pipeline.py
+
+# -----------------------------------------------------------------------------
+# Offline throughput/latency benchmark of the replay ML pipeline:
+# replay_from_csv -> map_features -> Preprocessor -> model, for each of the
+# models in models/*.joblib, in process (no websocket server, no replay delay).
+#
+# Synthetic CIC-IDS-2017-shaped CSVs (DATASET_FEATURES + Label + flow identity
+# columns) are generated once per size into benchmarks/data/. Every model runs
+# in a fresh process so its load time and peak RSS are not affected by the
+# models benchmarked before it. Results (flows/sec, per-stage p50/p99 latency,
+# peak RSS, load times) are printed and saved as JSON; --compare prints the
+# flows/sec change against an earlier results file.
+#
+# Run from backend/:
+#   python -m benchmarks.bench_pipeline
+#   python -m benchmarks.bench_pipeline --sizes 1000,10000 --models "Random Forest"
+#   python -m benchmarks.bench_pipeline --batch-size 64 --compare benchmarks/results/old.json
+# -----------------------------------------------------------------------------
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import psutil
+
+from src.ml_pipeline.feature_mapping import DATASET_FEATURES, map_features, map_features_batch
+from src.ml_pipeline.flow_replay import replay_from_csv
+from src.ml_pipeline.model_inference import ModelInference
+from src.ml_pipeline.model_registry import MODEL_PATHS, SCALER_PATH, ENCODER_PATH
+from src.ml_pipeline.preprocessor import Preprocessor
+from src.services.latency_stats import StageLatencies
+from src.services.resource_sampler import ResourceSampler
+
+DATA_DIR = os.path.join("benchmarks", "data")
+RESULTS_DIR = os.path.join("benchmarks", "results")
+DEFAULT_SIZES = "1000,10000"
+
+STAGES = ("replay", "feature_mapping", "preprocessor", "model_inference", "total")
+
+# Synthetic label mix (roughly the CIC-IDS-2017 weekday files) and the factor
+# each attack class scales the benign feature distribution by
+_LABEL_MIX = {"BENIGN": 0.75, "DDoS": 0.12, "PortScan": 0.08, "DoS Hulk": 0.05}
+_LABEL_SCALE = {"BENIGN": 1.0, "DDoS": 3.0, "PortScan": 0.2, "DoS Hulk": 5.0}
+
+
+def generate_csv(path, rows, seed=0):
+    """
+    Writes a synthetic CIC-IDS-2017-shaped CSV: non-negative, heavy-tailed
+    feature values whose scale depends on the label, plus the flow identity
+    columns. Column names carry the leading space the CIC files have.
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.array(list(_LABEL_MIX))
+    y = rng.choice(len(labels), size=rows, p=list(_LABEL_MIX.values()))
+    scale = np.array([_LABEL_SCALE[label] for label in labels])[y]
+
+    features = rng.lognormal(mean=4.0, sigma=2.0, size=(rows, len(DATASET_FEATURES))) * scale[:, None]
+    df = pd.DataFrame(np.round(features, 3), columns=DATASET_FEATURES)
+    df["Destination Port"] = rng.choice([22, 53, 80, 443, 8080], size=rows)
+
+    df.insert(0, "Flow ID", [f"bench-{i}" for i in range(rows)])
+    df.insert(1, "Source IP", [f"10.0.{(i >> 8) & 255}.{i & 255}" for i in range(rows)])
+    df.insert(2, "Source Port", rng.integers(1024, 65535, size=rows))
+    df.insert(3, "Destination IP", "192.168.10.50")
+    df.insert(4, "Protocol", 6)
+    df.insert(5, "Timestamp", "7/7/2017 3:30")
+    df["Label"] = labels[y]
+
+    df.columns = [name if name == "Flow ID" else f" {name}" for name in df.columns]
+    df.to_csv(path, index=False)
+
+
+def _dataset(rows, data_dir):
+    """Path of the synthetic CSV with rows rows, generating it if needed."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic_{rows}.csv")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        generate_csv(path, rows)
+        print(f"Generated {path} in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def _run_once(csv_path, preprocessor, model, batch_size, latencies):
+    """Replays csv_path through the pipeline once. Returns (flows, seconds)."""
+    replay = latencies["replay"]
+    mapping = latencies["feature_mapping"]
+    scaling = latencies["preprocessor"]
+    inference = latencies["model_inference"]
+    total = latencies["total"]
+
+    flows = 0
+    source = iter(replay_from_csv(csv_path, delay_ms=0))
+    start = time.perf_counter()
+    while True:
+        # Pull up to batch_size flows (one per step at batch_size 1)
+        t0 = time.perf_counter_ns()
+        batch = []
+        for flow in source:
+            batch.append(flow)
+            if len(batch) >= batch_size:
+                break
+        if not batch:
+            break
+        t1 = time.perf_counter_ns()
+
+        if batch_size == 1:
+            df = map_features(batch[0])
+        else:
+            df = pd.DataFrame(map_features_batch(batch), columns=DATASET_FEATURES, copy=False)
+        t2 = time.perf_counter_ns()
+        scaled = preprocessor.transform(df)
+        t3 = time.perf_counter_ns()
+        model.score(scaled)
+        t4 = time.perf_counter_ns()
+
+        replay.record(t1 - t0)
+        mapping.record(t2 - t1)
+        scaling.record(t3 - t2)
+        inference.record(t4 - t3)
+        total.record(t4 - t0)
+        flows += len(batch)
+
+    return flows, time.perf_counter() - start
+
+
+def bench_model(model_name, datasets, batch_size, repeat):
+    """
+    Benchmarks one model on every dataset. Runs in its own process.
+
+    Returns:
+        Result dict for the model (load times, peak RSS and one run per dataset).
+    """
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+    process = psutil.Process()
+    sampler = ResourceSampler(interval_ms=50).start()
+    rss_start = process.memory_info().rss
+
+    start = time.perf_counter()
+    preprocessor = Preprocessor.from_scaler(joblib.load(SCALER_PATH))
+    scaler_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = ModelInference.from_artifacts(joblib.load(MODEL_PATHS[model_name]), joblib.load(ENCODER_PATH))
+    model_seconds = time.perf_counter() - start
+    rss_loaded = process.memory_info().rss
+
+    runs = []
+    for rows, csv_path in datasets:
+        best = None
+        for _ in range(max(1, repeat)):
+            latencies = StageLatencies(STAGES)
+            flows, seconds = _run_once(csv_path, preprocessor, model, batch_size, latencies)
+            if best is None or seconds < best[1]:
+                best = (flows, seconds, latencies)
+
+        flows, seconds, latencies = best
+        runs.append({
+            "rows": rows,
+            "flows": flows,
+            "seconds": round(seconds, 4),
+            "flows_per_second": round(flows / seconds, 1) if seconds > 0 else 0.0,
+            "stages": {
+                name: {key: stats[key] for key in ("count", "mean_us", "p50_us", "p99_us", "max_us")}
+                for name, stats in latencies.to_dict().items()
+            },
+            "peak_rss_mb": round(sampler.snapshot.rss_peak_bytes / 2**20, 1)
+        })
+
+    sampler.stop()
+    return {
+        "model": model_name,
+        "scaler_load_seconds": round(scaler_seconds, 4),
+        "model_load_seconds": round(model_seconds, 4),
+        "scoring_method": model.scoring_method,
+        "rss_start_mb": round(rss_start / 2**20, 1),
+        "rss_after_load_mb": round(rss_loaded / 2**20, 1),
+        "peak_rss_mb": round(sampler.snapshot.rss_peak_bytes / 2**20, 1),
+        "runs": runs
+    }
+
+
+def _print_results(results):
+    print(f"\n{'model':<24} {'rows':>8} {'flows/s':>10} {'p50 us':>9} {'p99 us':>9} "
+          f"{'load s':>7} {'peak MB':>8}")
+    for result in results:
+        for run in result["runs"]:
+            total = run["stages"]["total"]
+            print(f"{result['model']:<24} {run['rows']:>8} {run['flows_per_second']:>10.0f} "
+                  f"{total['p50_us']:>9.1f} {total['p99_us']:>9.1f} "
+                  f"{result['model_load_seconds']:>7.3f} {run['peak_rss_mb']:>8.1f}")
+
+    print(f"\n{'model':<24} {'rows':>8} " + " ".join(f"{stage[:15]:>15}" for stage in STAGES[:-1]))
+    for result in results:
+        for run in result["runs"]:
+            cells = [f"{run['stages'][stage]['p50_us']:.1f}/{run['stages'][stage]['p99_us']:.1f}" for stage in STAGES[:-1]]
+            print(f"{result['model']:<24} {run['rows']:>8} " + " ".join(f"{cell:>15}" for cell in cells))
+    print("(per-stage cells are p50/p99 in microseconds)")
+
+
+def _compare(results, baseline_path):
+    """Prints the flows/sec change of each (model, rows) run against a baseline results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {
+        (result["model"], run["rows"]): run["flows_per_second"]
+        for result in baseline.get("results", [])
+        for run in result["runs"]
+    }
+
+    print(f"\nCompared to {baseline_path}:")
+    for result in results:
+        for run in result["runs"]:
+            before = previous.get((result["model"], run["rows"]))
+            if not before:
+                continue
+            change = (run["flows_per_second"] - before) / before * 100.0
+            print(f"{result['model']:<24} {run['rows']:>8} {before:>10.0f} -> {run['flows_per_second']:>10.0f} "
+                  f"({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the replay ML pipeline for each model")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Synthetic CSV sizes in rows")
+    parser.add_argument("--models", default=",".join(MODEL_PATHS), help="Comma-separated model names")
+    parser.add_argument("--batch-size", type=int, default=1, help="Flows per map/scale/predict call")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per dataset (the fastest is kept)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output", default=None, help="Results JSON path (default: benchmarks/results/)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare flows/sec against")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    models = [name.strip() for name in args.models.split(",")]
+    unknown = [name for name in models if name not in MODEL_PATHS]
+    if unknown:
+        parser.error(f"unknown model(s) {unknown}; choose from {list(MODEL_PATHS)}")
+
+    datasets = [(rows, _dataset(rows, args.data_dir)) for rows in sizes]
+
+    results = []
+    ctx = multiprocessing.get_context("spawn")
+    for model_name in models:
+        print(f"Benchmarking {model_name}...", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+            results.append(executor.submit(bench_model, model_name, datasets, max(1, args.batch_size), args.repeat).result())
+
+    report = {
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "batch_size": max(1, args.batch_size),
+        "repeat": args.repeat,
+        "datasets": [{"rows": rows, "path": path} for rows, path in datasets],
+        "results": results
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench_pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    _print_results(results)
+    if args.compare:
+        _compare(results, args.compare)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
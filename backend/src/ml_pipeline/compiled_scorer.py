@@ -0,0 +1,250 @@
+# -----------------------------------------------------------------------------
+# Defines a "compiled" scorer that fuses the Preprocessor's scaler and the
+# selected model into a single NumPy scoring function operating on raw
+# (unscaled) float feature arrays, skipping DataFrame construction and
+# sklearn's per-call input validation.
+#
+# - Linear models (LogisticRegression, LinearSVC): the scaler is folded into
+#   the weights, so scoring is one matrix product.
+# - MLPClassifier: scaling plus a NumPy forward pass.
+# - RandomForestClassifier: scaling plus the flattened-array FlatForest engine.
+# - Anything else: NumPy scaling, then the model's own predict path.
+#
+# verify() checks the compiled outputs against the reference
+# Preprocessor + ModelInference path.
+# -----------------------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from sklearn.svm import LinearSVC
+
+from src.ml_pipeline.feature_mapping import DATASET_FEATURES
+from src.ml_pipeline.forest_engine import FlatForest
+from src.ml_pipeline.model_inference import decision_to_proba
+
+# Maximum absolute confidence difference tolerated by verify()
+VERIFY_TOLERANCE = 1e-6
+
+_ACTIVATIONS = {
+    "identity": lambda a: a,
+    "relu": lambda a: np.maximum(a, 0, out=a),
+    "tanh": lambda a: np.tanh(a, out=a),
+    "logistic": lambda a: expit(a, out=a)
+}
+
+
+def _softmax(a):
+    a = a - a.max(axis=1, keepdims=True)
+    np.exp(a, out=a)
+    a /= a.sum(axis=1, keepdims=True)
+    return a
+
+
+class CompiledScorer:
+    """
+    Fused scaler + model scoring function for raw feature matrices.
+
+    Args:
+        preprocessor: Loaded Preprocessor (its scaler is folded in where possible).
+        model_inference: Loaded ModelInference (model and label encoder).
+    """
+
+    def __init__(self, preprocessor, model_inference):
+        self.preprocessor = preprocessor
+        self.model_inference = model_inference
+        self.model = model_inference.model
+        self.encoder = model_inference.encoder
+
+        self._affine = self._scaler_affine(preprocessor.scaler)
+
+        # Map model output indices straight to label strings when the model
+        # was trained on label-encoded integer classes
+        classes = getattr(self.model, "classes_", None)
+        self._labels = None
+        if classes is not None and np.issubdtype(np.asarray(classes).dtype, np.integer):
+            self._labels = np.asarray(self.encoder.classes_)[classes]
+
+        if self._labels is not None and self._affine is not None and isinstance(self.model, (LogisticRegression, LinearSVC)):
+            self.kind = "linear"
+            self._compile_linear()
+        elif self._labels is not None and isinstance(self.model, MLPClassifier):
+            self.kind = "mlp"
+        elif self._labels is not None and isinstance(self.model, RandomForestClassifier) and self.model.n_outputs_ == 1:
+            self.kind = "forest"
+            self._forest = FlatForest(self.model)
+        else:
+            self.kind = "generic"
+
+    # -- scaling ---------------------------------------------------------------
+
+    @staticmethod
+    def _scaler_affine(scaler):
+        """Returns (multiplier, offset) with scaled = X * multiplier + offset, or None."""
+        n = len(DATASET_FEATURES)
+        if isinstance(scaler, StandardScaler):
+            scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n)
+            mean = scaler.mean_ if scaler.mean_ is not None and scaler.with_mean else np.zeros(n)
+            return 1.0 / scale, -mean / scale
+        if isinstance(scaler, MinMaxScaler) and not scaler.clip:
+            return scaler.scale_, scaler.min_
+        return None
+
+    def _scale(self, X):
+        """Applies the scaler exactly as scaler.transform() would, without validation."""
+        scaler = self.preprocessor.scaler
+        if isinstance(scaler, StandardScaler):
+            X = np.array(X, dtype=np.float64)
+            if scaler.with_mean:
+                X -= scaler.mean_
+            if scaler.with_std:
+                X /= scaler.scale_
+            return X
+        if isinstance(scaler, MinMaxScaler) and not scaler.clip:
+            X = np.array(X, dtype=np.float64)
+            X *= scaler.scale_
+            X += scaler.min_
+            return X
+        return scaler.transform(pd.DataFrame(X, columns=DATASET_FEATURES))
+
+    # -- linear models -------------------------------------------------------
+
+    def _compile_linear(self):
+        multiplier, offset = self._affine
+        coef = np.atleast_2d(self.model.coef_)
+        self._weights = np.ascontiguousarray((coef * multiplier).T)
+        self._bias = self.model.intercept_ + coef @ offset
+
+        self._proba = None
+        if isinstance(self.model, LogisticRegression):
+            multi_class = getattr(self.model, "multi_class", "auto")
+            ovr = multi_class == "ovr" or (
+                multi_class in ("auto", "deprecated")
+                and (len(self.model.classes_) <= 2 or self.model.solver == "liblinear")
+            )
+            self._proba = "ovr" if ovr else "softmax"
+
+    def _score_linear(self, X):
+        decision = X @ self._weights + self._bias
+        if decision.shape[1] == 1:
+            decision = decision.ravel()
+            indices = (decision > 0).astype(np.intp)
+        else:
+            indices = decision.argmax(axis=1)
+
+        if self._proba is None:
+            # Same uncalibrated mapping as ModelInference.score()
+            return indices, decision_to_proba(decision)
+
+        if self._proba == "ovr":
+            prob = expit(decision)
+            if prob.ndim == 1:
+                prob = np.vstack([1 - prob, prob]).T
+            else:
+                prob /= prob.sum(axis=1, keepdims=True)
+        else:
+            if decision.ndim == 1:
+                decision = np.c_[-decision, decision]
+            prob = _softmax(decision)
+        return indices, prob
+
+    # -- MLP -----------------------------------------------------------------
+
+    def _score_mlp(self, X):
+        model = self.model
+        activation = self._scale(X)
+        hidden = _ACTIVATIONS[model.activation]
+        last = len(model.coefs_) - 1
+
+        for i, (weights, bias) in enumerate(zip(model.coefs_, model.intercepts_)):
+            activation = activation @ weights
+            activation += bias
+            if i != last:
+                hidden(activation)
+
+        if model.out_activation_ == "softmax":
+            prob = _softmax(activation)
+            return prob.argmax(axis=1), prob
+
+        activation = _ACTIVATIONS[model.out_activation_](activation)
+        if model.n_outputs_ == 1:
+            positive = activation.ravel()
+            return (positive > 0.5).astype(np.intp), np.vstack([1 - positive, positive]).T
+
+        # Multilabel MLPs are not fused
+        return None
+
+    # -- public API ----------------------------------------------------------
+
+    def score(self, X):
+        """
+        Scores a raw (unscaled) feature matrix in a single pass.
+        Args:
+            X: (n_flows, len(DATASET_FEATURES)) float array in DATASET_FEATURES order.
+        Returns:
+            A tuple of (labels, confidences, probabilities), matching ModelInference.score().
+        """
+        X = np.asarray(X, dtype=np.float64)
+        result = None
+
+        if self.kind == "linear":
+            result = self._score_linear(X)
+        elif self.kind == "mlp":
+            result = self._score_mlp(X)
+        elif self.kind == "forest":
+            result = self._forest.predict_with_confidence(self._scale(X))
+
+        if result is None:
+            scaled = pd.DataFrame(self._scale(X), columns=DATASET_FEATURES, copy=False)
+            return self.model_inference.score(scaled)
+
+        indices, prob = result
+        labels = self._labels[indices]
+        confidences = prob[np.arange(len(indices)), indices]
+        return labels, confidences, prob
+
+    def predict_with_confidence(self, X):
+        """
+        Scores a raw (unscaled) feature matrix.
+        Args:
+            X: (n_flows, len(DATASET_FEATURES)) float array in DATASET_FEATURES order.
+        Returns:
+            A tuple of (labels, confidences), matching ModelInference.predict_with_confidence().
+        """
+        labels, confidences, _ = self.score(X)
+        return labels, confidences
+
+    def verify(self, X, tolerance=VERIFY_TOLERANCE) -> dict:
+        """
+        Compares the compiled outputs with the reference Preprocessor +
+        ModelInference path on the same raw feature matrix.
+        Args:
+            X: Raw feature matrix (e.g. the first batch of a replay CSV).
+            tolerance: Maximum allowed absolute confidence difference.
+        Returns:
+            Dict with flow count, label agreement, max confidence difference and
+            an overall "match" flag.
+        """
+        df = pd.DataFrame(X, columns=DATASET_FEATURES)
+        ref_labels, ref_conf, _ = self.model_inference.score(self.preprocessor.transform(df))
+        labels, conf, _ = self.score(X)
+
+        agreement = float(np.mean(np.asarray(ref_labels) == np.asarray(labels))) if len(labels) else 1.0
+
+        max_diff = 0.0
+        if len(conf) and ref_conf[0] is not None and conf[0] is not None:
+            max_diff = float(np.max(np.abs(ref_conf.astype(np.float64) - conf.astype(np.float64))))
+        elif len(conf) and (ref_conf[0] is None) != (conf[0] is None):
+            max_diff = float("inf")
+
+        return {
+            "kind": self.kind,
+            "flows": int(len(labels)),
+            "label_agreement": agreement,
+            "max_confidence_diff": max_diff,
+            "match": agreement == 1.0 and max_diff <= tolerance
+        }
@@ -0,0 +1,147 @@
+# backend/src/ml_pipeline/csv_index.py
+
+# -----------------------------------------------------------------------------
+# Builds and persists a sidecar byte-offset index for replay CSV files so that
+# row ranges (start_row/end_row) can be read by seeking straight to a nearby
+# row instead of tokenizing every skipped line.
+# The index samples the byte offset of every K-th data row and is stored next
+# to the CSV as <csv>.rowidx.json, keyed by path, size and mtime.
+# -----------------------------------------------------------------------------
+
+import json
+import os
+import threading
+from typing import Optional, Tuple
+
+INDEX_SUFFIX = ".rowidx.json"
+INDEX_VERSION = 1
+DEFAULT_INDEX_STRIDE = 1000  # Sample every K-th row
+
+# Indexes that could not be written next to their CSV (e.g. read-only
+# directory) are kept here for the lifetime of the process.
+_memory_indexes = {}
+# One lock per CSV path, so building the index of one file never blocks
+# sessions replaying another; _index_lock only guards the lock table
+_path_locks = {}
+_index_lock = threading.Lock()
+
+
+def _file_key(csv_path) -> dict:
+    """Identity of a CSV file used to detect stale indexes."""
+    stat = os.stat(csv_path)
+    return {
+        "path": os.path.abspath(csv_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    }
+
+
+def _index_path(csv_path) -> str:
+    return csv_path + INDEX_SUFFIX
+
+
+def _is_valid(index, key, stride) -> bool:
+    return (
+        index is not None
+        and index.get("version") == INDEX_VERSION
+        and index.get("stride") == stride
+        and all(index.get(k) == v for k, v in key.items())
+    )
+
+
+def _path_lock(path) -> threading.Lock:
+    with _index_lock:
+        lock = _path_locks.get(path)
+        if lock is None:
+            lock = _path_locks[path] = threading.Lock()
+        return lock
+
+
+def build_index(csv_path, stride=DEFAULT_INDEX_STRIDE) -> dict:
+    """
+    Scans a CSV file once and records the byte offset of every stride-th data row.
+
+    Args:
+        csv_path: Path to the CSV file.
+        stride: Row sampling interval K.
+
+    Returns:
+        Index dict with the file key, stride, row count and sampled offsets.
+    """
+    offsets = []
+    num_rows = 0
+
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        position = len(header)
+        for line in f:
+            if num_rows % stride == 0:
+                offsets.append(position)
+            position += len(line)
+            num_rows += 1
+
+    index = {"version": INDEX_VERSION, "stride": stride, "num_rows": num_rows, "offsets": offsets}
+    index.update(_file_key(csv_path))
+    return index
+
+
+def load_or_build_index(csv_path, stride=DEFAULT_INDEX_STRIDE) -> dict:
+    """
+    Returns the row-offset index for csv_path, building and persisting it the
+    first time the file is opened (or after the file has changed).
+
+    Args:
+        csv_path: Path to the CSV file.
+        stride: Row sampling interval K.
+
+    Returns:
+        Index dict (see build_index()).
+    """
+    key = _file_key(csv_path)
+    index_path = _index_path(csv_path)
+
+    with _path_lock(key["path"]):
+        index = _memory_indexes.get(key["path"])
+        if _is_valid(index, key, stride):
+            return index
+
+        try:
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            if _is_valid(index, key, stride):
+                return index
+        except (OSError, ValueError):
+            pass
+
+        print(f"Building row-offset index for {csv_path} (every {stride} rows)...")
+        index = build_index(csv_path, stride)
+
+        try:
+            tmp_path = index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, index_path)
+            print(f"Row-offset index saved to: {index_path}")
+        except OSError as e:
+            print(f"Could not persist row-offset index ({e}); keeping it in memory.")
+            _memory_indexes[key["path"]] = index
+
+        return index
+
+
+def locate_row(index, row) -> Optional[Tuple[int, int]]:
+    """
+    Finds where to start reading in order to reach data row `row`.
+
+    Args:
+        index: Index dict from load_or_build_index().
+        row: 0-based data row index (header excluded).
+
+    Returns:
+        (byte_offset, rows_to_skip) where byte_offset is the start of the
+        nearest sampled row at or before `row`, or None if row is past the end.
+    """
+    if row < 0 or row >= index["num_rows"]:
+        return None
+    sample = row // index["stride"]
+    return index["offsets"][sample], row - sample * index["stride"]
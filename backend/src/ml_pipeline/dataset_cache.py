@@ -0,0 +1,398 @@
+# backend/src/ml_pipeline/dataset_cache.py
+
+# -----------------------------------------------------------------------------
+# Optional binary columnar cache for replay CSVs.
+# A CSV is converted once into a directory of raw column files (features as a
+# single (n, len(DATASET_FEATURES)) float64 matrix, Label and other
+# low-cardinality columns dictionary-encoded as int32 codes, near-unique
+# columns such as Flow ID and Timestamp as raw UTF-8 bytes plus int64 row
+# offsets), keyed by the CSV's content hash.
+# Later replays memory-map the cache instead of reparsing the text file, and
+# row ranges are zero-copy slices of the mapped arrays.
+# The cache directory is bounded in size; least recently used entries are
+# evicted first.
+# -----------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.ml_pipeline.feature_mapping import DATASET_FEATURES
+from src.ml_pipeline.flow_replay import FlowBlock, iter_csv_chunks
+
+CACHE_DIR = "cache/replay"
+DEFAULT_CACHE_LIMIT_MB = 4096
+CACHE_VERSION = 2
+DICTIONARY_MAX_VALUES = 65536  # Columns with more distinct values are stored as raw strings
+
+_MANIFEST = "manifest.json"
+_FEATURES_FILE = "features.f64"
+_HASHES_FILE = "hashes.json"
+
+_cache_lock = threading.Lock()
+
+
+def content_hash(csv_path, cache_dir=CACHE_DIR) -> str:
+    """
+    Returns the BLAKE2b content hash of a CSV file. Hashes are memoized in the
+    cache directory by path, size and mtime so unchanged files are only read once.
+    """
+    stat = os.stat(csv_path)
+    memo_key = f"{os.path.abspath(csv_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    memo_path = os.path.join(cache_dir, _HASHES_FILE)
+
+    try:
+        with open(memo_path, "r") as f:
+            memo = json.load(f)
+    except (OSError, ValueError):
+        memo = {}
+
+    if memo_key in memo:
+        return memo[memo_key]
+
+    digest = hashlib.blake2b(digest_size=20)
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(8 * 1024 * 1024), b""):
+            digest.update(block)
+    file_hash = digest.hexdigest()
+
+    memo[memo_key] = file_hash
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(memo_path, "w") as f:
+            json.dump(memo, f)
+    except OSError as e:
+        print(f"Could not save dataset hash memo: {e}")
+
+    return file_hash
+
+
+def _encode_column(values, vocab, lookup) -> np.ndarray:
+    """Dictionary-encodes a column chunk into int32 codes (-1 = missing)."""
+    local_codes, uniques = pd.factorize(values)
+    mapping = np.empty(len(uniques) + 1, dtype=np.int32)
+    mapping[-1] = -1  # factorize marks missing values with -1
+    for i, value in enumerate(uniques):
+        value = str(value)
+        code = lookup.get(value)
+        if code is None:
+            code = len(vocab)
+            lookup[value] = code
+            vocab.append(value)
+        mapping[i] = code
+    return mapping[local_codes]
+
+
+class _StringColumnWriter:
+    """Writes a column as concatenated UTF-8 bytes plus int64 end offsets."""
+
+    def __init__(self, entry_dir, index):
+        self.data_file = open(os.path.join(entry_dir, f"{index}.str"), "wb")
+        self.offsets_file = open(os.path.join(entry_dir, f"{index}.off"), "wb")
+        self.position = 0
+        self.offsets_file.write(np.zeros(1, dtype=np.int64).tobytes())
+
+    def write(self, values):
+        # Missing values are stored as empty strings, which read back as
+        # missing just like empty CSV fields
+        encoded = [b"" if pd.isna(value) else str(value).encode("utf-8") for value in values]
+        ends = self.position + np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)))
+        self.offsets_file.write(ends.tobytes())
+        self.data_file.write(b"".join(encoded))
+        if len(ends):
+            self.position = int(ends[-1])
+
+    def close(self) -> dict:
+        self.data_file.close()
+        self.offsets_file.close()
+        return {
+            "data": os.path.basename(self.data_file.name),
+            "offsets": os.path.basename(self.offsets_file.name)
+        }
+
+
+def _to_string_column(entry_dir, index, handle, vocab, chunk_size) -> _StringColumnWriter:
+    """Rewrites a dictionary-encoded column file that outgrew its vocabulary as raw strings."""
+    handle.close()
+    codes = np.fromfile(handle.name, dtype=np.int32)
+    values = np.array([None] + vocab, dtype=object)
+    writer = _StringColumnWriter(entry_dir, index)
+    for start in range(0, len(codes), chunk_size):
+        writer.write(values[codes[start:start + chunk_size] + 1])
+    os.remove(handle.name)
+    return writer
+
+
+def build_cache(csv_path, entry_dir, chunk_size=65536, dictionary_limit=DICTIONARY_MAX_VALUES) -> dict:
+    """
+    Converts a replay CSV into a binary columnar cache entry.
+
+    Args:
+        csv_path: Path to the CIC-IDS-2017 CSV file.
+        entry_dir: Directory to write the column files and manifest to.
+        chunk_size: Number of CSV rows parsed at a time.
+        dictionary_limit: Distinct values above which a column is stored as
+                          raw strings instead of dictionary codes.
+
+    Returns:
+        The manifest dict describing the entry.
+    """
+    os.makedirs(entry_dir, exist_ok=True)
+
+    num_rows = 0
+    order = []  # Non-feature columns in CSV order
+    vocabs, lookups, handles, strings = {}, {}, {}, {}
+
+    with open(os.path.join(entry_dir, _FEATURES_FILE), "wb") as features_file:
+        for chunk in iter_csv_chunks(csv_path, None, None, None, chunk_size):
+            features = chunk.reindex(columns=DATASET_FEATURES, fill_value=0).to_numpy(dtype=np.float64)
+            features_file.write(np.ascontiguousarray(features).tobytes())
+
+            for col in chunk.columns:
+                if col in DATASET_FEATURES:
+                    continue
+                if col in strings:
+                    strings[col].write(chunk[col].astype(object))
+                    continue
+                if col not in handles:
+                    vocabs[col], lookups[col] = [], {}
+                    handles[col] = open(os.path.join(entry_dir, f"{len(order)}.i32"), "wb")
+                    order.append(col)
+                codes = _encode_column(chunk[col].astype(object), vocabs[col], lookups[col])
+                handles[col].write(codes.tobytes())
+
+                # Near-unique columns (Flow ID, Timestamp) would turn the
+                # vocabulary into a copy of the column; switch to raw strings
+                if len(vocabs[col]) > dictionary_limit:
+                    strings[col] = _to_string_column(entry_dir, order.index(col), handles.pop(col), vocabs.pop(col), chunk_size)
+                    del lookups[col]
+
+            num_rows += len(chunk)
+
+    columns = {}
+    for col in order:
+        if col in strings:
+            columns[col] = strings[col].close()
+        else:
+            handles[col].close()
+            columns[col] = {"file": os.path.basename(handles[col].name), "vocab": vocabs[col]}
+
+    manifest = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(csv_path),
+        "num_rows": num_rows,
+        "features": DATASET_FEATURES,
+        "columns": columns
+    }
+    with open(os.path.join(entry_dir, _MANIFEST), "w") as f:
+        json.dump(manifest, f)
+
+    return manifest
+
+
+def _manifest_version(manifest_path):
+    try:
+        with open(manifest_path, "r") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+def _entry_size(entry_dir) -> int:
+    return sum(
+        os.path.getsize(os.path.join(entry_dir, name))
+        for name in os.listdir(entry_dir)
+    )
+
+
+def _evict(cache_dir, limit_bytes, keep):
+    """Removes least recently used entries until the cache fits limit_bytes."""
+    entries = []
+    for name in os.listdir(cache_dir):
+        entry_dir = os.path.join(cache_dir, name)
+        manifest = os.path.join(entry_dir, _MANIFEST)
+        if os.path.isdir(entry_dir) and os.path.exists(manifest):
+            entries.append((os.path.getmtime(manifest), entry_dir, _entry_size(entry_dir)))
+
+    total = sum(size for _, _, size in entries)
+    for _, entry_dir, size in sorted(entries):
+        if total <= limit_bytes:
+            break
+        if os.path.basename(entry_dir) == keep:
+            continue
+        print(f"Evicting cached dataset: {entry_dir}")
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
+
+
+class CachedDataset:
+    """
+    Memory-mapped view of a cache entry. Slicing never copies feature data.
+    """
+
+    def __init__(self, entry_dir):
+        with open(os.path.join(entry_dir, _MANIFEST), "r") as f:
+            manifest = json.load(f)
+
+        self.entry_dir = entry_dir
+        self.num_rows = manifest["num_rows"]
+        shape = (self.num_rows, len(manifest["features"]))
+
+        # np.memmap cannot map empty files
+        if self.num_rows == 0:
+            self.features = np.zeros(shape, dtype=np.float64)
+        else:
+            self.features = np.memmap(
+                os.path.join(entry_dir, _FEATURES_FILE), dtype=np.float64, mode="r", shape=shape
+            )
+
+        self._columns = list(manifest["columns"])
+        self._codes = {}
+        self._vocabs = {}
+        self._strings = {}
+        for col, meta in manifest["columns"].items():
+            if "vocab" not in meta:
+                offsets = np.memmap(
+                    os.path.join(entry_dir, meta["offsets"]), dtype=np.int64, mode="r", shape=(self.num_rows + 1,)
+                )
+                data = (
+                    np.memmap(os.path.join(entry_dir, meta["data"]), dtype=np.uint8, mode="r")
+                    if offsets[-1] > 0 else np.zeros(0, dtype=np.uint8)
+                )
+                self._strings[col] = (offsets, data)
+                continue
+
+            # Index 0 of each vocabulary array holds the missing-value marker
+            self._vocabs[col] = np.array([None] + meta["vocab"], dtype=object)
+            if self.num_rows == 0:
+                self._codes[col] = np.zeros(0, dtype=np.int32)
+            else:
+                self._codes[col] = np.memmap(
+                    os.path.join(entry_dir, meta["file"]), dtype=np.int32, mode="r", shape=(self.num_rows,)
+                )
+
+    def _string_slice(self, col, start, stop) -> np.ndarray:
+        """Decodes rows [start, stop) of a raw string column."""
+        offsets, data = self._strings[col]
+        ends = offsets[start:stop + 1] - offsets[start]
+        raw = data[offsets[start]:offsets[stop]].tobytes()
+        values = np.empty(stop - start, dtype=object)
+        for i in range(stop - start):
+            values[i] = raw[ends[i]:ends[i + 1]].decode("utf-8") or None
+        return values
+
+    def block(self, start, stop, start_row=0) -> FlowBlock:
+        """Returns rows [start, stop) as a FlowBlock backed by the mapped files."""
+        columns = {}
+        for col in self._columns:
+            if col in self._codes:
+                columns[col] = self._vocabs[col][self._codes[col][start:stop] + 1]
+            else:
+                columns[col] = self._string_slice(col, start, stop)
+        labels = columns.pop("Label", None)
+        return FlowBlock(self.features[start:stop], labels, columns, start_row=start_row)
+
+
+def open_cached_dataset(
+    csv_path,
+    cache_dir=CACHE_DIR,
+    limit_mb=DEFAULT_CACHE_LIMIT_MB
+) -> CachedDataset:
+    """
+    Opens the binary cache entry for csv_path, converting the CSV first if it
+    has not been cached yet. Marks the entry as recently used and enforces the
+    cache size limit.
+
+    Args:
+        csv_path: Path to the CIC-IDS-2017 CSV file.
+        cache_dir: Root directory of the dataset cache.
+        limit_mb: Maximum total size of the cache in megabytes.
+
+    Returns:
+        A CachedDataset memory-mapping the entry.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+
+    with _cache_lock:
+        os.makedirs(cache_dir, exist_ok=True)
+        file_hash = content_hash(csv_path, cache_dir)
+        entry_dir = os.path.join(cache_dir, file_hash)
+        manifest_path = os.path.join(entry_dir, _MANIFEST)
+
+        if os.path.exists(manifest_path) and _manifest_version(manifest_path) != CACHE_VERSION:
+            print(f"Discarding cached dataset from an older cache version: {entry_dir}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+        if os.path.exists(manifest_path):
+            print(f"Using cached dataset: {entry_dir}")
+        else:
+            print(f"Converting {csv_path} to binary dataset cache...")
+            start = time.time()
+            tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            try:
+                build_cache(csv_path, tmp_dir)
+                os.replace(tmp_dir, entry_dir)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            print(f"Dataset cache built in {time.time() - start:.2f}s: {entry_dir}")
+
+        # Touch the manifest so eviction treats this entry as most recently used
+        os.utime(manifest_path)
+        _evict(cache_dir, limit_mb * 1024 * 1024, keep=file_hash)
+
+        return CachedDataset(entry_dir)
+
+
+def replay_blocks_from_cache(
+    csv_path: str,
+    block_size: int = 1024,
+    delay_ms: int = 0,
+    max_flows: Optional[int] = None,
+    start_row: Optional[int] = None,
+    end_row: Optional[int] = None,
+    limit_mb: int = DEFAULT_CACHE_LIMIT_MB
+) -> Iterator[FlowBlock]:
+    """
+    Columnar replay backed by the binary dataset cache. Same arguments and
+    output as flow_replay.replay_blocks_from_csv().
+
+    Yields:
+        FlowBlock objects whose feature arrays are slices of the mapped cache.
+    """
+    dataset = open_cached_dataset(csv_path, limit_mb=limit_mb)
+
+    # Row range takes precedence over max_flows
+    if start_row is not None and end_row is not None:
+        first = min(max(start_row, 0), dataset.num_rows)
+        last = min(max(end_row, first), dataset.num_rows)
+        print(f"Replaying cached rows {first} to {last-1} ({last - first} rows)...")
+    else:
+        first = 0
+        last = min(max_flows, dataset.num_rows) if max_flows else dataset.num_rows
+        print(f"Replaying {last} cached flows...")
+
+    flow_count = 0
+    delay_seconds = delay_ms / 1000.0
+    block_size = max(1, block_size)
+
+    for start in range(first, last, block_size):
+        stop = min(start + block_size, last)
+        block = dataset.block(start, stop, start_row=flow_count)
+        flow_count += len(block)
+
+        yield block
+
+        # Simulate real-time flow arrival at the same average rate
+        if delay_seconds > 0:
+            time.sleep(delay_seconds * len(block))
+
+    print(f"Replay complete: {flow_count} flows processed")
@@ -3,8 +3,12 @@
 # feature order. Missing features are derived via calculation or filled with zeros.
 # 
 # UPDATED: Now supports both NFStream flows (live) and CSV flows (replay)
+# UPDATED: Added map_features_batch() for vectorized mapping of flow batches
 # -----------------------------------------------------------------------------
 
+from operator import itemgetter
+
+import numpy as np
 import pandas as pd
 
 # Full list of dataset features model was trained on. Note: in exact same order as training
@@ -133,6 +137,32 @@ NFSTREAM_MAPPED = {
     "Subflow Bwd Bytes": "dst2src_bytes"
 }
 
+# NFStream attributes needed to compute the derived (non 1-to-1) features.
+_NFSTREAM_DERIVED_INPUTS = [
+    "bidirectional_bytes",
+    "bidirectional_packets",
+    "bidirectional_duration_ms",
+    "bidirectional_stddev_ps",
+    "src2dst_packets",
+    "dst2src_packets",
+    "src2dst_bytes",
+    "dst2src_bytes",
+    "src2dst_mean_piat_ms",
+    "dst2src_mean_piat_ms"
+]
+
+# Precomputed index tables for map_features_batch(). Every NFStream attribute
+# is read once per flow into a raw matrix; the mapped features are then copied
+# into their DATASET_FEATURES columns with a single fancy-indexed assignment.
+_FEATURE_INDEX = {feature: i for i, feature in enumerate(DATASET_FEATURES)}
+_NFSTREAM_ATTRS = list(dict.fromkeys(list(NFSTREAM_MAPPED.values()) + _NFSTREAM_DERIVED_INPUTS))
+_ATTR_INDEX = {attr: i for i, attr in enumerate(_NFSTREAM_ATTRS)}
+_MAPPED_FEATURE_COLS = np.array([_FEATURE_INDEX[f] for f in NFSTREAM_MAPPED], dtype=np.intp)
+_MAPPED_ATTR_COLS = np.array([_ATTR_INDEX[a] for a in NFSTREAM_MAPPED.values()], dtype=np.intp)
+
+# Fetches all dataset features from a CSV row dict in one C-level call
+_CSV_FEATURE_GETTER = itemgetter(*DATASET_FEATURES)
+
 
 def map_features(flow) -> pd.DataFrame:
     """
@@ -230,4 +260,95 @@ def _map_nfstream_flow(flow) -> pd.DataFrame:
                 aligned[feature] = 0
 
     # Return as a single-row DataFrame with index 0 to keep compatibility
-    return pd.DataFrame(aligned, index=[0])
\ No newline at end of file
+    return pd.DataFrame(aligned, index=[0])
+
+
+def map_features_batch(flows, dtype=np.float64) -> np.ndarray:
+    """
+    Aligns a batch of flows to the expected training dataset feature order.
+    Vectorized counterpart of map_features(); all flows in the batch must come
+    from the same source (NFStream flows or CSVFlow objects).
+
+    Args:
+        flows: List of NFStream flow objects or CSVFlow objects.
+        dtype: Floating point dtype of the returned matrix.
+
+    Returns:
+        A contiguous (n_flows, len(DATASET_FEATURES)) NumPy array with columns
+        in DATASET_FEATURES order.
+    """
+    if not flows:
+        return np.zeros((0, len(DATASET_FEATURES)), dtype=dtype)
+
+    first = flows[0]
+    if hasattr(first, '_data') and 'Flow Duration' in first._data:
+        return _map_csv_flows_batch(flows, dtype)
+    return _map_nfstream_flows_batch(flows, dtype)
+
+
+def _map_csv_flows_batch(flows, dtype) -> np.ndarray:
+    """
+    Extracts the dataset features of a batch of CSV flows into a matrix.
+
+    Args:
+        flows: List of CSVFlow objects with _data attribute
+
+    Returns:
+        (n_flows, n_features) array with features in correct order
+    """
+    try:
+        rows = [_CSV_FEATURE_GETTER(flow._data) for flow in flows]
+    except KeyError:
+        # Some features missing from the CSV; fill them with 0
+        rows = [[flow._data.get(col, 0) for col in DATASET_FEATURES] for flow in flows]
+
+    return np.array(rows, dtype=dtype)
+
+
+def _map_nfstream_flows_batch(flows, dtype) -> np.ndarray:
+    """
+    Maps a batch of NFStream flows to CICFlowMeter feature format.
+    Calculated features are computed as array expressions over the batch.
+
+    Args:
+        flows: List of NFStream flow objects
+
+    Returns:
+        (n_flows, n_features) array with features in correct order
+    """
+    raw = np.array(
+        [[getattr(flow, attr, 0) for attr in _NFSTREAM_ATTRS] for flow in flows],
+        dtype=np.float64
+    )
+
+    def g(attr):
+        return raw[:, _ATTR_INDEX[attr]]
+
+    def nonzero(values):
+        # Vectorized equivalent of "(value or 1)"
+        return np.where(values == 0, 1, values)
+
+    out = np.zeros((len(flows), len(DATASET_FEATURES)), dtype=dtype)
+
+    # Direct 1-to-1 mappings
+    out[:, _MAPPED_FEATURE_COLS] = raw[:, _MAPPED_ATTR_COLS]
+
+    # Calculated features (features not listed here stay 0)
+    duration = nonzero(g("bidirectional_duration_ms"))
+    fwd_packets = g("src2dst_packets")
+    bwd_packets = g("dst2src_packets")
+    stddev_ps = g("bidirectional_stddev_ps")
+
+    out[:, _FEATURE_INDEX["Flow Bytes/s"]] = (g("bidirectional_bytes") / duration) * 1000
+    out[:, _FEATURE_INDEX["Flow Packets/s"]] = (g("bidirectional_packets") / duration) * 1000
+    out[:, _FEATURE_INDEX["Fwd IAT Total"]] = (fwd_packets - 1) * g("src2dst_mean_piat_ms")
+    out[:, _FEATURE_INDEX["Bwd IAT Total"]] = (bwd_packets - 1) * g("dst2src_mean_piat_ms")
+    out[:, _FEATURE_INDEX["Fwd Packets/s"]] = (fwd_packets / duration) * 1000
+    out[:, _FEATURE_INDEX["Bwd Packets/s"]] = (bwd_packets / duration) * 1000
+    out[:, _FEATURE_INDEX["Packet Length Variance"]] = stddev_ps * stddev_ps
+    out[:, _FEATURE_INDEX["Down/Up Ratio"]] = bwd_packets / nonzero(fwd_packets)
+    out[:, _FEATURE_INDEX["Average Packet Size"]] = g("bidirectional_bytes") / nonzero(g("bidirectional_packets"))
+    out[:, _FEATURE_INDEX["Avg Fwd Segment Size"]] = g("src2dst_bytes") / nonzero(fwd_packets)
+    out[:, _FEATURE_INDEX["Avg Bwd Segment Size"]] = g("dst2src_bytes") / nonzero(bwd_packets)
+
+    return out
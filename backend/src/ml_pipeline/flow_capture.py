@@ -1,26 +1,170 @@
 # -----------------------------------------------------------------------------
 # Defines logic to capture live network traffic with NFStream.
+#
+# UPDATED: Added MultiInterfaceCapture to capture on several interfaces in
+# parallel (one NFStreamer per interface) with a merged, interface-tagged
+# flow stream
+# UPDATED: NFStreamer settings are configurable (capture_config()), with
+# presets for desktop, dedicated sensor and high-rate (10 GbE) capture
 # -----------------------------------------------------------------------------
 
+import os
+import queue
 import sys
+import threading
+import time
+
 from nfstream import NFStreamer
 from src.utils.interface_helper import get_network_interfaces
 
-def capture_live(interface=None):
+DEFAULT_CAPTURE_QUEUE_SIZE = 8192   # Merged flows buffered across all interfaces
+CAPTURE_STOP_TIMEOUT = 2.0          # Seconds close() waits for each meter process and capture thread
+
+# NFStreamer settings per capture preset. The flow timeouts and accounting
+# mode stay the same in every preset, since they shape the flow features the
+# models were trained on. The statistical features are computed from packet
+# headers, so neither nDPI dissection (n_dissections) nor payload bytes
+# beyond the headers (snapshot_length) are needed by the models.
+CAPTURE_PRESETS = {
+    # Default: the original capture_live settings (NFStream defaults for
+    # everything but the timeouts and accounting mode)
+    "desktop": {
+        "idle_timeout": 5,           # expire inactive flows after 5s
+        "active_timeout": 15,        # split long flows after 15s
+        "accounting_mode": 1,        # mode=1 best replicates CICFlowMeter data collection methodology
+        "n_meters": 0,               # 0 = let NFStream use every core
+        "snapshot_length": 1536,
+        "n_dissections": 20,
+        "bpf_filter": None,
+        "max_nflows": 0
+    },
+    # Dedicated sensor: one meter per CPU core, no dissection
+    "sensor": {
+        "idle_timeout": 5,
+        "active_timeout": 15,
+        "accounting_mode": 1,
+        "n_meters": 0,
+        "snapshot_length": 256,
+        "n_dissections": 0,
+        "bpf_filter": None,
+        "max_nflows": 0
+    },
+    # 10 GbE links: headers only, no dissection, every core
+    "high-rate": {
+        "idle_timeout": 5,
+        "active_timeout": 15,
+        "accounting_mode": 1,
+        "n_meters": 0,
+        "snapshot_length": 128,
+        "n_dissections": 0,
+        "bpf_filter": None,
+        "max_nflows": 0
+    }
+}
+DEFAULT_CAPTURE_PRESET = "desktop"
+
+# Valid range of each integer NFStreamer setting (None = unbounded)
+_CAPTURE_INT_RANGES = {
+    "idle_timeout": (1, None),       # seconds
+    "active_timeout": (1, None),     # seconds
+    "accounting_mode": (0, 3),       # 0 = link layer, 1 = IP, 2 = transport, 3 = payload sizes
+    "n_meters": (0, os.cpu_count() or 1),
+    "snapshot_length": (64, 65535),  # bytes captured per packet
+    "n_dissections": (0, 255),       # packets inspected by nDPI per flow (0 = disabled)
+    "max_nflows": (0, None)          # stop after this many flows (0 = unlimited)
+}
+CAPTURE_SETTINGS = tuple(_CAPTURE_INT_RANGES) + ("bpf_filter",)
+
+
+def capture_config(params) -> dict:
+    """
+    Validated NFStreamer settings for a live scan: the capture_preset
+    settings, overridden by any setting given in params.
+
+    Args:
+        params: start_scan parameters; uses capture_preset (default
+                "desktop") and the CAPTURE_SETTINGS keys.
+
+    Returns:
+        {"preset", <setting>: value, ...}
+
+    Raises:
+        ValueError: Unknown preset or invalid setting.
+    """
+    preset = params.get("capture_preset") or DEFAULT_CAPTURE_PRESET
+    if preset not in CAPTURE_PRESETS:
+        raise ValueError(f"capture_preset must be one of {tuple(CAPTURE_PRESETS)}")
+    config = dict(CAPTURE_PRESETS[preset])
+
+    for key, (low, high) in _CAPTURE_INT_RANGES.items():
+        value = params.get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value):
+            raise ValueError(f"{key} must be an integer")
+        value = int(value)
+        if value < low or (high is not None and value > high):
+            raise ValueError(f"{key} must be between {low} and {high}" if high is not None
+                             else f"{key} must be at least {low}")
+        config[key] = value
+
+    bpf_filter = params.get("bpf_filter")
+    if bpf_filter is not None:
+        if not isinstance(bpf_filter, str):
+            raise ValueError("bpf_filter must be a string")
+        config["bpf_filter"] = bpf_filter.strip() or None
+
+    if config["active_timeout"] < config["idle_timeout"]:
+        raise ValueError("active_timeout must not be shorter than idle_timeout")
+    return {"preset": preset, **config}
+
+
+def _resolve_interface(interface):
+    """
+    Returns the NFStream source for an interface given by the client.
+    On Windows, a bare GUID like '{...}' needs the NPF prefix.
+    On macOS/Linux, names like 'en0' are passed through as-is.
+    """
+    if sys.platform == "win32" and interface.startswith('{'):
+        interface = f"\\Device\\NPF_{interface}"
+        print(f"Formatted Windows GUID to: {interface}")
+    return interface
+
+
+def _open_streamer(interface, config=None):
+    """
+    Creates the NFStreamer for one interface.
+
+    Args:
+        interface: NFStream source.
+        config: capture_config() settings (default: the default preset).
+    """
+    if config is None:
+        config = capture_config({})
+    settings = {key: config[key] for key in CAPTURE_SETTINGS}
+    return NFStreamer(
+        source=interface,
+        statistical_analysis=True,   # enable extended feature capture
+        **settings
+    )
+
+
+def capture_live(interface=None, config=None):
     """
     Captures live network traffic on the specified interface using NFStreamer.
     If no interface is provided, auto-detects the first available one.
     Yields flow objects as they are generated.
 
-    Args: 
+    Args:
         interface: Network interface identifier or None for auto-detection.
                    On Windows: NPF GUID (e.g., '\\Device\\NPF_{...}') or bare '{GUID}'.
                    On macOS/Linux: interface name (e.g., 'en0').
+        config: capture_config() settings (default: the default preset).
 
     Yields:
         NFStream flow objects with statistical analysis enabled
     """
-    
+
     # Auto-detect if not provided or empty
     if not interface:
         interfaces = get_network_interfaces()
@@ -35,26 +179,289 @@ def capture_live(interface=None):
             )
     else:
         print(f"Interface provided from client: '{interface}'")
-        # On Windows, a bare GUID like '{...}' needs the NPF prefix.
-        # On macOS/Linux, names like 'en0' are passed through as-is.
-        if sys.platform == "win32" and interface.startswith('{'):
-            interface = f"\\Device\\NPF_{interface}"
-            print(f"Formatted Windows GUID to: {interface}")
+        interface = _resolve_interface(interface)
         print(f"Using interface: {interface}")
 
     print(f"Capturing live traffic on '{interface}'... Press Ctrl+C to stop.")
-    
+
     # Initialize nfstream to start reading live network traffic and generating flows
-    streamer = NFStreamer(
-        source=interface,
-        statistical_analysis=True,   # enable extended feature capture
-        idle_timeout=5,              # expire inactive flows after 15s
-        active_timeout=15,           # split long flows after 30s
-        accounting_mode=1            # mode=1 best replicates CICFlowMeter data collection methodology
-    )
+    streamer = _open_streamer(interface, config)
 
     # Yield each flow object as it is produced by NFStreamer. Downstream
     # code will map features and run inference per-flow rather than
     # operating on a batch DataFrame.
     for flow in streamer:
         yield flow
+
+
+class _StreamerProcesses:
+    """
+    Stand-in for an NFStreamer's multiprocessing context that records the
+    meter processes and the flow channel the streamer creates, so a capture
+    can be stopped from another thread. NFStreamer has no stop call: its
+    meters only exit at the end of a pcap, and its iterator blocks on the
+    channel until every meter has reported.
+    """
+
+    def __init__(self, context):
+        self._context = context
+        self._lock = threading.Lock()
+        self.processes = []
+        self.channels = []
+        self.stopped = False
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+    def Process(self, *args, **kwargs):
+        with self._lock:
+            if self.stopped:
+                raise ValueError("Capture stopped")
+            process = self._context.Process(*args, **kwargs)
+            self.processes.append(process)
+            return process
+
+    def Queue(self, *args, **kwargs):
+        channel = self._context.Queue(*args, **kwargs)
+        with self._lock:
+            self.channels.append(channel)
+        return channel
+
+    def stop(self, timeout=CAPTURE_STOP_TIMEOUT):
+        """
+        Terminates the meter processes, then sends the streamer one end
+        marker per meter so its iterator returns instead of waiting for
+        flows that will never come.
+        """
+        with self._lock:
+            self.stopped = True
+            processes, channels = list(self.processes), list(self.channels)
+
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for channel in channels:
+            # Never block here, and never wait at exit for markers nobody reads
+            channel.cancel_join_thread()
+            for _ in processes:
+                try:
+                    channel.put_nowait(None)
+                except (queue.Full, ValueError, OSError):
+                    break
+        for process in processes:
+            if process.pid is not None:
+                process.join(timeout)
+
+
+class InterfaceFlow:
+    """
+    NFStream flow tagged with the interface it was captured on. Every other
+    attribute is read from the wrapped flow, so it can be used wherever a
+    flow is expected.
+    """
+
+    __slots__ = ("flow", "interface")
+
+    def __init__(self, flow, interface):
+        self.flow = flow
+        self.interface = interface
+
+    def __getattr__(self, name):
+        return getattr(self.flow, name)
+
+
+class _InterfaceCounters:
+    """Flow counters of one capture interface (written by its capture thread)."""
+
+    def __init__(self, interface):
+        self.interface = interface
+        self.flows = 0      # Flows produced by the interface's NFStreamer
+        self.dropped = 0    # Flows dropped because the merged queue was full (drop_when_full)
+        self.blocked_seconds = 0.0   # Time spent waiting for room in the merged queue
+        self.error = None
+        self.running = False
+        self.started = None
+        self.stopped = None
+
+
+class MultiInterfaceCapture:
+    """
+    Captures on several interfaces in parallel, one NFStreamer (with its own
+    meter processes) per interface, each read by its own thread. Flows are
+    merged into one stream of InterfaceFlow objects in arrival order.
+
+    When the scan falls behind, the capture threads wait for room in the
+    merged queue (backpressure, like a single NFStreamer iterated directly),
+    or with drop_when_full the flows are dropped and counted per interface
+    instead.
+
+    Args:
+        interfaces: Interface identifiers (see capture_live), or "all" for
+                    every active interface.
+        queue_size: Capacity of the merged flow queue.
+        config: capture_config() settings shared by all interfaces (default:
+                the default preset). With n_meters 0 the CPU cores are split
+                between the interfaces.
+        drop_when_full: Drop flows when the merged queue is full instead of
+                        waiting.
+    """
+
+    _DONE = object()   # Queued by a capture thread when its streamer ends
+
+    def __init__(self, interfaces, queue_size=DEFAULT_CAPTURE_QUEUE_SIZE, config=None, drop_when_full=False):
+        if interfaces == "all":
+            interfaces = [iface['guid'] for iface in get_network_interfaces()]
+        interfaces = list(dict.fromkeys(_resolve_interface(str(iface)) for iface in interfaces if iface))
+        if not interfaces:
+            raise ValueError(
+                "No valid network interfaces detected. "
+                "Ensure at least one network adapter is connected and active."
+            )
+
+        self.interfaces = interfaces
+        self.config = dict(config) if config is not None else capture_config({})
+        if self.config["n_meters"] == 0 and len(interfaces) > 1:
+            self.config["n_meters"] = max(1, (os.cpu_count() or 1) // len(interfaces))
+        self.drop_when_full = bool(drop_when_full)
+        self.counters = [_InterfaceCounters(interface) for interface in interfaces]
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._threads = []
+        self._streamers = []    # _StreamerProcesses of each interface's NFStreamer
+        self._streamers_lock = threading.Lock()
+        self._closed = False
+        self._started = None
+
+    def _capture(self, counters):
+        """Capture thread: reads one interface's NFStreamer into the merged queue."""
+        interface = counters.interface
+        try:
+            streamer = _open_streamer(interface, self.config)
+            processes = _StreamerProcesses(streamer._mp_context)
+            streamer._mp_context = processes
+            with self._streamers_lock:
+                self._streamers.append(processes)
+                if self._closed:
+                    return
+
+            for flow in streamer:
+                if self._closed:
+                    break
+                counters.flows += 1
+                item = InterfaceFlow(flow, interface)
+                try:
+                    self._queue.put_nowait(item)
+                    continue
+                except queue.Full:
+                    if self.drop_when_full:
+                        counters.dropped += 1
+                        continue
+
+                # Backpressure: wait for room (stops reading this streamer)
+                start = time.perf_counter()
+                while not self._closed:
+                    try:
+                        self._queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                counters.blocked_seconds += time.perf_counter() - start
+        except Exception as e:
+            if not self._closed:
+                counters.error = str(e)
+                print(f"Capture on '{interface}' failed: {e}", flush=True)
+        finally:
+            counters.running = False
+            counters.stopped = time.time()
+            while not self._closed:
+                try:
+                    self._queue.put(self._DONE, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def __iter__(self):
+        """
+        Starts the capture threads and yields merged InterfaceFlow objects
+        until every interface has stopped or the capture is closed.
+
+        Raises:
+            RuntimeError: Capture failed on every interface.
+        """
+        self._started = time.time()
+        print(f"Capturing live traffic on {len(self.interfaces)} interface(s): {', '.join(self.interfaces)}")
+        for counters in self.counters:
+            counters.running = True
+            counters.started = self._started
+            thread = threading.Thread(
+                target=self._capture,
+                args=(counters,),
+                name=f"capture-{counters.interface}",
+                daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+        remaining = len(self._threads)
+        try:
+            while remaining and not self._closed:
+                try:
+                    item = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is self._DONE:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            self.close()
+
+        errors = [f"{c.interface}: {c.error}" for c in self.counters if c.error]
+        if errors and len(errors) == len(self.counters):
+            raise RuntimeError(f"Capture failed on all interfaces ({'; '.join(errors)})")
+
+    def close(self, timeout=CAPTURE_STOP_TIMEOUT):
+        """
+        Stops the capture: terminates every NFStreamer's meter processes,
+        which also ends the streamers' iterators, and waits up to timeout
+        seconds for each capture thread to exit.
+        """
+        with self._streamers_lock:
+            self._closed = True
+            streamers = list(self._streamers)
+        for streamer in streamers:
+            streamer.stop(timeout)
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def stats(self) -> dict:
+        """
+        Per-interface capture counters.
+
+        Returns:
+            {"config", "drop_when_full", "interfaces": [{interface, running,
+            flows, dropped, blocked_seconds, flows_per_second, error}],
+            "total_flows", "total_dropped", "queue_depth", "queue_capacity"}
+        """
+        now = time.time()
+        interfaces = []
+        for c in self.counters:
+            elapsed = ((c.stopped or now) - c.started) if c.started else 0.0
+            interfaces.append({
+                "interface": c.interface,
+                "running": c.running,
+                "flows": c.flows,
+                "dropped": c.dropped,
+                "blocked_seconds": round(c.blocked_seconds, 3),
+                "flows_per_second": round(c.flows / elapsed, 2) if elapsed > 0 else 0.0,
+                "error": c.error
+            })
+        return {
+            "config": self.config,
+            "drop_when_full": self.drop_when_full,
+            "interfaces": interfaces,
+            "total_flows": sum(c.flows for c in self.counters),
+            "total_dropped": sum(c.dropped for c in self.counters),
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize
+        }
@@ -4,25 +4,75 @@
 # Replays network flows from CIC-IDS-2017 CSV files.
 # Yields flow objects compatible with the existing ML pipeline.
 # Supports selecting specific row ranges for targeted testing.
+# UPDATED: Added columnar replay (replay_blocks_from_csv) yielding FlowBlocks
+# UPDATED: CSVs are streamed in column-pruned, explicitly typed chunks
+# UPDATED: Row ranges seek via a sidecar row-offset index (see csv_index.py)
 # -----------------------------------------------------------------------------
 
+import numpy as np
 import pandas as pd
 import time
+from collections import Counter
 from typing import Iterator, Optional
 
+from src.ml_pipeline.feature_mapping import DATASET_FEATURES
+from src.ml_pipeline.csv_index import load_or_build_index, locate_row
+
+# Columns every replay CSV must provide
+REQUIRED_COLUMNS = [
+    'Flow Duration',
+    'Flow Bytes/s',
+    'Flow Packets/s',
+    'Total Fwd Packets',
+    'Total Backward Packets',
+    'Total Length of Fwd Packets',
+    'Total Length of Bwd Packets',
+    'Flow IAT Mean',
+    'Flow IAT Std',
+    'SYN Flag Count',
+    'ACK Flag Count',
+    'RST Flag Count',
+    'FIN Flag Count',
+    'Packet Length Mean',
+    'Packet Length Std',
+    'Min Packet Length',
+    'Max Packet Length',
+    'Label'
+]
+
+# Flow identity columns kept alongside the features when streaming a CSV
+IDENTITY_COLUMNS = [
+    'Flow ID',
+    'Source IP',
+    'Source Port',
+    'Destination IP',
+    'Protocol',
+    'Timestamp'
+]
+
+# Rows parsed per chunk when streaming a CSV
+DEFAULT_CHUNK_SIZE = 65536
+
+_FEATURE_INDEX = {feature: i for i, feature in enumerate(DATASET_FEATURES)}
+
+# NFStream's bidirectional_packets, derived from the CSV's per-direction totals
+_PACKET_COLUMNS = ('Total Fwd Packets', 'Total Backward Packets')
+
 
 class CSVFlow:
     """
     Wrapper to make CSV rows look like NFStream flow objects.
     Only needs attributes that map_features() expects.
     """
-    def __init__(self, row: pd.Series):
-        self._data = row.to_dict()
+    def __init__(self, row):
+        self._data = row.to_dict() if isinstance(row, pd.Series) else dict(row)
 
     def __getattr__(self, name):
         """Allow attribute access like flow.src_ip"""
         if name in self._data:
             return self._data[name]
+        if name == "bidirectional_packets" and all(col in self._data for col in _PACKET_COLUMNS):
+            return int(sum(self._data[col] for col in _PACKET_COLUMNS))
         raise AttributeError(f"CSVFlow has no attribute '{name}'")
         
     @property
@@ -31,12 +81,187 @@ class CSVFlow:
         return self._data
 
 
+class BlockRow:
+    """
+    Lightweight view of a single row of a FlowBlock.
+    Supports the same attribute access as CSVFlow without copying the row.
+    """
+    __slots__ = ("_block", "_index")
+
+    def __init__(self, block, index):
+        self._block = block
+        self._index = index
+
+    def __getattr__(self, name):
+        """Allow attribute access like flow.Label"""
+        return self._block.value(self._index, name)
+
+
+class FlowBlock:
+    """
+    A block of consecutive CSV rows stored column-wise.
+
+    Attributes:
+        features: (n, len(DATASET_FEATURES)) array in DATASET_FEATURES order.
+        labels: Array of ground-truth labels, or None if the CSV has no Label.
+        columns: Dict of the remaining (metadata) column arrays.
+        start_row: Index of the block's first row within the replayed rows.
+    """
+    __slots__ = ("features", "labels", "columns", "start_row")
+
+    def __init__(self, features, labels, columns, start_row=0):
+        self.features = features
+        self.labels = labels
+        self.columns = columns
+        self.start_row = start_row
+
+    def __len__(self):
+        return self.features.shape[0]
+
+    def __getitem__(self, index):
+        return BlockRow(self, index)
+
+    def __iter__(self):
+        return (BlockRow(self, i) for i in range(len(self)))
+
+    def value(self, index, name):
+        """Returns a single field of row index as a Python scalar."""
+        if name == "Label" and self.labels is not None:
+            return _to_python(self.labels[index])
+        if name in self.columns:
+            return _to_python(self.columns[name][index])
+        if name in _FEATURE_INDEX:
+            return float(self.features[index, _FEATURE_INDEX[name]])
+        if name == "bidirectional_packets":
+            return int(sum(self.features[index, _FEATURE_INDEX[col]] for col in _PACKET_COLUMNS))
+        raise AttributeError(f"FlowBlock row has no attribute '{name}'")
+
+    def packet_counts(self) -> np.ndarray:
+        """Packets of every row (the bidirectional_packets of each flow)."""
+        counts = sum(self.features[:, _FEATURE_INDEX[col]] for col in _PACKET_COLUMNS)
+        return np.nan_to_num(counts).astype(np.int64)
+
+    def to_flow(self, index) -> CSVFlow:
+        """Builds a full CSVFlow for row index (only for per-flow consumers)."""
+        data = {name: _to_python(values[index]) for name, values in self.columns.items()}
+        for name, col in _FEATURE_INDEX.items():
+            data[name] = float(self.features[index, col])
+        if self.labels is not None:
+            data["Label"] = _to_python(self.labels[index])
+        return CSVFlow(data)
+
+
+def _to_python(value):
+    """Converts NumPy scalars to native Python values (JSON-safe)."""
+    return value.item() if hasattr(value, "item") else value
+
+
+def _csv_schema(csv_path):
+    """
+    Reads only the header of a replay CSV and builds the column-pruned read
+    schema: the raw (unstripped) names of the columns the pipeline needs and an
+    explicit dtype for each, so pandas never has to infer types.
+
+    Returns:
+        (header, usecols, dtypes) where header is the full list of raw column
+        names and usecols/dtypes are keyed by raw header names.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    raw_names = {name.strip(): name for name in header}
+
+    missing = set(REQUIRED_COLUMNS) - set(raw_names)
+    if missing:
+        raise ValueError(f"CSV missing required columns: {missing}")
+
+    dtypes = {}
+    for col in DATASET_FEATURES:
+        if col in raw_names:
+            dtypes[raw_names[col]] = np.float64
+    dtypes[raw_names['Label']] = "category"
+    for col in IDENTITY_COLUMNS:
+        if col in raw_names:
+            dtypes[raw_names[col]] = str
+
+    return list(header), list(dtypes), dtypes
+
+
+def iter_csv_chunks(csv_path, start_row, end_row, max_flows, chunk_size) -> Iterator[pd.DataFrame]:
+    """
+    Streams the requested rows of a CIC-IDS-2017 CSV file in fixed-size chunks.
+    Only DATASET_FEATURES, Label and the flow identity columns are parsed, so
+    peak memory depends on chunk_size rather than on the file size.
+    Shared by the per-flow and columnar replay modes.
+    """
+    print(f"Loading CSV from: {csv_path}")
+
+    handle = None
+    reader = []
+    total_rows = 0
+    label_counts = Counter()
+
+    # One try/finally around the open and the streaming, so the file handle
+    # is closed on every path (including errors raised by pd.read_csv)
+    try:
+        try:
+            header, usecols, dtypes = _csv_schema(csv_path)
+
+            # If using row range, seek close to start_row using the sidecar
+            # row-offset index and only parse the requested rows
+            if start_row is not None and end_row is not None:
+                nrows = end_row - start_row
+                print(f"Loading rows {start_row} to {end_row-1} ({nrows} rows)...")
+                location = locate_row(load_or_build_index(csv_path), start_row)
+                if location is not None and nrows > 0:
+                    offset, rows_to_skip = location
+                    handle = open(csv_path, "rb")
+                    handle.seek(offset)
+                    reader = pd.read_csv(
+                        handle, header=None, names=header, usecols=usecols, dtype=dtypes,
+                        skiprows=rows_to_skip, nrows=nrows, chunksize=chunk_size
+                    )
+            else:
+                # Stream entire CSV, optionally stopping early at max_flows
+                if max_flows:
+                    print(f"Limiting replay to {max_flows} flows")
+                reader = pd.read_csv(
+                    csv_path, usecols=usecols, dtype=dtypes,
+                    nrows=max_flows or None, chunksize=chunk_size
+                )
+
+        except FileNotFoundError:
+            raise FileNotFoundError(f"CSV file not found: {csv_path}")
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error reading CSV file: {e}")
+
+        for chunk in reader:
+            # Strip whitespace from column names (important for CIC-IDS-2017 CSVs)
+            chunk.columns = chunk.columns.str.strip()
+            total_rows += len(chunk)
+            label_counts.update(chunk['Label'].value_counts().to_dict())
+            yield chunk
+    finally:
+        if hasattr(reader, "close"):
+            reader.close()
+        if handle is not None:
+            handle.close()
+
+    print(f"Streamed {total_rows} flows from CSV.")
+
+    # Show label distribution for the streamed rows
+    print("Label distribution:")
+    for label, count in label_counts.most_common():
+        print(f"  {label}: {count}")
+
+
 def replay_from_csv(
     csv_path: str,
     delay_ms: int = 100,
     max_flows: Optional[int] = None,
     start_row: Optional[int] = None,
-    end_row: Optional[int] = None
+    end_row: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
 ) -> Iterator[CSVFlow]:
     """
     Replays flows from a CIC-IDS-2017 CSV file.
@@ -47,6 +272,7 @@ def replay_from_csv(
         max_flows: Optional maximum number of flows to replay. (None = all)
         start_row: Optional starting row index (0-based). If specified, replay starts here.
         end_row: Optional ending row index (0-based, exclusive). If specified, replay stops here.
+        chunk_size: Number of CSV rows parsed at a time (bounds memory use).
         
     Yields:
         CSVFlow objects compatible with map_features()
@@ -58,76 +284,78 @@ def replay_from_csv(
             start_row=1000, end_row=1100  -> Rows 1000-1099 (100 rows)
             start_row=14000, end_row=14032 -> Rows 14000-14031 (32 rows)
     """
-    print(f"Loading CSV from: {csv_path}")
+    flow_count = 0
+    delay_seconds = delay_ms / 1000.0
 
-    try:
-        # If using row range, only load those specific rows (memory efficient)
-        if start_row is not None and end_row is not None:
-            nrows = end_row - start_row
-            print(f"Loading rows {start_row} to {end_row-1} ({nrows} rows)...")
-            df = pd.read_csv(csv_path, skiprows=range(1, start_row + 1), nrows=nrows)
-        else:
-            # Load entire CSV
-            df = pd.read_csv(csv_path)
-            
-    except FileNotFoundError:
-        raise FileNotFoundError(f"CSV file not found: {csv_path}")
-    except Exception as e:
-        raise ValueError(f"Error reading CSV file: {e}")
-
-    # Strip whitespace from column names (important for CIC-IDS-2017 CSVs)
-    df.columns = df.columns.str.strip()
-
-    # Validate required columns
-    required_columns = [
-        'Flow Duration',
-        'Flow Bytes/s',
-        'Flow Packets/s',
-        'Total Fwd Packets',
-        'Total Backward Packets',
-        'Total Length of Fwd Packets',
-        'Total Length of Bwd Packets',
-        'Flow IAT Mean',
-        'Flow IAT Std',
-        'SYN Flag Count',
-        'ACK Flag Count',
-        'RST Flag Count',
-        'FIN Flag Count',
-        'Packet Length Mean',
-        'Packet Length Std',
-        'Min Packet Length',
-        'Max Packet Length',
-        'Label'
-    ]
-
-    missing = set(required_columns) - set(df.columns)
-    if missing:
-        raise ValueError(f"CSV missing required columns: {missing}")
+    for chunk in iter_csv_chunks(csv_path, start_row, end_row, max_flows, chunk_size):
+        for row in chunk.to_dict('records'):
+            flow_count += 1
 
-    print(f"Loaded {len(df)} flows from CSV.")
-    
-    # Show label distribution for the loaded rows
-    if 'Label' in df.columns:
-        print("Label distribution:")
-        for label, count in df['Label'].value_counts().items():
-            print(f"  {label}: {count}")
+            # Yield flow wrapped in our compatibility layer
+            yield CSVFlow(row)
+
+            # Simulate real-time flow arrival
+            if delay_seconds > 0:
+                time.sleep(delay_seconds)
+
+    print(f"Replay complete: {flow_count} flows processed")
 
-    # Apply max_flows limit if no row range was specified
-    if start_row is None and end_row is None and max_flows and len(df) > max_flows:
-        df = df.head(max_flows)
-        print(f"Limiting replay to {max_flows} flows")
 
+def replay_blocks_from_csv(
+    csv_path: str,
+    block_size: int = 1024,
+    delay_ms: int = 0,
+    max_flows: Optional[int] = None,
+    start_row: Optional[int] = None,
+    end_row: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[FlowBlock]:
+    """
+    Columnar replay of a CIC-IDS-2017 CSV file. Instead of one CSVFlow per row,
+    yields blocks of rows as NumPy column arrays with the model features already
+    ordered as DATASET_FEATURES, so they can be scored without per-row mapping.
+
+    Args:
+        csv_path: Path to the CIC-IDS-2017 CSV file.
+        block_size: Maximum number of rows per yielded block.
+        delay_ms: Per-row delay in milliseconds; applied once per block as
+                  delay_ms * block length to keep the same average flow rate.
+        max_flows: Optional maximum number of flows to replay. (None = all)
+        start_row: Optional starting row index (0-based).
+        end_row: Optional ending row index (0-based, exclusive).
+        chunk_size: Number of CSV rows parsed at a time (bounds memory use).
+
+    Yields:
+        FlowBlock objects; rows are only materialized as CSVFlow on request.
+    """
     flow_count = 0
     delay_seconds = delay_ms / 1000.0
+    block_size = max(1, block_size)
+
+    for chunk in iter_csv_chunks(csv_path, start_row, end_row, max_flows, chunk_size):
+        # Convert each chunk to column arrays once; blocks are zero-copy slices
+        features = chunk.reindex(columns=DATASET_FEATURES, fill_value=0).to_numpy(dtype=np.float64)
+        labels = chunk['Label'].to_numpy()
+        columns = {
+            col: chunk[col].to_numpy()
+            for col in chunk.columns
+            if col not in _FEATURE_INDEX and col != 'Label'
+        }
 
-    for idx, row in df.iterrows():
-        flow_count += 1
+        for start in range(0, len(chunk), block_size):
+            stop = min(start + block_size, len(chunk))
+            block = FlowBlock(
+                features[start:stop],
+                labels[start:stop],
+                {col: values[start:stop] for col, values in columns.items()},
+                start_row=flow_count
+            )
+            flow_count += len(block)
 
-        # Yield flow wrapped in our compatibility layer
-        yield CSVFlow(row)
+            yield block
 
-        # Simulate real-time flow arrival
-        if delay_seconds > 0:
-            time.sleep(delay_seconds)
+            # Simulate real-time flow arrival at the same average rate
+            if delay_seconds > 0:
+                time.sleep(delay_seconds * len(block))
 
-    print(f"Replay complete: {flow_count} flows processed")
\ No newline at end of file
+    print(f"Replay complete: {flow_count} flows processed")
@@ -0,0 +1,134 @@
+# -----------------------------------------------------------------------------
+# Defines a flattened-array evaluator for the random forest model.
+# All trees of a fitted sklearn RandomForestClassifier are exported into
+# contiguous node arrays (feature, threshold, children, normalized leaf class
+# distributions). A whole batch of flows is pushed through every tree in one
+# vectorized traversal, returning labels and class probabilities together
+# instead of walking the forest twice (predict + predict_proba).
+# Results match sklearn exactly: inputs are compared as float32 like sklearn's
+# tree code, and leaf probabilities are accumulated in the same tree order.
+# -----------------------------------------------------------------------------
+
+import numpy as np
+
+_TREE_LEAF = -1
+
+
+class FlatForest:
+    """
+    Random forest flattened into contiguous node arrays.
+
+    Args:
+        forest: Fitted sklearn RandomForestClassifier (single output).
+    """
+
+    def __init__(self, forest):
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("FlatForest only supports single-output forests")
+
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        node_counts = np.array([tree.node_count for tree in trees], dtype=np.intp)
+        offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.intp)
+
+        self.classes_ = forest.classes_
+        self.n_trees = len(trees)
+        self.n_classes = int(np.atleast_1d(forest.n_classes_)[0])
+        self.roots = offsets
+
+        features, thresholds, lefts, rights, missing_left, values = [], [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            left = tree.children_left.astype(np.intp)
+            right = tree.children_right.astype(np.intp)
+            is_leaf = left == _TREE_LEAF
+
+            # Leaves point to themselves so finished rows can keep "stepping"
+            node_ids = np.arange(tree.node_count, dtype=np.intp) + offset
+            lefts.append(np.where(is_leaf, node_ids, left + offset))
+            rights.append(np.where(is_leaf, node_ids, right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(tree.threshold.astype(np.float64))
+            missing_left.append(
+                np.asarray(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count)), dtype=bool)
+            )
+
+            # sklearn >= 1.4 stores class fractions in tree_.value and returns
+            # them as-is; older versions store counts and normalize them in
+            # DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :self.n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            if not np.allclose(normalizer, 1.0):
+                normalizer[normalizer == 0.0] = 1.0
+                proba = proba / normalizer
+            values.append(proba)
+
+        self.feature = np.ascontiguousarray(np.concatenate(features))
+        self.threshold = np.ascontiguousarray(np.concatenate(thresholds))
+        self.left = np.ascontiguousarray(np.concatenate(lefts))
+        self.right = np.ascontiguousarray(np.concatenate(rights))
+        self.missing_go_to_left = np.ascontiguousarray(np.concatenate(missing_left))
+        self.is_leaf = self.left == np.arange(self.left.shape[0])
+        self._has_missing = bool(self.missing_go_to_left.any())
+
+        # Interleaved (right, left) children: next node = children[2 * node + go_left]
+        self.children = np.ascontiguousarray(np.stack([self.right, self.left], axis=1).ravel())
+        self.values = np.ascontiguousarray(np.concatenate(values))
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Finds the leaf reached in every tree for every row of X.
+        Args:
+            X: (n_samples, n_features) array (scaled model input).
+        Returns:
+            (n_trees, n_samples) array of global leaf node indices.
+        """
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X32.shape
+        flat_X = X32.ravel()
+
+        nodes = np.repeat(self.roots, n_samples)
+        row_offsets = np.tile(np.arange(n_samples, dtype=np.intp) * n_features, self.n_trees)
+
+        # Only (tree, row) pairs that have not reached a leaf are advanced;
+        # each iteration moves all of them down one level
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        active_nodes = nodes[active]
+        active_rows = row_offsets[active]
+        check_missing = self._has_missing and np.isnan(flat_X).any()
+
+        while active.size:
+            values = flat_X[active_rows + self.feature[active_nodes]]
+            go_left = values <= self.threshold[active_nodes]
+            if check_missing:
+                go_left = np.where(np.isnan(values), self.missing_go_to_left[active_nodes], go_left)
+            active_nodes = self.children[2 * active_nodes + go_left]
+
+            done = self.is_leaf[active_nodes]
+            if done.any():
+                nodes[active[done]] = active_nodes[done]
+                pending = ~done
+                active = active[pending]
+                active_nodes = active_nodes[pending]
+                active_rows = active_rows[pending]
+
+        return nodes.reshape(self.n_trees, n_samples)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Mean class distribution of the reached leaves (same as sklearn)."""
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[1], self.n_classes), dtype=np.float64)
+        # Accumulate tree by tree in estimator order, as sklearn does
+        for tree_leaves in leaves:
+            proba += self.values[tree_leaves]
+        proba /= self.n_trees
+        return proba
+
+    def predict_with_confidence(self, X):
+        """
+        Single-pass prediction.
+        Args:
+            X: (n_samples, n_features) array (scaled model input).
+        Returns:
+            A tuple of (class indices into classes_, class probabilities).
+        """
+        proba = self.predict_proba(X)
+        return np.argmax(proba, axis=1), proba
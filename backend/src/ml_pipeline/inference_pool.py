@@ -0,0 +1,279 @@
+# -----------------------------------------------------------------------------
+# Multi-process inference backend for the scan service.
+# A pool of worker processes each loads the scaler and the selected model once,
+# then scores feature batches in parallel, outside the GIL of the server
+# process. Feature matrices and results are exchanged through per-worker shared
+# memory buffers; only small (sequence, row count) messages go through queues.
+# Results are returned in submission order.
+# -----------------------------------------------------------------------------
+
+import multiprocessing as mp
+import queue
+from collections import deque
+from multiprocessing.shared_memory import SharedMemory
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.ml_pipeline.feature_mapping import DATASET_FEATURES
+from src.ml_pipeline.model_inference import ModelInference
+from src.ml_pipeline.model_registry import MODEL_PATHS, SCALER_PATH, ENCODER_PATH
+from src.ml_pipeline.preprocessor import Preprocessor
+
+DEFAULT_POOL_CAPACITY = 1024   # Maximum rows per batch sent to a worker
+_WORKER_POLL_SECONDS = 1.0     # How often a waiting parent checks worker liveness
+
+
+def _worker_main(worker_id, model_name, mmap_mode, inputs_name, outputs_name, capacity, n_classes, tasks, results):
+    """
+    Worker process entry point: loads the artifacts, then scores batches from
+    its shared input buffer into its shared output buffer until told to stop.
+    """
+    try:
+        # One BLAS/OpenMP thread per worker; parallelism comes from the pool
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+
+        preprocessor = Preprocessor.from_scaler(joblib.load(SCALER_PATH, mmap_mode=mmap_mode))
+        model = ModelInference.from_artifacts(
+            joblib.load(MODEL_PATHS[model_name], mmap_mode=mmap_mode),
+            joblib.load(ENCODER_PATH)
+        )
+        if model.class_labels is None or len(model.class_labels) != n_classes:
+            raise ValueError(f"model '{model_name}' does not match the parent's class labels")
+        label_index = pd.Index(model.class_labels)
+
+        inputs = SharedMemory(name=inputs_name)
+        outputs = SharedMemory(name=outputs_name)
+        features, indices, confidences, probabilities = _buffer_views(inputs, outputs, capacity, n_classes)
+    except Exception as e:
+        results.put(("failed", worker_id, None, str(e)))
+        return
+
+    results.put(("ready", worker_id, None, None))
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, n = task
+            try:
+                df = pd.DataFrame(features[:n], columns=DATASET_FEATURES)
+                labels, conf, proba = model.score(preprocessor.transform(df))
+                indices[:n] = label_index.get_indexer(labels)
+                if proba is not None:
+                    confidences[:n] = conf
+                    probabilities[:n] = proba
+                results.put(("done", worker_id, seq, None))
+            except Exception as e:
+                results.put(("error", worker_id, seq, str(e)))
+    finally:
+        # Drop the array views before closing the mappings
+        del features, indices, confidences, probabilities
+        inputs.close()
+        outputs.close()
+
+
+def _buffer_views(inputs, outputs, capacity, n_classes):
+    """Returns (features, indices, confidences, probabilities) arrays over the shared buffers."""
+    n_features = len(DATASET_FEATURES)
+    features = np.ndarray((capacity, n_features), dtype=np.float64, buffer=inputs.buf)
+    indices = np.ndarray((capacity,), dtype=np.int64, buffer=outputs.buf)
+    confidences = np.ndarray((capacity,), dtype=np.float64, buffer=outputs.buf, offset=capacity * 8)
+    probabilities = np.ndarray((capacity, n_classes), dtype=np.float64, buffer=outputs.buf, offset=capacity * 16)
+    return features, indices, confidences, probabilities
+
+
+class _Worker:
+    """Parent-side handle of one worker process and its shared buffers."""
+
+    def __init__(self, ctx, worker_id, model_name, mmap_mode, capacity, n_classes, results):
+        n_features = len(DATASET_FEATURES)
+        self.worker_id = worker_id
+        self.inputs = SharedMemory(create=True, size=capacity * n_features * 8)
+        self.outputs = SharedMemory(create=True, size=capacity * (16 + n_classes * 8))
+        self.features, self.indices, self.confidences, self.probabilities = _buffer_views(
+            self.inputs, self.outputs, capacity, n_classes
+        )
+        self.tasks = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(worker_id, model_name, mmap_mode, self.inputs.name, self.outputs.name,
+                  capacity, n_classes, self.tasks, results),
+            name=f"inference-worker-{worker_id}",
+            daemon=True
+        )
+        self.process.start()
+
+    def close(self):
+        if self.process.is_alive():
+            self.tasks.put(None)
+            self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1.0)
+
+        del self.features, self.indices, self.confidences, self.probabilities
+        for shm in (self.inputs, self.outputs):
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class InferencePool:
+    """
+    Pool of model-scoring worker processes.
+
+    Args:
+        model_name: Registry model name (key of MODEL_PATHS) each worker loads.
+        class_labels: The model's class labels (ModelInference.class_labels),
+                      used to decode the label indices returned by workers.
+        workers: Number of worker processes.
+        capacity: Maximum number of rows per submitted batch.
+        mmap_mode: Passed to joblib.load in the workers.
+        has_confidence: False for models that only support predict(); their
+                        confidences and probabilities are returned as None.
+    """
+
+    def __init__(self, model_name, class_labels, workers, capacity=DEFAULT_POOL_CAPACITY,
+                 mmap_mode=None, has_confidence=True):
+        if class_labels is None:
+            raise ValueError("Model does not expose class labels; cannot score in worker processes")
+
+        self.class_labels = np.asarray(class_labels, dtype=object)
+        self.capacity = max(1, int(capacity))
+        self.has_confidence = has_confidence
+
+        # "spawn" avoids forking the server process with its sockets and threads
+        ctx = mp.get_context("spawn")
+        self._results = ctx.Queue()
+        self._workers = []
+        try:
+            for worker_id in range(max(1, int(workers))):
+                self._workers.append(_Worker(
+                    ctx, worker_id, model_name, mmap_mode, self.capacity, len(self.class_labels), self._results
+                ))
+            self._wait_ready()
+        except Exception:
+            self.close()
+            raise
+
+        print(f"Inference pool started with {len(self._workers)} workers ({model_name})")
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    def _wait_ready(self):
+        waiting = len(self._workers)
+        while waiting:
+            kind, worker_id, _, error = self._get_message()
+            if kind == "failed":
+                raise RuntimeError(f"Inference worker {worker_id} failed to start: {error}")
+            waiting -= 1
+
+    def _get_message(self):
+        """Waits for the next worker message, failing if a worker has died."""
+        while True:
+            try:
+                return self._results.get(timeout=_WORKER_POLL_SECONDS)
+            except queue.Empty:
+                for worker in self._workers:
+                    if not worker.process.is_alive():
+                        raise RuntimeError(
+                            f"Inference worker {worker.worker_id} exited (code {worker.process.exitcode})"
+                        )
+
+    def imap(self, items):
+        """
+        Scores batches on the pool, keeping up to one batch in flight per worker.
+
+        Args:
+            items: Iterable of (payload, features) pairs, where features is a
+                   (n, len(DATASET_FEATURES)) raw feature matrix. If features is
+                   an Exception it is passed through as that batch's error.
+
+        Yields:
+            (payload, labels, confidences, probabilities, error) tuples in the
+            same order as items. On failure, labels/confidences/probabilities are
+            None and error holds the exception.
+        """
+        items = iter(items)
+        free = deque(self._workers)
+        in_flight = {}   # seq -> (payload, worker, n)
+        finished = {}    # seq -> result tuple
+        next_seq = 0
+        next_out = 0
+        exhausted = False
+
+        while True:
+            # Hand out new batches while workers are idle
+            while free and not exhausted:
+                try:
+                    payload, features = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                seq = next_seq
+                next_seq += 1
+
+                if isinstance(features, Exception):
+                    finished[seq] = (payload, None, None, None, features)
+                    continue
+                n = len(features)
+                if n > self.capacity:
+                    finished[seq] = (payload, None, None, None,
+                                     ValueError(f"Batch of {n} flows exceeds pool capacity {self.capacity}"))
+                    continue
+
+                worker = free.popleft()
+                worker.features[:n] = features
+                worker.tasks.put((seq, n))
+                in_flight[seq] = (payload, worker, n)
+
+            # Release completed batches in submission order
+            while next_out in finished:
+                yield finished.pop(next_out)
+                next_out += 1
+
+            if not in_flight:
+                if exhausted:
+                    return
+                continue
+
+            kind, worker_id, seq, error = self._get_message()
+            payload, worker, n = in_flight.pop(seq)
+
+            if kind == "done":
+                # Copy out of the shared buffer before the worker is reused
+                labels = self.class_labels[worker.indices[:n]]
+                if self.has_confidence:
+                    confidences = worker.confidences[:n].copy()
+                    probabilities = worker.probabilities[:n].copy()
+                else:
+                    confidences = np.array([None] * n)
+                    probabilities = None
+                finished[seq] = (payload, labels, confidences, probabilities, None)
+            else:
+                finished[seq] = (payload, None, None, None, RuntimeError(error))
+            free.append(worker)
+
+    def close(self):
+        """Stops the workers and releases the shared memory buffers."""
+        for worker in self._workers:
+            try:
+                worker.close()
+            except Exception as e:
+                print(f"Error stopping inference worker {worker.worker_id}: {e}")
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
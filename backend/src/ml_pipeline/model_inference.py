@@ -1,17 +1,77 @@
 # -----------------------------------------------------------------------------
-# Defines logic to apply the trained ML model to preprocessed flow data and 
+# Defines logic to apply the trained ML model to preprocessed flow data and
 # output prediction results.
-# Loads the random forest model and label encoder from the specified paths 
+# Loads the random forest model and label encoder from the specified paths
 # passed to the constructor.
+# UPDATED: Added single-pass score() API; the scoring method (predict_proba,
+# decision_function or score_samples) is chosen once when the model is loaded.
 # -----------------------------------------------------------------------------
 
 import joblib
 import numpy as np
+from scipy.special import expit, softmax
+
+# Labels used for outlier detectors (e.g. Isolation Forest) whose predictions
+# are +1 (inlier) / -1 (outlier) rather than label-encoded classes
+OUTLIER_LABELS = {1: "BENIGN", -1: "ANOMALY"}
+
+
+def decision_to_proba(decision):
+    """
+    Converts decision_function output to per-class pseudo-probabilities
+    (sigmoid for binary, softmax for multi-class). Not calibrated.
+    """
+    decision = np.asarray(decision, dtype=np.float64)
+    if decision.ndim == 1:
+        positive = expit(decision)
+        return np.vstack([1 - positive, positive]).T
+    return softmax(decision, axis=1)
+
 
 class ModelInference:
     def __init__(self, model_path, encoder_path):
         self.model = joblib.load(model_path)
         self.encoder = joblib.load(encoder_path)
+        self._init_scoring()
+
+    @classmethod
+    def from_artifacts(cls, model, encoder):
+        """
+        Builds a ModelInference around already loaded model and encoder objects
+        (used by the model registry to share artifacts across scans).
+        """
+        instance = cls.__new__(cls)
+        instance.model = model
+        instance.encoder = encoder
+        instance._init_scoring()
+        return instance
+
+    def _init_scoring(self):
+        """
+        Detects once, at load time, how this model is scored in a single pass
+        and how its outputs map to label strings.
+        """
+        if hasattr(self.model, "predict_proba"):
+            self.scoring_method = "predict_proba"
+        elif hasattr(self.model, "decision_function") and hasattr(self.model, "classes_"):
+            self.scoring_method = "decision_function"
+        elif hasattr(self.model, "score_samples"):
+            self.scoring_method = "score_samples"
+        else:
+            self.scoring_method = "predict"
+
+        if self.scoring_method == "score_samples":
+            # Outlier detector: columns are [outlier, inlier]
+            self.class_values = np.array([-1, 1])
+            self.class_labels = np.array([OUTLIER_LABELS[-1], OUTLIER_LABELS[1]], dtype=object)
+        else:
+            self.class_values = getattr(self.model, "classes_", None)
+            self.class_labels = None
+            if self.class_values is not None:
+                try:
+                    self.class_labels = self.encoder.inverse_transform(self.class_values)
+                except ValueError:
+                    self.class_labels = np.asarray(self.class_values)
 
     def predict(self, X):
         """
@@ -24,7 +84,44 @@ class ModelInference:
         preds = self.model.predict(X)
         labels = self.encoder.inverse_transform(preds)
         return labels
-    
+
+    def score(self, X):
+        """
+        Scores a batch in a single model pass.
+        Args:
+            X: DataFrame containing preprocessed features.
+        Returns:
+            A tuple of (labels, confidences, probabilities) where probabilities
+            is an (n, n_classes) array ordered like class_labels and confidences
+            is the probability of the predicted class. For decision_function and
+            score_samples models the probabilities are uncalibrated scores
+            mapped to [0, 1].
+        """
+        if self.scoring_method == "predict_proba":
+            probabilities = self.model.predict_proba(X)
+            indices = np.argmax(probabilities, axis=1)
+
+        elif self.scoring_method == "decision_function":
+            decision = self.model.decision_function(X)
+            probabilities = decision_to_proba(decision)
+            indices = (decision > 0).astype(np.intp) if np.ndim(decision) == 1 else np.argmax(decision, axis=1)
+
+        elif self.scoring_method == "score_samples":
+            # score_samples is the negated anomaly score s in (0, 1]; the model
+            # flags an outlier when score_samples - offset_ < 0
+            scores = self.model.score_samples(X)
+            anomaly = np.clip(-scores, 0.0, 1.0)
+            probabilities = np.vstack([anomaly, 1 - anomaly]).T
+            indices = (scores - getattr(self.model, "offset_", -0.5) >= 0).astype(np.intp)
+
+        else:
+            labels = self.predict(X)
+            return labels, np.array([None] * len(labels)), None
+
+        labels = self.class_labels[indices]
+        confidences = probabilities[np.arange(len(indices)), indices]
+        return labels, confidences, probabilities
+
     def predict_with_confidence(self, X):
         """
         Accepts a DataFrame and returns predicted labels with confidence scores.
@@ -33,16 +130,5 @@ class ModelInference:
         Returns:
             A tuple of (labels, confidences) where confidences are probabilities.
         """
-        preds = self.model.predict(X)
-        labels = self.encoder.inverse_transform(preds)
-        
-        try:
-            # Try to get prediction probabilities (works for most classifiers)
-            probabilities = self.model.predict_proba(X)
-            # Confidence is the max probability for each prediction
-            confidences = np.max(probabilities, axis=1)
-        except AttributeError:
-            # Model doesn't support predict_proba
-            confidences = np.array([None] * len(preds))
-        
+        labels, confidences, _ = self.score(X)
         return labels, confidences
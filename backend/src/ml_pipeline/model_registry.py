@@ -0,0 +1,180 @@
+# -----------------------------------------------------------------------------
+# Process-wide registry of the trained artifacts under models/.
+# Each joblib artifact is loaded once (optionally memory-mapped) and shared as a
+# read-only instance by every scan, so stop/start cycles do not reload models
+# from disk. The default model is preloaded in the background at server start,
+# and models no scan is using are evicted (least recently used first) when the
+# loaded models exceed the configured memory budget.
+# -----------------------------------------------------------------------------
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+
+from src.ml_pipeline.preprocessor import Preprocessor
+from src.ml_pipeline.model_inference import ModelInference
+
+# Paths to saved models
+SCALER_PATH = "models/scaler.joblib"
+ENCODER_PATH = "models/label_encoder.joblib"
+RF_MODEL_PATH = "models/rf_model.joblib"
+LR_MODEL_PATH = "models/lr_model.joblib"
+SVM_MODEL_PATH = "models/svm_model.joblib"
+MLP_MODEL_PATH = "models/mlp_model.joblib"
+IF_MODEL_PATH = "models/if_model.joblib"
+
+# Model names sent by the client (start_scan "model" param) -> artifact path
+MODEL_PATHS = {
+    "Random Forest": RF_MODEL_PATH,
+    "Logistic Regression": LR_MODEL_PATH,
+    "Support Vector Machine": SVM_MODEL_PATH,
+    "Multilayer Perceptron": MLP_MODEL_PATH,
+    "Isolation Forest": IF_MODEL_PATH
+}
+DEFAULT_MODEL = "Random Forest"
+
+DEFAULT_MEMORY_BUDGET_MB = 1024
+
+
+def resolve_model_name(model_type) -> str:
+    """Maps a requested model name to a known one, defaulting to Random Forest."""
+    if model_type in MODEL_PATHS:
+        return model_type
+    print(f"Unknown model '{model_type}' selected; defaulting to {DEFAULT_MODEL}.")
+    return DEFAULT_MODEL
+
+
+class ModelRegistry:
+    """
+    Loads model artifacts once and hands out shared, read-only instances.
+
+    Args:
+        memory_budget_mb: Approximate memory budget for loaded models. The
+                          scaler and label encoder are always kept.
+        mmap_mode: Passed to joblib.load (e.g. "r" to memory-map large arrays).
+    """
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, mmap_mode=None):
+        self.memory_budget_mb = memory_budget_mb
+        self.mmap_mode = mmap_mode
+
+        self._lock = threading.Lock()
+        self._load_locks = {}          # Per-model lock so a model is only loaded once
+        self._models = OrderedDict()   # name -> ModelInference, in LRU order
+        self._sizes = {}               # name -> estimated size in bytes
+        self._in_use = {}              # name -> number of scans using it
+        self._preprocessor = None
+        self._encoder = None
+        self._shared_lock = threading.Lock()
+
+    def configure(self, memory_budget_mb=None, mmap_mode=None):
+        """Updates the memory budget and/or joblib mmap mode for future loads."""
+        if memory_budget_mb is not None:
+            self.memory_budget_mb = memory_budget_mb
+        if mmap_mode is not None:
+            self.mmap_mode = mmap_mode or None
+        with self._lock:
+            self._evict()
+
+    def _load(self, path):
+        start = time.time()
+        artifact = joblib.load(path, mmap_mode=self.mmap_mode)
+        print(f"Loaded {path} in {time.time() - start:.2f}s")
+        return artifact
+
+    def get_preprocessor(self) -> Preprocessor:
+        """Returns the shared Preprocessor, loading the scaler on first use."""
+        with self._shared_lock:
+            if self._preprocessor is None:
+                self._preprocessor = Preprocessor.from_scaler(self._load(SCALER_PATH))
+            return self._preprocessor
+
+    def _get_encoder(self):
+        with self._shared_lock:
+            if self._encoder is None:
+                self._encoder = self._load(ENCODER_PATH)
+            return self._encoder
+
+    def _get_model(self, name) -> ModelInference:
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    return self._models[name]
+
+            path = MODEL_PATHS[name]
+            model = ModelInference.from_artifacts(self._load(path), self._get_encoder())
+
+            with self._lock:
+                self._models[name] = model
+                self._sizes[name] = os.path.getsize(path)
+                self._evict()
+            return model
+
+    def acquire(self, model_type) -> ModelInference:
+        """
+        Returns the shared ModelInference for model_type and marks it in use so
+        it cannot be evicted. Every acquire() must be paired with release().
+        """
+        name = resolve_model_name(model_type)
+        with self._lock:
+            self._in_use[name] = self._in_use.get(name, 0) + 1
+        try:
+            return self._get_model(name)
+        except Exception:
+            self.release(name)
+            raise
+
+    def release(self, model_type):
+        """Marks one use of model_type as finished."""
+        name = model_type if model_type in MODEL_PATHS else DEFAULT_MODEL
+        with self._lock:
+            if self._in_use.get(name, 0) > 0:
+                self._in_use[name] -= 1
+            self._evict()
+
+    def preload(self, model_type=DEFAULT_MODEL):
+        """Loads the preprocessor, encoder and model_type ahead of the first scan."""
+        try:
+            self.get_preprocessor()
+            self._get_model(resolve_model_name(model_type))
+        except Exception as e:
+            print(f"Model preload failed: {e}")
+
+    def preload_async(self, model_type=DEFAULT_MODEL) -> threading.Thread:
+        """Runs preload() on a background thread."""
+        thread = threading.Thread(target=self.preload, args=(model_type,), daemon=True)
+        thread.start()
+        return thread
+
+    def loaded_models(self) -> list:
+        """Names of the currently loaded models, least recently used first."""
+        with self._lock:
+            return list(self._models)
+
+    def _evict(self):
+        """Drops unused models (LRU first) while over the memory budget. Caller holds _lock."""
+        budget = self.memory_budget_mb * 1024 * 1024
+        total = sum(self._sizes.get(name, 0) for name in self._models)
+        # The most recently used model is always kept
+        for name in list(self._models)[:-1]:
+            if total <= budget:
+                break
+            if self._in_use.get(name, 0) > 0:
+                continue
+            print(f"Evicting model '{name}' from registry")
+            del self._models[name]
+            total -= self._sizes.pop(name, 0)
+
+
+# Shared registry instance used by the scan service
+registry = ModelRegistry()
@@ -12,6 +12,15 @@ class Preprocessor:
     def __init__(self, scaler_path):
         self.scaler = joblib.load(scaler_path)
 
+    @classmethod
+    def from_scaler(cls, scaler):
+        """
+        Builds a Preprocessor around an already loaded scaler object.
+        """
+        instance = cls.__new__(cls)
+        instance.scaler = scaler
+        return instance
+
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Scales numeric features using the saved scaler.
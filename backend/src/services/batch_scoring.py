@@ -0,0 +1,207 @@
+# ids-project/backend/services/batch_scoring.py
+
+# -----------------------------------------------------------------------------
+# Headless bulk scoring of whole CIC-IDS-2017 CSV files (start_scan
+# mode: "batch", or the batch_score.py CLI).
+# Unlike replay mode there is no per-flow work at all: the CSV is streamed in
+# large column-pruned chunks, each chunk is scaled and scored with one
+# vectorized call, and ground-truth labels are accumulated into a confusion
+# matrix. The result is a single summary (throughput, confusion matrix,
+# per-class metrics), optionally with a predictions CSV written alongside.
+# -----------------------------------------------------------------------------
+
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.ml_pipeline.compiled_scorer import CompiledScorer
+from src.ml_pipeline.feature_mapping import DATASET_FEATURES
+from src.ml_pipeline.flow_replay import replay_blocks_from_csv
+from src.services.classification_metrics import ClassificationMetrics
+from src.services.flow_record import LabelTable
+from src.services.scan_log import LOG_DIR
+
+DEFAULT_BATCH_CHUNK_ROWS = 262144   # CSV rows parsed and scored per call
+PROGRESS_EVENT = "batch_progress"
+
+
+def _write_predictions(path, block, valid, predicted, confidences, header):
+    """Appends one chunk of predictions (row, predicted_label, confidence, true_label)."""
+    n = len(block)
+    labels = np.full(n, "", dtype=object)
+    labels[valid] = predicted
+    conf = np.full(n, np.nan)
+    if confidences is not None and len(confidences) and confidences[0] is not None:
+        conf[valid] = np.asarray(confidences, dtype=np.float64)
+
+    frame = {"row": np.arange(block.start_row, block.start_row + n)}
+    if "Flow ID" in block.columns:
+        frame["flow_id"] = block.columns["Flow ID"]
+    frame["predicted_label"] = labels
+    frame["confidence"] = conf
+    if block.labels is not None:
+        frame["true_label"] = block.labels
+    pd.DataFrame(frame).to_csv(path, mode="w" if header else "a", header=header, index=False,
+                               float_format="%.6g")
+
+
+def run_batch_scoring(params, preprocessor, model, emit=None, should_stop=None,
+                      output_dir=LOG_DIR, predictions_path=None) -> dict:
+    """
+    Scores a whole CSV file in large vectorized chunks.
+
+    Args:
+        params: start_scan parameters; uses csv_path, model, chunk_rows,
+                max_flows, start_row, end_row, compiled, write_predictions
+                (bool) and run_id (appended to the output file names, e.g.
+                the scan session id). Output locations are never taken from
+                params, since those come from Socket.IO clients.
+        preprocessor: Loaded Preprocessor.
+        model: Loaded ModelInference.
+        emit: Optional Socket.IO emitter for batch_progress events.
+        should_stop: Optional callable; scoring stops early when it returns True.
+        output_dir: Directory for the summary (and default predictions) file.
+        predictions_path: Explicit predictions CSV path (CLI only).
+
+    Returns:
+        The summary dict (also written to <output_dir>/batch_<ts>.json).
+
+    Raises:
+        ValueError, FileNotFoundError: Invalid parameters or unreadable CSV.
+    """
+    csv_path = params.get("csv_path")
+    if not csv_path:
+        raise ValueError("Missing csv_path parameter")
+    chunk_rows = int(params.get("chunk_rows", DEFAULT_BATCH_CHUNK_ROWS))
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be positive")
+
+    started = time.time()
+    stamp = datetime.fromtimestamp(started).strftime('%Y%m%d_%H%M%S')
+    if params.get("run_id"):
+        stamp = f"{stamp}_{params['run_id']}"
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, f"batch_{stamp}.json")
+    if predictions_path is None and params.get("write_predictions", False):
+        predictions_path = os.path.join(output_dir, f"batch_{stamp}.predictions.csv")
+
+    # Optionally fuse scaling and prediction; verified on the first chunk
+    scorer = None
+    scorer_report = None
+    if params.get("compiled", False):
+        try:
+            scorer = CompiledScorer(preprocessor, model)
+        except Exception as e:
+            scorer_report = {"match": False, "error": str(e)}
+
+    label_table = LabelTable(model.class_labels if model.class_labels is not None else ())
+    metrics = ClassificationMetrics(label_table)
+
+    rows = 0
+    scored = 0
+    skipped = 0        # Rows with NaN/Infinity features (not scored)
+    chunks = 0
+    read_seconds = 0.0
+    score_seconds = 0.0
+    write_seconds = 0.0
+    stopped = False
+
+    blocks = iter(replay_blocks_from_csv(
+        csv_path=csv_path,
+        block_size=chunk_rows,
+        delay_ms=0,
+        max_flows=params.get("max_flows"),
+        start_row=params.get("start_row"),
+        end_row=params.get("end_row"),
+        chunk_size=chunk_rows
+    ))
+
+    while True:
+        if should_stop is not None and should_stop():
+            stopped = True
+            break
+
+        start = time.perf_counter()
+        block = next(blocks, None)
+        read_seconds += time.perf_counter() - start
+        if block is None:
+            break
+
+        start = time.perf_counter()
+        features = block.features
+        valid = np.isfinite(features).all(axis=1)
+        if not valid.all():
+            features = features[valid]
+
+        predicted, confidences = np.array([], dtype=object), None
+        if len(features):
+            if scorer is not None and scorer_report is None:
+                try:
+                    scorer_report = scorer.verify(features[:1024])
+                except Exception as e:
+                    scorer_report = {"kind": scorer.kind, "match": False, "error": str(e)}
+                if not scorer_report["match"]:
+                    scorer = None
+
+            if scorer is not None:
+                predicted, confidences, _ = scorer.score(features)
+            else:
+                df = pd.DataFrame(features, columns=DATASET_FEATURES, copy=False)
+                predicted, confidences, _ = model.score(preprocessor.transform(df))
+
+        if block.labels is not None and len(predicted):
+            metrics.update(metrics.codes(block.labels[valid]), metrics.codes(predicted))
+        score_seconds += time.perf_counter() - start
+
+        if predictions_path:
+            start = time.perf_counter()
+            _write_predictions(predictions_path, block, valid, predicted, confidences, header=chunks == 0)
+            write_seconds += time.perf_counter() - start
+
+        chunks += 1
+        rows += len(block)
+        scored += int(valid.sum())
+        skipped += len(block) - int(valid.sum())
+
+        if emit is not None:
+            elapsed = time.time() - started
+            emit(PROGRESS_EVENT, {
+                "rows": rows,
+                "chunks": chunks,
+                "elapsed_seconds": round(elapsed, 2),
+                "throughput_flows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0
+            })
+
+    duration = time.time() - started
+    summary = {
+        "mode": "batch",
+        "csv_path": csv_path,
+        "model_type": params.get("model", "randomForest"),
+        "start_time": datetime.fromtimestamp(started).isoformat(),
+        "end_time": datetime.fromtimestamp(started + duration).isoformat(),
+        "duration_seconds": round(duration, 3),
+        "stopped_early": stopped,
+        "total_flows": rows,
+        "scored_flows": scored,
+        "skipped_non_finite": skipped,
+        "chunks": chunks,
+        "chunk_rows": chunk_rows,
+        "throughput_flows_per_second": round(rows / duration, 1) if duration > 0 else 0.0,
+        "timing": {
+            "read_seconds": round(read_seconds, 3),
+            "score_seconds": round(score_seconds, 3),
+            "write_seconds": round(write_seconds, 3)
+        },
+        "compiled_scorer": scorer_report,
+        "metrics": metrics.snapshot(),
+        "predictions_path": predictions_path,
+        "summary_path": summary_path
+    }
+
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
@@ -0,0 +1,144 @@
+# ids-project/backend/services/classification_metrics.py
+
+# -----------------------------------------------------------------------------
+# Incremental classification metrics for scans with ground truth (replay and
+# batch modes). Predictions are accumulated batch by batch into a confusion
+# matrix indexed by LabelTable codes, so memory is O(classes^2) regardless of
+# the number of flows. Precision/recall/F1 per class and macro/weighted
+# averages are derived from the matrix when a snapshot is requested.
+# -----------------------------------------------------------------------------
+
+import numpy as np
+
+from src.services.flow_record import LabelTable
+
+
+class ClassificationMetrics:
+    """
+    Streaming confusion matrix over the codes of a LabelTable.
+
+    Args:
+        label_table: Scan-wide LabelTable (e.g. seeded with the label
+                     encoder's classes). Labels added to it later, such as
+                     ground-truth classes the model never predicts, grow the
+                     matrix on the next update.
+    """
+
+    def __init__(self, label_table=None):
+        self.label_table = label_table if label_table is not None else LabelTable()
+        size = len(self.label_table.labels)
+        self.matrix = np.zeros((size, size), dtype=np.int64)   # [true, predicted]
+
+    def _grow(self, size):
+        if size > self.matrix.shape[0]:
+            grown = np.zeros((size, size), dtype=np.int64)
+            n = self.matrix.shape[0]
+            grown[:n, :n] = self.matrix
+            self.matrix = grown
+
+    def codes(self, labels) -> np.ndarray:
+        """Maps an array of label strings to codes (one lookup per distinct label)."""
+        labels = np.asarray(labels, dtype=object)
+        if labels.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        uniques, inverse = np.unique(labels.astype(str), return_inverse=True)
+        lookup = np.array([self.label_table.code(label) for label in uniques], dtype=np.int64)
+        return lookup[inverse]
+
+    def update(self, true_codes, predicted_codes):
+        """
+        Adds a batch of (true, predicted) code pairs. Pairs whose true label is
+        missing (negative code) are ignored.
+        """
+        true_codes = np.asarray(true_codes, dtype=np.int64)
+        predicted_codes = np.asarray(predicted_codes, dtype=np.int64)
+        keep = (true_codes >= 0) & (predicted_codes >= 0)
+        if not keep.all():
+            true_codes = true_codes[keep]
+            predicted_codes = predicted_codes[keep]
+        if true_codes.size == 0:
+            return
+
+        size = len(self.label_table.labels)
+        self._grow(size)
+        size = self.matrix.shape[0]
+        counts = np.bincount(true_codes * size + predicted_codes, minlength=size * size)
+        self.matrix += counts.reshape(size, size)
+
+    def add(self, true_code, predicted_code):
+        """Adds a single (true, predicted) pair."""
+        if true_code < 0 or predicted_code < 0:
+            return
+        if max(true_code, predicted_code) >= self.matrix.shape[0]:
+            self._grow(len(self.label_table.labels))
+        self.matrix[true_code, predicted_code] += 1
+
+    @property
+    def total(self) -> int:
+        return int(self.matrix.sum())
+
+    @property
+    def correct(self) -> int:
+        return int(np.trace(self.matrix))
+
+    def snapshot(self) -> dict:
+        """
+        Current metrics. Classes that never occur as either a true or a
+        predicted label are left out.
+
+        Returns:
+            {"total", "correct", "accuracy", "labels", "confusion_matrix",
+            "per_class": {label: {precision, recall, f1, support}},
+            "macro_avg", "weighted_avg"}
+        """
+        matrix = self.matrix
+        support = matrix.sum(axis=1)
+        predicted = matrix.sum(axis=0)
+        active = np.flatnonzero((support > 0) | (predicted > 0))
+        matrix = matrix[np.ix_(active, active)]
+        support = support[active]
+        predicted = predicted[active]
+        true_positive = np.diag(matrix)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predicted > 0, true_positive / predicted, 0.0)
+            recall = np.where(support > 0, true_positive / support, 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+        labels = [self.label_table.label(int(code)) for code in active]
+        total = int(support.sum())
+        correct = int(true_positive.sum())
+
+        # Averages over the classes present in the ground truth
+        present = support > 0
+        weights = support / total if total else support * 0.0
+
+        def average(values):
+            return round(float(values[present].mean()), 4) if present.any() else 0.0
+
+        return {
+            "total": total,
+            "correct": correct,
+            "accuracy": round(correct / total, 4) if total else 0.0,
+            "labels": labels,
+            "confusion_matrix": matrix.tolist(),
+            "per_class": {
+                label: {
+                    "precision": round(float(precision[i]), 4),
+                    "recall": round(float(recall[i]), 4),
+                    "f1": round(float(f1[i]), 4),
+                    "support": int(support[i])
+                }
+                for i, label in enumerate(labels)
+            },
+            "macro_avg": {
+                "precision": average(precision),
+                "recall": average(recall),
+                "f1": average(f1)
+            },
+            "weighted_avg": {
+                "precision": round(float((precision * weights).sum()), 4),
+                "recall": round(float((recall * weights).sum()), 4),
+                "f1": round(float((f1 * weights).sum()), 4)
+            }
+        }
@@ -0,0 +1,143 @@
+# ids-project/backend/services/flow_record.py
+
+# -----------------------------------------------------------------------------
+# Compact per-flow result record used by the scan loop.
+# FlowResult keeps numeric fields as plain numbers in __slots__ (no per-flow
+# dicts) and labels as small int codes into a scan-wide LabelTable. Records
+# are only turned into dicts at the output edge: the JSON network_data
+# payload, the NDJSON scan log, the log store and the packed wire format each
+# read the fields they need.
+# -----------------------------------------------------------------------------
+
+from datetime import datetime
+
+MISSING_LABEL = -1
+
+
+class LabelTable:
+    """
+    Scan-wide dictionary of label strings to int codes (append-only).
+
+    Args:
+        labels: Initial labels (e.g. the model's class labels), coded in order.
+    """
+
+    def __init__(self, labels=()):
+        self.labels = []
+        self._codes = {}
+        for label in labels:
+            self.code(label)
+
+    def code(self, label) -> int:
+        """Returns the code of label, adding it if new. None -> MISSING_LABEL."""
+        if label is None:
+            return MISSING_LABEL
+        code = self._codes.get(label)
+        if code is None:
+            label = str(label)
+            code = self._codes.get(label)
+            if code is None:
+                code = len(self.labels)
+                self._codes[label] = code
+                self.labels.append(label)
+        return code
+
+    def label(self, code):
+        """Returns the label string for code, or None for MISSING_LABEL."""
+        return self.labels[code] if code >= 0 else None
+
+
+class FlowResult:
+    """
+    Result of scoring one flow.
+
+    Args:
+        flow_number: Sequential flow number in the scan.
+        timestamp: Unix time the result was produced.
+        predicted_label: LabelTable code of the predicted label.
+        confidence: Prediction confidence or None.
+        inference_latency: Seconds from flow arrival to scored batch.
+        throughput: Packets per second since the previous flow.
+        cpu_usage_percent: CPU usage at the time of the flow.
+        memory_usage_percent: Memory usage at the time of the flow.
+        flow: Source flow object; connection details are copied from it.
+        true_label: LabelTable code of the ground-truth label (replay only).
+    """
+
+    __slots__ = (
+        "flow_number", "timestamp", "predicted_label", "confidence",
+        "inference_latency", "throughput", "cpu_usage_percent", "memory_usage_percent",
+        "src_ip", "dst_ip", "src_port", "dst_port", "protocol",
+        "bidirectional_packets", "bidirectional_bytes", "duration_ms",
+        "interface", "true_label"
+    )
+
+    def __init__(
+        self,
+        flow_number,
+        timestamp,
+        predicted_label,
+        confidence,
+        inference_latency,
+        throughput,
+        cpu_usage_percent,
+        memory_usage_percent,
+        flow,
+        true_label=MISSING_LABEL
+    ):
+        self.flow_number = flow_number
+        self.timestamp = timestamp
+        self.predicted_label = predicted_label
+        self.confidence = confidence
+        self.inference_latency = inference_latency
+        self.throughput = throughput
+        self.cpu_usage_percent = cpu_usage_percent
+        self.memory_usage_percent = memory_usage_percent
+        self.src_ip = getattr(flow, 'src_ip', 'N/A')
+        self.dst_ip = getattr(flow, 'dst_ip', 'N/A')
+        self.src_port = getattr(flow, 'src_port', 0)
+        self.dst_port = getattr(flow, 'dst_port', 0)
+        self.protocol = getattr(flow, 'protocol', 0)
+        self.bidirectional_packets = getattr(flow, 'bidirectional_packets', 0)
+        self.bidirectional_bytes = getattr(flow, 'bidirectional_bytes', 0)
+        self.duration_ms = getattr(flow, 'bidirectional_duration_ms', 0)
+        self.interface = getattr(flow, 'interface', None)   # Set for multi-interface capture
+        self.true_label = true_label
+
+    def to_emit_dict(self, label_table, replay=False) -> dict:
+        """network_data payload for this flow."""
+        data = {
+            "flow_number": self.flow_number,
+            "predicted_label": label_table.label(self.predicted_label),
+            "confidence": round(self.confidence, 4) if self.confidence is not None else None,
+            "inference_latency": round(self.inference_latency, 6),
+            "throughput": round(self.throughput, 2),
+            "cpu_usage_percent": round(self.cpu_usage_percent, 1),
+            "memory_usage_percent": round(self.memory_usage_percent, 1)
+        }
+        if self.interface is not None:
+            data["interface"] = self.interface
+        if replay:
+            data["true_label"] = label_table.label(self.true_label)
+        return data
+
+    def to_log_dict(self, label_table, replay=False) -> dict:
+        """Scan log record for this flow (network_data fields plus flow details)."""
+        data = self.to_emit_dict(label_table)
+        data = {
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+            **data,
+            "flow_details": {
+                "src_ip": self.src_ip,
+                "dst_ip": self.dst_ip,
+                "src_port": self.src_port,
+                "dst_port": self.dst_port,
+                "protocol": self.protocol,
+                "bidirectional_packets": self.bidirectional_packets,
+                "bidirectional_bytes": self.bidirectional_bytes,
+                "duration_ms": self.duration_ms
+            }
+        }
+        if replay:
+            data["true_label"] = label_table.label(self.true_label)
+        return data
@@ -0,0 +1,441 @@
+# ids-project/backend/services/log_store.py
+
+# -----------------------------------------------------------------------------
+# Columnar on-disk store of scan records with indexes, queried through the
+# query_logs / list_scan_logs socket events.
+#
+# Every scan writes one segment directory under logs/store/<scan_id>/:
+#   - one raw little-endian file per column (fixed-width numbers; labels and
+#     IP addresses as int32 dictionary codes, -1 = missing),
+#   - one append-only <column>.vocab file per dictionary column (one JSON
+#     string per line, line n = code n),
+#   - manifest.json with row count, time range and how many entries (and
+#     bytes) of each .vocab file are published.
+# Rows are appended in arrival order, so the timestamp column is sorted and
+# time filters are binary searches. When the scan ends, an inverted index
+# (row ids grouped by code, CSR layout) is written for predicted_label,
+# src_ip and dst_ip. Queries memory-map only the columns they touch and only
+# decode the rows of the requested page.
+# -----------------------------------------------------------------------------
+
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+STORE_DIR = "logs/store"
+STORE_VERSION = 2
+DEFAULT_FLUSH_ROWS = 1024
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_MANIFEST = "manifest.json"
+
+# Fixed-width numeric columns -> on-disk dtype
+NUMERIC_COLUMNS = {
+    "timestamp": "<f8",
+    "flow_number": "<u4",
+    "confidence": "<f4",
+    "inference_latency": "<f4",
+    "src_port": "<i4",
+    "dst_port": "<i4",
+    "protocol": "<i4",
+    "bidirectional_packets": "<i8",
+    "bidirectional_bytes": "<i8",
+    "duration_ms": "<f8"
+}
+# Dictionary-encoded string columns (int32 codes)
+DICT_COLUMNS = ("predicted_label", "true_label", "src_ip", "dst_ip")
+# Dictionary columns with an inverted index
+INDEXED_COLUMNS = ("predicted_label", "src_ip", "dst_ip")
+
+
+def _write_manifest(segment_dir, manifest):
+    """Atomically replaces the segment manifest."""
+    path = os.path.join(segment_dir, _MANIFEST)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+class LogStoreWriter:
+    """
+    Appends scan records to a new store segment.
+
+    Args:
+        scan_id: Segment name (e.g. the scan log's base name).
+        info: Scan-level fields kept in the manifest (mode, model, ...).
+        store_dir: Root directory of the store.
+        flush_rows: Rows buffered in memory before they are appended to disk.
+    """
+
+    def __init__(self, scan_id, info, store_dir=STORE_DIR, flush_rows=DEFAULT_FLUSH_ROWS):
+        os.makedirs(store_dir, exist_ok=True)
+
+        # Never reuse an existing segment (e.g. two scans started in the same second)
+        segment_id, suffix = scan_id, 1
+        while os.path.exists(os.path.join(store_dir, segment_id)):
+            suffix += 1
+            segment_id = f"{scan_id}_{suffix}"
+        self.scan_id = segment_id
+        self.segment_dir = os.path.join(store_dir, segment_id)
+        os.makedirs(self.segment_dir)
+
+        self.flush_rows = max(1, flush_rows)
+        self.num_rows = 0
+        self._buffers = {name: [] for name in list(NUMERIC_COLUMNS) + list(DICT_COLUMNS)}
+        self._vocabs = {name: [] for name in DICT_COLUMNS}
+        self._lookups = {name: {} for name in DICT_COLUMNS}
+        self._files = {
+            name: open(os.path.join(self.segment_dir, f"{name}.col"), "ab")
+            for name in self._buffers
+        }
+        # New dictionary entries are appended to the .vocab sidecars on each
+        # flush, so the manifest stays small however many values a scan sees
+        self._vocab_files = {
+            name: open(os.path.join(self.segment_dir, f"{name}.vocab"), "ab")
+            for name in DICT_COLUMNS
+        }
+        self._vocab_state = {name: {"count": 0, "bytes": 0} for name in DICT_COLUMNS}
+        self._manifest = {
+            "version": STORE_VERSION,
+            "scan_id": self.scan_id,
+            "info": info,
+            "num_rows": 0,
+            "start_time": None,
+            "end_time": None,
+            "complete": False,
+            "indexed": False,
+            "vocabs": self._vocab_state
+        }
+        _write_manifest(self.segment_dir, self._manifest)
+
+    def _code(self, name, value) -> int:
+        if value is None or value == "N/A":
+            return -1
+        value = str(value)
+        code = self._lookups[name].get(value)
+        if code is None:
+            code = len(self._vocabs[name])
+            self._lookups[name][value] = code
+            self._vocabs[name].append(value)
+        return code
+
+    def append(self, result, label_table):
+        """
+        Buffers one flow result.
+        Args:
+            result: FlowResult record.
+            label_table: The scan's LabelTable (decodes the result's labels).
+        """
+        buffers = self._buffers
+        for name, dtype in NUMERIC_COLUMNS.items():
+            value = getattr(result, name)
+            buffers[name].append(np.nan if value is None and dtype[1] == "f" else (value or 0))
+        buffers["predicted_label"].append(self._code("predicted_label", label_table.label(result.predicted_label)))
+        buffers["true_label"].append(self._code("true_label", label_table.label(result.true_label)))
+        buffers["src_ip"].append(self._code("src_ip", result.src_ip))
+        buffers["dst_ip"].append(self._code("dst_ip", result.dst_ip))
+
+        if len(buffers["timestamp"]) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """Appends buffered rows to the column files and publishes them in the manifest."""
+        rows = len(self._buffers["timestamp"])
+        if rows == 0:
+            return
+
+        for name, values in self._buffers.items():
+            dtype = NUMERIC_COLUMNS.get(name, "<i4")
+            self._files[name].write(np.asarray(values, dtype=dtype).tobytes())
+            self._files[name].flush()
+
+        for name, state in self._vocab_state.items():
+            added = self._vocabs[name][state["count"]:]
+            if added:
+                data = "".join(json.dumps(value) + "\n" for value in added).encode("utf-8")
+                self._vocab_files[name].write(data)
+                self._vocab_files[name].flush()
+                state["count"] += len(added)
+                state["bytes"] += len(data)
+
+        if self._manifest["start_time"] is None:
+            self._manifest["start_time"] = self._buffers["timestamp"][0]
+        self._manifest["end_time"] = self._buffers["timestamp"][-1]
+        self.num_rows += rows
+        self._manifest["num_rows"] = self.num_rows
+        _write_manifest(self.segment_dir, self._manifest)
+
+        for values in self._buffers.values():
+            values.clear()
+
+    def close(self):
+        """Flushes remaining rows and builds the inverted indexes."""
+        self.flush()
+        for f in list(self._files.values()) + list(self._vocab_files.values()):
+            f.close()
+
+        for name in INDEXED_COLUMNS:
+            codes = _read_column(self.segment_dir, name, "<i4", self.num_rows)
+            # Row ids grouped by code; offsets[c]:offsets[c + 1] are the rows of code c
+            order = np.argsort(codes, kind="stable").astype("<i4")
+            offsets = np.searchsorted(codes[order], np.arange(len(self._vocabs[name]) + 1)).astype("<i8")
+            order.tofile(os.path.join(self.segment_dir, f"{name}.rows"))
+            offsets.tofile(os.path.join(self.segment_dir, f"{name}.offsets"))
+
+        self._manifest["complete"] = True
+        self._manifest["indexed"] = True
+        _write_manifest(self.segment_dir, self._manifest)
+
+
+def _read_column(segment_dir, name, dtype, num_rows):
+    """Memory-maps the first num_rows values of a column file."""
+    if num_rows == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(os.path.join(segment_dir, f"{name}.col"), dtype=dtype, mode="r", shape=(num_rows,))
+
+
+def _read_vocab(segment_dir, name, state, previous=None) -> list:
+    """
+    Reads the published part of a .vocab file. When previous (the same
+    dictionary as of an older manifest) is given, only the entries appended
+    since then are read.
+    """
+    vocab, start = [], 0
+    if previous is not None and previous[1] <= state["bytes"]:
+        vocab, start = list(previous[0]), previous[1]
+    if state["bytes"] > start:
+        with open(os.path.join(segment_dir, f"{name}.vocab"), "rb") as f:
+            f.seek(start)
+            data = f.read(state["bytes"] - start)
+        vocab.extend(json.loads(line) for line in data.decode("utf-8").splitlines())
+    return vocab
+
+
+class _Segment:
+    """Read-only view of one store segment as of its manifest."""
+
+    def __init__(self, segment_dir, manifest, previous=None):
+        self.segment_dir = segment_dir
+        self.manifest = manifest
+        self.scan_id = manifest["scan_id"]
+        self.num_rows = manifest["num_rows"]
+        self.indexed = manifest["indexed"]
+        self.vocabs = {}
+        self._vocab_bytes = {}
+        for name, state in manifest["vocabs"].items():
+            if isinstance(state, list):
+                # Version 1 segments keep their dictionaries in the manifest
+                self.vocabs[name] = state
+                continue
+            cached = None
+            if previous is not None and name in previous._vocab_bytes:
+                cached = (previous.vocabs[name], previous._vocab_bytes[name])
+            self.vocabs[name] = _read_vocab(segment_dir, name, state, cached)
+            self._vocab_bytes[name] = state["bytes"]
+        self._codes = {name: {value: code for code, value in enumerate(vocab)} for name, vocab in self.vocabs.items()}
+        self._columns = {}
+
+    def column(self, name):
+        if name not in self._columns:
+            dtype = NUMERIC_COLUMNS.get(name, "<i4")
+            self._columns[name] = _read_column(self.segment_dir, name, dtype, self.num_rows)
+        return self._columns[name]
+
+    def _rows_for_codes(self, name, codes, lo, hi):
+        """Sorted row ids in [lo, hi) whose name column has one of codes."""
+        if not codes or lo >= hi:
+            return np.zeros(0, dtype=np.int64)
+        if self.indexed:
+            rows = np.memmap(os.path.join(self.segment_dir, f"{name}.rows"), dtype="<i4", mode="r")
+            offsets = np.fromfile(os.path.join(self.segment_dir, f"{name}.offsets"), dtype="<i8")
+            parts = [rows[offsets[c]:offsets[c + 1]] for c in codes]
+            selected = np.sort(np.concatenate(parts)).astype(np.int64) if len(parts) > 1 else np.asarray(parts[0], dtype=np.int64)
+            return selected[(selected >= lo) & (selected < hi)]
+        values = self.column(name)[lo:hi]
+        return np.flatnonzero(np.isin(values, codes)) + lo
+
+    def match(self, query) -> np.ndarray:
+        """Row ids matching the query filters, in ascending order."""
+        timestamps = self.column("timestamp")
+        lo, hi = 0, self.num_rows
+        if query["start_time"] is not None:
+            lo = int(np.searchsorted(timestamps, query["start_time"], side="left"))
+        if query["end_time"] is not None:
+            hi = int(np.searchsorted(timestamps, query["end_time"], side="right"))
+        if lo >= hi:
+            return np.zeros(0, dtype=np.int64)
+
+        rows = None
+        for name, values in (("predicted_label", query["labels"]), ("src_ip", query["src_ip"]), ("dst_ip", query["dst_ip"])):
+            if values is None:
+                continue
+            codes = [self._codes[name][v] for v in values if v in self._codes[name]]
+            matched = self._rows_for_codes(name, codes, lo, hi)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+
+        if query["ip"] is not None:
+            either = np.union1d(
+                self._rows_for_codes("src_ip", [self._codes["src_ip"][v] for v in query["ip"] if v in self._codes["src_ip"]], lo, hi),
+                self._rows_for_codes("dst_ip", [self._codes["dst_ip"][v] for v in query["ip"] if v in self._codes["dst_ip"]], lo, hi)
+            )
+            rows = either if rows is None else np.intersect1d(rows, either, assume_unique=True)
+
+        if rows is None:
+            rows = np.arange(lo, hi, dtype=np.int64)
+        return rows
+
+    def records(self, rows) -> list:
+        """Decodes the given rows into record dicts."""
+        columns = {name: self.column(name)[rows] for name in list(NUMERIC_COLUMNS) + list(DICT_COLUMNS)}
+        records = []
+        for i in range(len(rows)):
+            record = {"scan_id": self.scan_id}
+            for name, dtype in NUMERIC_COLUMNS.items():
+                value = columns[name][i].item()
+                if dtype == "<f4":
+                    value = None if np.isnan(value) else round(value, 6)
+                elif isinstance(value, float) and np.isnan(value):
+                    value = None
+                record[name] = value
+            record["timestamp"] = datetime.fromtimestamp(record["timestamp"]).isoformat()
+            for name in DICT_COLUMNS:
+                code = int(columns[name][i])
+                record[name] = self.vocabs[name][code] if code >= 0 else None
+            records.append(record)
+        return records
+
+
+class LogStore:
+    """Read side of the store; caches segment views by manifest version."""
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self._segments = {}
+        self._lock = threading.Lock()
+
+    def segments(self) -> list:
+        """All segments, newest scan first."""
+        if not os.path.isdir(self.store_dir):
+            return []
+
+        segments = []
+        with self._lock:
+            for name in os.listdir(self.store_dir):
+                manifest_path = os.path.join(self.store_dir, name, _MANIFEST)
+                try:
+                    mtime = os.stat(manifest_path).st_mtime_ns
+                except OSError:
+                    continue
+                cached = self._segments.get(name)
+                if cached is None or cached[0] != mtime:
+                    try:
+                        with open(manifest_path, "r") as f:
+                            manifest = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+                    previous = cached[1] if cached is not None else None
+                    cached = (mtime, _Segment(os.path.join(self.store_dir, name), manifest, previous))
+                    self._segments[name] = cached
+                segments.append(cached[1])
+
+        segments.sort(key=lambda s: s.manifest["start_time"] or 0, reverse=True)
+        return segments
+
+    def list_scans(self) -> list:
+        """Summary of every stored scan, newest first."""
+        return [{
+            "scan_id": s.scan_id,
+            "flows": s.num_rows,
+            "start_time": datetime.fromtimestamp(s.manifest["start_time"]).isoformat() if s.manifest["start_time"] else None,
+            "end_time": datetime.fromtimestamp(s.manifest["end_time"]).isoformat() if s.manifest["end_time"] else None,
+            "complete": s.manifest["complete"],
+            "labels": s.vocabs["predicted_label"],
+            **s.manifest["info"]
+        } for s in self.segments()]
+
+    def query(self, params) -> dict:
+        """
+        Filters records across scans, newest first, and returns one page.
+        Args:
+            params: Dict with optional filters scan_ids, start_time, end_time
+                    (ISO strings or Unix timestamps), labels, src_ip, dst_ip,
+                    ip (either side; each a value or list) and offset/limit.
+        Returns:
+            Dict with the normalized query, total match count and records.
+        """
+        query = _normalize_query(params)
+
+        counts = []
+        for segment in self.segments():
+            if query["scan_ids"] is not None and segment.scan_id not in query["scan_ids"]:
+                continue
+            rows = segment.match(query)
+            if len(rows):
+                counts.append((segment, rows))
+
+        total = sum(len(rows) for _, rows in counts)
+        records = []
+        skip, remaining = query["offset"], query["limit"]
+        for segment, rows in counts:
+            if remaining <= 0:
+                break
+            if skip >= len(rows):
+                skip -= len(rows)
+                continue
+            # Newest first within a scan
+            page_rows = rows[::-1][skip:skip + remaining]
+            skip = 0
+            remaining -= len(page_rows)
+            records.extend(segment.records(np.sort(page_rows))[::-1])
+
+        return {
+            "query": {k: v for k, v in query.items() if v is not None},
+            "total": int(total),
+            "offset": query["offset"],
+            "limit": query["limit"],
+            "records": records
+        }
+
+
+def _to_timestamp(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _to_list(value):
+    if value is None:
+        return None
+    return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
+
+
+def _normalize_query(params) -> dict:
+    """Validates query params; raises ValueError on bad input."""
+    try:
+        offset = max(0, int(params.get("offset", 0)))
+        limit = min(MAX_PAGE_SIZE, max(1, int(params.get("limit", DEFAULT_PAGE_SIZE))))
+        start_time = _to_timestamp(params.get("start_time"))
+        end_time = _to_timestamp(params.get("end_time"))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid log query: {e}")
+
+    return {
+        "scan_ids": _to_list(params.get("scan_ids")),
+        "start_time": start_time,
+        "end_time": end_time,
+        "labels": _to_list(params.get("labels", params.get("label"))),
+        "src_ip": _to_list(params.get("src_ip")),
+        "dst_ip": _to_list(params.get("dst_ip")),
+        "ip": _to_list(params.get("ip")),
+        "offset": offset,
+        "limit": limit
+    }
+
+
+# Shared reader used by the websocket handlers
+log_store = LogStore()
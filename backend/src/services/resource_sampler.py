@@ -0,0 +1,179 @@
+# ids-project/backend/services/resource_sampler.py
+
+# -----------------------------------------------------------------------------
+# Samples the resource usage of the IDS backend process itself, including its
+# child processes (inference workers, NFStream meters), on a background
+# thread at a configurable rate.
+# Each sample is published as an immutable ResourceSnapshot by swapping a
+# single reference, so readers (the scan loop, once per flow) never take a
+# lock: they read sampler.snapshot and get a consistent sample.
+# -----------------------------------------------------------------------------
+
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import psutil
+
+DEFAULT_SAMPLE_INTERVAL_MS = 1000
+
+
+class ResourceSnapshot(NamedTuple):
+    """One resource sample of the backend process tree (totals over processes)."""
+    time: float = 0.0
+    cpu_percent: float = 0.0           # Share of total machine CPU since the previous sample
+    memory_percent: float = 0.0        # RSS as a share of physical memory
+    cpu_user_seconds: float = 0.0
+    cpu_system_seconds: float = 0.0
+    rss_bytes: int = 0
+    processes: int = 0
+    threads: int = 0
+    ctx_switches_voluntary: int = 0
+    ctx_switches_involuntary: int = 0
+    io_read_bytes: Optional[int] = None   # None where the platform has no I/O counters
+    io_write_bytes: Optional[int] = None
+    io_read_count: Optional[int] = None
+    io_write_count: Optional[int] = None
+    # Running figures since the sampler started
+    samples: int = 0
+    cpu_percent_avg: float = 0.0
+    cpu_percent_max: float = 0.0
+    memory_percent_avg: float = 0.0
+    memory_percent_max: float = 0.0
+    rss_peak_bytes: int = 0
+
+
+class ResourceSampler:
+    """
+    Background sampler of this process and its children.
+
+    Args:
+        interval_ms: Time between samples.
+        pid: Process to track (defaults to the current process).
+    """
+
+    def __init__(self, interval_ms=DEFAULT_SAMPLE_INTERVAL_MS, pid=None):
+        self.interval = max(10, interval_ms) / 1000.0
+        self.snapshot = ResourceSnapshot()
+
+        self._process = psutil.Process(pid or os.getpid())
+        self._children = {}          # pid -> psutil.Process, reused across samples
+        self._cpu_count = psutil.cpu_count() or 1
+        self._total_memory = psutil.virtual_memory().total
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._last_time = None
+        self._last_cpu = None
+
+    def start(self):
+        """Takes a first sample and starts the sampling thread."""
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the sampling thread (the last snapshot stays readable)."""
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.interval + 1.0)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception as e:
+                print(f"Resource sampling error: {e}", flush=True)
+
+    def _processes(self) -> list:
+        try:
+            children = self._process.children(recursive=True)
+        except psutil.Error:
+            children = []
+        current = {}
+        for child in children:
+            # Keep the same Process objects so psutil can reuse its caches
+            current[child.pid] = self._children.get(child.pid, child)
+        self._children = current
+        return [self._process] + list(current.values())
+
+    def _sample(self):
+        now = time.time()
+        user = system = 0.0
+        rss = threads = voluntary = involuntary = 0
+        io = [0, 0, 0, 0]
+        io_supported = True
+        count = 0
+
+        for process in self._processes():
+            try:
+                with process.oneshot():
+                    cpu = process.cpu_times()
+                    user += cpu.user
+                    system += cpu.system
+                    rss += process.memory_info().rss
+                    threads += process.num_threads()
+                    switches = process.num_ctx_switches()
+                    voluntary += switches.voluntary
+                    involuntary += switches.involuntary
+                    if io_supported:
+                        try:
+                            counters = process.io_counters()
+                            io[0] += counters.read_bytes
+                            io[1] += counters.write_bytes
+                            io[2] += counters.read_count
+                            io[3] += counters.write_count
+                        except (AttributeError, NotImplementedError, psutil.AccessDenied):
+                            io_supported = False
+                count += 1
+            except psutil.Error:
+                continue  # Process exited between listing and sampling
+
+        cpu_total = user + system
+        cpu_percent = 0.0
+        # The first sample only establishes the CPU time baseline
+        counted = self._last_time is not None
+        if counted and now > self._last_time:
+            # Exited children take their CPU time with them; never go negative
+            delta = max(0.0, cpu_total - self._last_cpu)
+            cpu_percent = min(100.0, delta / (now - self._last_time) / self._cpu_count * 100.0)
+        self._last_time = now
+        self._last_cpu = cpu_total
+
+        memory_percent = rss / self._total_memory * 100.0 if self._total_memory else 0.0
+
+        previous = self.snapshot
+        samples = previous.samples + 1 if counted else 0
+        weight = 1.0 / samples if counted else 1.0
+        self.snapshot = ResourceSnapshot(
+            time=now,
+            cpu_percent=cpu_percent,
+            memory_percent=memory_percent,
+            cpu_user_seconds=user,
+            cpu_system_seconds=system,
+            rss_bytes=rss,
+            processes=count,
+            threads=threads,
+            ctx_switches_voluntary=voluntary,
+            ctx_switches_involuntary=involuntary,
+            io_read_bytes=io[0] if io_supported else None,
+            io_write_bytes=io[1] if io_supported else None,
+            io_read_count=io[2] if io_supported else None,
+            io_write_count=io[3] if io_supported else None,
+            samples=samples,
+            cpu_percent_avg=previous.cpu_percent_avg + (cpu_percent - previous.cpu_percent_avg) * weight,
+            cpu_percent_max=max(previous.cpu_percent_max, cpu_percent),
+            memory_percent_avg=previous.memory_percent_avg + (memory_percent - previous.memory_percent_avg) * weight,
+            memory_percent_max=max(previous.memory_percent_max, memory_percent),
+            rss_peak_bytes=max(previous.rss_peak_bytes, rss)
+        )
+
+    def summary(self) -> dict:
+        """Latest snapshot as a dict, rounded for the scan summary."""
+        snapshot = self.snapshot
+        return {
+            "sample_interval_seconds": self.interval,
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in snapshot._asdict().items()}
+        }
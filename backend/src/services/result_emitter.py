@@ -0,0 +1,109 @@
+# ids-project/backend/services/result_emitter.py
+
+# -----------------------------------------------------------------------------
+# Coalesces per-flow scan results into batched websocket events.
+# Results are buffered and flushed as a single "network_data_batch" event at a
+# fixed frame rate (e.g. 10 Hz) or as soon as the buffer reaches its maximum
+# size, so the client handles a few events per second instead of one per flow.
+# With an encoder (see wire_format.py) batches are sent in its packed format.
+# -----------------------------------------------------------------------------
+
+import threading
+import time
+
+BATCH_EVENT = "network_data_batch"
+DEFAULT_EMIT_RATE_HZ = 10.0
+DEFAULT_EMIT_MAX_BATCH = 256
+
+
+class BatchEmitter:
+    """
+    Buffers per-flow results and emits them in batches.
+
+    Args:
+        emit: Socket.IO emitter (same signature as socketio.emit).
+        rate_hz: Flush frequency while results are pending.
+        max_batch: Buffer size that triggers an immediate flush.
+        event: Name of the batched event.
+        encoder: Optional encoder (e.g. PackedResultEncoder); batches are
+                 emitted as encoder.encode(items) on encoder.event.
+        serialize: Converts a buffered item to its JSON dict when no encoder
+                   is set (items are sent as-is if omitted).
+        latency: Optional LatencyHistogram recording how long each flush
+                 (serialize/encode + emit) takes.
+    """
+
+    def __init__(self, emit, rate_hz=DEFAULT_EMIT_RATE_HZ, max_batch=DEFAULT_EMIT_MAX_BATCH, event=BATCH_EVENT,
+                 encoder=None, serialize=None, latency=None):
+        self._emit = emit
+        self.encoder = encoder
+        self.serialize = serialize
+        self.event = encoder.event if encoder is not None else event
+        self.rate_hz = rate_hz
+        self.max_batch = max(1, int(max_batch))
+        self.latency = latency
+
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()   # Keeps batches in order across threads
+        self._stop = threading.Event()
+
+        self.events_emitted = 0
+        self.flows_emitted = 0
+
+        self._thread = threading.Thread(target=self._run, name="scan-emitter", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        interval = 1.0 / self.rate_hz
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def add(self, item):
+        """Buffers one flow result; flushes immediately when the batch is full."""
+        with self._buffer_lock:
+            self._buffer.append(item)
+            full = len(self._buffer) >= self.max_batch
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Emits all buffered results as one batch event."""
+        with self._flush_lock:
+            with self._buffer_lock:
+                items, self._buffer = self._buffer, []
+            if not items:
+                return
+            start = time.perf_counter_ns()
+            try:
+                if self.encoder is not None:
+                    payload = self.encoder.encode(items)
+                else:
+                    flows = [self.serialize(item) for item in items] if self.serialize else items
+                    payload = {"count": len(items), "flows": flows}
+                self._emit(self.event, payload)
+                self.events_emitted += 1
+                self.flows_emitted += len(items)
+            except Exception as e:
+                print(f"Error emitting {self.event}: {e}", flush=True)
+            if self.latency is not None:
+                self.latency.record(time.perf_counter_ns() - start)
+
+    def close(self):
+        """Stops the flush timer and emits any remaining results."""
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self.flush()
+
+    def stats(self) -> dict:
+        stats = {
+            "mode": "batch",
+            "event": self.event,
+            "rate_hz": self.rate_hz,
+            "max_batch": self.max_batch,
+            "events": self.events_emitted,
+            "flows": self.flows_emitted
+        }
+        if self.encoder is not None:
+            stats["bytes"] = self.encoder.bytes_encoded
+        return stats
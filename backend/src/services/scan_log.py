@@ -0,0 +1,190 @@
+# ids-project/backend/services/scan_log.py
+
+# -----------------------------------------------------------------------------
+# Incremental scan log writer.
+# Flow records are appended to logs/scan_<ts>.ndjson (one JSON object per line)
+# as they are produced instead of being collected in memory and dumped when the
+# scan stops. Files can be gzip- or zstd-compressed and are rotated by size
+# and/or age; every file starts with a header record, and the scan metadata is
+# written as a trailer record at the end of the last file.
+#
+# Record types:
+#   {"type": "header", "part": N, "started": ..., ...header fields}
+#   {"type": "flow", ...flow log fields}
+#   {"type": "metrics", ...classification metrics snapshot (replay only)}
+#   {"type": "trailer", "records": N, "parts": [...], "scan_metadata": {...}}
+# -----------------------------------------------------------------------------
+
+import gzip
+import json
+import os
+import time
+import zlib
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, only needed for compression="zstd"
+    zstandard = None
+
+LOG_DIR = "logs"
+LOG_COMPRESSIONS = ("none", "gzip", "zstd")
+DEFAULT_LOG_ROTATE_MB = 256
+DEFAULT_LOG_FLUSH_SECONDS = 1.0
+
+_EXTENSIONS = {"none": ".ndjson", "gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+
+
+def check_compression(compression):
+    """Raises ValueError if compression is unknown or its library is missing."""
+    if compression not in LOG_COMPRESSIONS:
+        raise ValueError(f"log compression must be one of {LOG_COMPRESSIONS}")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd log compression requires the 'zstandard' package")
+
+
+class _ZstdFile:
+    """Minimal binary writer over a zstandard stream."""
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._stream = zstandard.ZstdCompressor().stream_writer(self._file)
+
+    def write(self, data):
+        self._stream.write(data)
+
+    def flush(self):
+        self._stream.flush(zstandard.FLUSH_BLOCK)
+        self._file.flush()
+
+    def close(self):
+        self._stream.flush(zstandard.FLUSH_FRAME)
+        self._file.close()
+
+
+class _GzipFile:
+    """gzip writer whose flush() makes the data written so far decodable."""
+
+    def __init__(self, path):
+        self._file = gzip.open(path, "wb")
+
+    def write(self, data):
+        self._file.write(data)
+
+    def flush(self):
+        self._file.flush(zlib.Z_SYNC_FLUSH)
+
+    def close(self):
+        self._file.close()
+
+
+def _open(path, compression):
+    if compression == "gzip":
+        return _GzipFile(path)
+    if compression == "zstd":
+        return _ZstdFile(path)
+    return open(path, "wb")
+
+
+class ScanLogWriter:
+    """
+    Appends NDJSON records to rotating, optionally compressed log files.
+
+    Args:
+        base_name: File name stem, e.g. "scan_20250101_120000".
+        header: Fields written in the header record of every file.
+        log_dir: Directory for the log files.
+        compression: "none", "gzip" or "zstd" (requires the zstandard package).
+        rotate_mb: Start a new file after this many uncompressed megabytes
+                   (0 disables size rotation).
+        rotate_minutes: Start a new file after this many minutes
+                        (0 disables time rotation).
+        flush_seconds: Maximum time records stay in the write buffer.
+    """
+
+    def __init__(
+        self,
+        base_name,
+        header,
+        log_dir=LOG_DIR,
+        compression="none",
+        rotate_mb=DEFAULT_LOG_ROTATE_MB,
+        rotate_minutes=0,
+        flush_seconds=DEFAULT_LOG_FLUSH_SECONDS
+    ):
+        check_compression(compression)
+
+        self.base_name = base_name
+        self.header = header
+        self.log_dir = log_dir
+        self.compression = compression
+        self.rotate_bytes = int(rotate_mb * 1024 * 1024) if rotate_mb else 0
+        self.rotate_seconds = rotate_minutes * 60 if rotate_minutes else 0
+        self.flush_seconds = flush_seconds
+
+        self.paths = []
+        self.records = 0
+        self.bytes_written = 0   # Uncompressed bytes across all parts
+
+        self._file = None
+        self._part_bytes = 0
+        self._part_started = 0.0
+        self._last_flush = 0.0
+
+        os.makedirs(log_dir, exist_ok=True)
+        self._open_part()
+
+    def _open_part(self):
+        part = len(self.paths)
+        suffix = f".part{part}" if part else ""
+        path = os.path.join(self.log_dir, f"{self.base_name}{suffix}{_EXTENSIONS[self.compression]}")
+
+        self._file = _open(path, self.compression)
+        self.paths.append(path)
+        self._part_bytes = 0
+        self._part_started = time.time()
+        self._last_flush = self._part_started
+
+        self._write_line({
+            "type": "header",
+            "part": part,
+            "started": datetime.fromtimestamp(self._part_started).isoformat(),
+            **self.header
+        })
+
+    def _write_line(self, record):
+        line = (json.dumps(record, default=str) + "\n").encode("utf-8")
+        self._file.write(line)
+        self._part_bytes += len(line)
+        self.bytes_written += len(line)
+
+    def write(self, record, record_type="flow"):
+        """Appends one record (a flow by default), rotating and flushing as configured."""
+        now = time.time()
+        if (self.rotate_bytes and self._part_bytes >= self.rotate_bytes) or \
+                (self.rotate_seconds and now - self._part_started >= self.rotate_seconds):
+            self._file.close()
+            self._open_part()
+
+        self._write_line({"type": record_type, **record})
+        if record_type == "flow":
+            self.records += 1
+
+        if now - self._last_flush >= self.flush_seconds:
+            self._file.flush()
+            self._last_flush = now
+
+    def close(self, scan_metadata=None):
+        """Writes the trailer record and closes the current file."""
+        if self._file is None:
+            return
+        try:
+            self._write_line({
+                "type": "trailer",
+                "records": self.records,
+                "parts": [os.path.basename(path) for path in self.paths],
+                "scan_metadata": scan_metadata
+            })
+        finally:
+            self._file.close()
+            self._file = None
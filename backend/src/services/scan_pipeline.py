@@ -0,0 +1,238 @@
+# ids-project/backend/services/scan_pipeline.py
+
+# -----------------------------------------------------------------------------
+# Staged execution for the scan service. Each stage (capture -> map -> score)
+# runs on its own thread and hands work to the next stage through a bounded
+# queue; the thread iterating ScanPipeline.results() acts as the final (emit)
+# stage. A slow consumer therefore only fills the queues in front of it instead
+# of directly stalling flow capture, and a full queue pushes back on the stage
+# feeding it.
+#
+# Per-stage counters (items, flows, busy/blocked/starved time) and per-queue
+# depth statistics are collected for the scan summary.
+# -----------------------------------------------------------------------------
+
+import queue
+import threading
+import time
+
+DEFAULT_QUEUE_SIZE = 8        # Batches buffered between two stages
+_POLL_SECONDS = 0.2           # How often blocked stages re-check for shutdown
+
+_END = object()               # End-of-stream marker passed down the queues
+
+
+class _StageError:
+    """Carries an exception raised in a stage down to the consumer."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class _StageStats:
+    """Counters for one stage. Only written by the stage's own thread."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.flows = 0
+        self.blocked = 0.0    # Waiting to put into a full output queue
+        self.starved = 0.0    # Waiting on an empty input queue
+        self.started = None
+        self.finished = None
+
+    def to_dict(self) -> dict:
+        end = self.finished or time.time()
+        elapsed = end - self.started if self.started else 0.0
+        busy = max(0.0, elapsed - self.blocked - self.starved)
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "flows": self.flows,
+            "elapsed_seconds": round(elapsed, 3),
+            "busy_seconds": round(busy, 3),
+            "blocked_seconds": round(self.blocked, 3),
+            "starved_seconds": round(self.starved, 3),
+            "throughput_flows_per_second": round(self.flows / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+
+class _BoundedQueue:
+    """queue.Queue plus depth statistics sampled on every put."""
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.puts = 0
+        self.depth_sum = 0
+        self.max_depth = 0
+
+    def record_depth(self):
+        depth = self.queue.qsize()
+        self.puts += 1
+        self.depth_sum += depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def to_dict(self) -> dict:
+        return {
+            "queue": self.name,
+            "capacity": self.maxsize,
+            "depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "average_depth": round(self.depth_sum / self.puts, 2) if self.puts else 0.0
+        }
+
+
+class ScanPipeline:
+    """
+    Runs a source iterator through a chain of stage functions on separate
+    threads, connected by bounded queues.
+
+    Args:
+        source: Iterable producing the first stage's items (runs on the
+                capture thread).
+        stages: List of (name, fn) pairs. fn receives an iterator over the
+                previous stage's items and yields this stage's items, so it can
+                keep state or work ahead (e.g. an inference pool).
+        queue_size: Capacity of each inter-stage queue, in items.
+        item_flows: Function returning the number of flows in an item (for
+                    flow throughput); defaults to 1 per item.
+        source_name: Name of the source stage.
+        consumer_name: Name reported for the thread iterating results().
+    """
+
+    def __init__(
+        self,
+        source,
+        stages,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        item_flows=None,
+        source_name="capture",
+        consumer_name="emit"
+    ):
+        self._stop = threading.Event()
+        self._item_flows = item_flows or (lambda item: 1)
+
+        names = [source_name] + [name for name, _ in stages]
+        self._stats = [_StageStats(name) for name in names + [consumer_name]]
+        self._queues = [
+            _BoundedQueue(f"{names[i]}->{(names + [consumer_name])[i + 1]}", max(1, queue_size))
+            for i in range(len(names))
+        ]
+
+        self._threads = [threading.Thread(
+            target=self._run_stage,
+            args=(lambda _: source, None, self._queues[0], self._stats[0]),
+            name=f"scan-{source_name}",
+            daemon=True
+        )]
+        for i, (name, fn) in enumerate(stages):
+            self._threads.append(threading.Thread(
+                target=self._run_stage,
+                args=(fn, self._queues[i], self._queues[i + 1], self._stats[i + 1]),
+                name=f"scan-{name}",
+                daemon=True
+            ))
+
+    # -- queue helpers -------------------------------------------------------
+
+    def _put(self, out_queue, item, stats) -> bool:
+        """Puts item, blocking while the queue is full. Returns False on stop."""
+        start = time.time()
+        try:
+            while not self._stop.is_set():
+                try:
+                    out_queue.queue.put(item, timeout=_POLL_SECONDS)
+                    out_queue.record_depth()
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked += time.time() - start
+
+    def _get(self, in_queue, stats):
+        """Gets the next item, or _END on stop."""
+        start = time.time()
+        try:
+            while not self._stop.is_set():
+                try:
+                    return in_queue.queue.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+            return _END
+        finally:
+            stats.starved += time.time() - start
+
+    def _iter_input(self, in_queue, stats, errors):
+        """Iterates a stage's input queue until end of stream or an upstream error."""
+        while True:
+            item = self._get(in_queue, stats)
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                errors.append(item)
+                return
+            yield item
+
+    # -- stage threads -------------------------------------------------------
+
+    def _run_stage(self, fn, in_queue, out_queue, stats):
+        stats.started = time.time()
+        errors = []
+        try:
+            items = self._iter_input(in_queue, stats, errors) if in_queue is not None else None
+            for item in fn(items):
+                stats.items += 1
+                stats.flows += self._item_flows(item)
+                if not self._put(out_queue, item, stats):
+                    return
+        except Exception as e:
+            errors.append(_StageError(e))
+        finally:
+            stats.finished = time.time()
+            if errors:
+                self._put(out_queue, errors[0], stats)
+            self._put(out_queue, _END, stats)
+
+    # -- public API ----------------------------------------------------------
+
+    def results(self):
+        """
+        Starts the stage threads and yields the last stage's items in order.
+        Re-raises an exception raised by any stage.
+        """
+        stats = self._stats[-1]
+        stats.started = time.time()
+        for thread in self._threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(self._queues[-1], stats)
+                if item is _END:
+                    return
+                if isinstance(item, _StageError):
+                    raise item.error
+                stats.items += 1
+                stats.flows += self._item_flows(item)
+                yield item
+        finally:
+            stats.finished = time.time()
+
+    def stop(self, timeout=2.0):
+        """Signals all stages to stop and waits briefly for their threads."""
+        self._stop.set()
+        deadline = time.time() + timeout
+        for thread in self._threads:
+            if thread.is_alive() and thread.ident is not None:
+                thread.join(timeout=max(0.0, deadline - time.time()))
+
+    def stats(self) -> dict:
+        """Per-stage counters and per-queue depth statistics."""
+        return {
+            "stages": [stats.to_dict() for stats in self._stats],
+            "queues": [q.to_dict() for q in self._queues]
+        }
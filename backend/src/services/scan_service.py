@@ -11,137 +11,499 @@
 
 import time
 import threading
-import psutil
-import json
-import os
-from collections import deque
+import queue
+import re
+import uuid
+import numpy as np
+import pandas as pd
 from datetime import datetime
 
-from src.ml_pipeline.preprocessor import Preprocessor
-from src.ml_pipeline.model_inference import ModelInference
-from src.ml_pipeline.flow_capture import capture_live
-from src.ml_pipeline.flow_replay import replay_from_csv
-from src.ml_pipeline.feature_mapping import map_features
-
-# Global vars
-_scan_thread = None
-_scan_running = False
-_monitor_thread = None
-_flow_logs = []  # In-memory list of flow records for current scan
-_flow_counter_lock = threading.Lock()  # Lock for thread-safe flow numbering
-
-# Hardware metrics (sliding window averages)
-_cpu_samples = deque(maxlen=10)  # Keep last 10 CPU samples
-_memory_samples = deque(maxlen=10)  # Keep last 10 memory samples
-_metrics_lock = threading.Lock()
-
-# Paths to saved models
-SCALER_PATH = "models/scaler.joblib"
-ENCODER_PATH = "models/label_encoder.joblib"
-RF_MODEL_PATH = "models/rf_model.joblib"
-LR_MODEL_PATH = "models/lr_model.joblib"
-SVM_MODEL_PATH = "models/svm_model.joblib"
-MLP_MODEL_PATH = "models/mlp_model.joblib"
-IF_MODEL_PATH = "models/if_model.joblib"
-
-def _hardware_monitor_loop():
+from src.ml_pipeline.model_registry import registry as model_registry, resolve_model_name, DEFAULT_MODEL
+from src.ml_pipeline.compiled_scorer import CompiledScorer
+from src.ml_pipeline.inference_pool import InferencePool
+from src.ml_pipeline.flow_capture import MultiInterfaceCapture, capture_config, DEFAULT_CAPTURE_QUEUE_SIZE
+from src.ml_pipeline.flow_replay import replay_from_csv, replay_blocks_from_csv
+from src.ml_pipeline.dataset_cache import replay_blocks_from_cache, DEFAULT_CACHE_LIMIT_MB
+from src.ml_pipeline.feature_mapping import DATASET_FEATURES, map_features_batch
+from src.services.scan_pipeline import ScanPipeline, DEFAULT_QUEUE_SIZE
+from src.services.result_emitter import BatchEmitter, DEFAULT_EMIT_RATE_HZ, DEFAULT_EMIT_MAX_BATCH
+from src.services.wire_format import PackedResultEncoder, SCHEMA_EVENT, WIRE_FORMATS
+from src.services.scan_log import ScanLogWriter, LOG_DIR, DEFAULT_LOG_ROTATE_MB, check_compression
+from src.services.log_store import LogStoreWriter
+from src.services.flow_record import FlowResult, LabelTable, MISSING_LABEL
+from src.services.batch_scoring import run_batch_scoring
+from src.services.classification_metrics import ClassificationMetrics
+from src.services.latency_stats import StageLatencies, timed
+from src.services.resource_sampler import ResourceSampler, ResourceSnapshot, DEFAULT_SAMPLE_INTERVAL_MS
+
+# Active scan sessions by session id
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Resource usage of the backend process tree, sampled in the background and
+# read lock-free by the scan loops. One sampler is shared by all sessions.
+_sampler = None
+_sampler_users = 0
+_NO_SAMPLE = ResourceSnapshot()
+
+# Micro-batching defaults (batch_size=1 keeps the original per-flow behavior)
+DEFAULT_BATCH_SIZE = 1
+DEFAULT_BATCH_TIMEOUT_MS = 50
+DEFAULT_BLOCK_SIZE = 1024  # Rows per block in columnar replay
+DEFAULT_WORKERS = 0        # Inference worker processes (0 = score in the scan thread)
+EMIT_MODES = ("flow", "batch")  # One network_data event per flow, or coalesced network_data_batch events
+DEFAULT_STATS_INTERVAL_MS = 2000  # pipeline_stats event period (0 disables)
+DEFAULT_METRICS_INTERVAL_MS = 1000  # replay_metrics snapshot period (0 disables)
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")  # Client-chosen session ids end up in file names
+NON_FINITE_ERROR = "Flow features contain NaN or Infinity values"
+
+# Hot-path stages with a latency histogram (durations per batch; per flow at
+# batch_size 1). emit_flush is only used when results are batched.
+LATENCY_STAGES = (
+    "capture_wait",      # Waiting for the flow source to produce a batch
+    "feature_mapping",   # NFStream flows -> dataset feature matrix
+    "preprocessor",      # Scaling
+    "model_inference",   # Prediction (scaling included for the compiled scorer)
+    "result_building",   # Per-flow metrics and FlowResult records
+    "log_writing",       # Scan log and log store appends
+    "emit",              # network_data emits, or handing results to the batch emitter
+    "emit_flush"         # Batch serialization/encoding and emit
+)
+
+
+class ScanSession:
     """
-    Monitors CPU and memory usage in background.
-    CPU sampled every 1s, memory every 2s.
-    Stores recent samples in sliding windows.
+    One scan: its parameters, stop flag and thread. Sessions run
+    independently; every event a session emits carries its session_id.
+
+    Args:
+        session_id: Unique session id (see new_session_id()).
+        params: start_scan parameters.
+        emit: Socket.IO emitter shared by all sessions.
     """
-    global _scan_running, _cpu_samples, _memory_samples, _metrics_lock
-    
-    last_memory_sample = time.time()
-    
-    while _scan_running:
+
+    def __init__(self, session_id, params, emit):
+        self.session_id = session_id
+        self.params = params
+        self.mode = params.get("mode", "live")
+        self.running = False
+        self.thread = None
+        self.started = time.time()
+        self.flow_counter_lock = threading.Lock()  # Lock for thread-safe flow numbering
+        self._emit = emit
+
+    def emit(self, event, data=None, **kwargs):
+        """Emits event with the session id added to its payload."""
+        if isinstance(data, dict):
+            data = {"session_id": self.session_id, **data}
+        self._emit(event, data, **kwargs)
+
+    def is_running(self) -> bool:
+        return self.running
+
+    def info(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "mode": self.mode,
+            "model": self.params.get("model", DEFAULT_MODEL),
+            "interface": self.params.get("interfaces") or self.params.get("interface"),
+            "csv_path": self.params.get("csv_path"),
+            "started": datetime.fromtimestamp(self.started).isoformat(),
+            "running": self.running
+        }
+
+
+def _live_interfaces(params):
+    """
+    Capture interface(s) of a live scan: a single interface string, or a list
+    of interfaces (or "all") for parallel multi-interface capture.
+    Taken from params["interfaces"] if set, else params["interface"].
+    """
+    interfaces = params.get("interfaces")
+    if interfaces is None:
+        return params.get("interface")
+    if interfaces == "all" or isinstance(interfaces, (list, tuple)):
+        return interfaces
+    return [interfaces]
+
+
+def new_session_id() -> str:
+    """Returns a new short random session id."""
+    return uuid.uuid4().hex[:8]
+
+
+def valid_session_id(session_id) -> bool:
+    """True if a client-chosen session id is safe to use in log file names."""
+    return isinstance(session_id, str) and SESSION_ID_PATTERN.fullmatch(session_id) is not None
+
+
+def _batch_flows(flow_source, batch_size, batch_timeout_ms, is_running):
+    """
+    Groups flows from flow_source into micro-batches for vectorized inference.
+    A batch is released once it holds batch_size flows or batch_timeout_ms
+    milliseconds have passed since its first flow arrived, whichever comes first.
+
+    Args:
+        flow_source: Iterator of flow objects (live capture or CSV replay).
+        batch_size: Maximum number of flows per batch.
+        batch_timeout_ms: Maximum time a flow waits for its batch to fill.
+        is_running: Callable returning False once the scan is stopped.
+
+    Yields:
+        (flows, received_times, features) tuples in arrival order. features is
+        always None here; the scan loop maps the flows itself.
+    """
+    if batch_size <= 1:
+        for flow in flow_source:
+            yield [flow], [time.time()], None
+        return
+
+    # Flows are pulled on a reader thread so a partially filled batch can still
+    # be flushed on timeout while the source (e.g. NFStreamer) is blocked.
+    flow_queue = queue.Queue(maxsize=batch_size * 4)
+    source_done = object()
+
+    def put(item):
+        # Gives up once the scan stops: the consumer has left by then, so a
+        # blocking put on a full queue would never return
+        while is_running():
+            try:
+                flow_queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def reader():
         try:
-            # Sample CPU every iteration (1 second interval)
-            cpu_percent = psutil.cpu_percent(interval=1)
-            
-            with _metrics_lock:
-                _cpu_samples.append(cpu_percent)
-            
-            # Sample memory every 2 seconds
-            current_time = time.time()
-            if current_time - last_memory_sample >= 2.0:
-                mem = psutil.virtual_memory()
-                with _metrics_lock:
-                    _memory_samples.append(mem.percent)
-                last_memory_sample = current_time
-                
+            for flow in flow_source:
+                put((flow, time.time()))
+                if not is_running():
+                    break
         except Exception as e:
-            print(f"Hardware monitoring error: {e}", flush=True)
+            put(e)
+        finally:
+            put(source_done)
+
+    threading.Thread(target=reader, daemon=True).start()
+
+    batch_timeout = batch_timeout_ms / 1000.0
+    flows, received_times = [], []
+    deadline = None
+
+    while is_running():
+        wait = 0.5 if not flows else max(0.0, deadline - time.time())
+        try:
+            item = flow_queue.get(timeout=wait)
+        except queue.Empty:
+            if flows:
+                yield flows, received_times, None
+                flows, received_times = [], []
+            continue
+
+        if item is source_done:
             break
+        if isinstance(item, Exception):
+            raise item
 
-def _get_average_cpu() -> float:
-    """Get average CPU usage from recent samples."""
-    with _metrics_lock:
-        if not _cpu_samples:
-            return 0.0
-        return sum(_cpu_samples) / len(_cpu_samples)
+        flow, received_time = item
+        flows.append(flow)
+        received_times.append(received_time)
+        if len(flows) == 1:
+            deadline = received_time + batch_timeout
+        if len(flows) >= batch_size:
+            yield flows, received_times, None
+            flows, received_times = [], []
 
-def _get_average_memory() -> float:
-    """Get average memory usage from recent samples."""
-    with _metrics_lock:
-        if not _memory_samples:
-            return 0.0
-        return sum(_memory_samples) / len(_memory_samples)
+    if flows:
+        yield flows, received_times, None
 
 
-def _scan_loop(params, emit):
+def _batch_blocks(block_source):
     """
-    Long-running scan loop executed in a background thread.
-    Terminates cooperatively when _scan_running is set to False.
+    Adapts a columnar replay source (FlowBlocks) to the scan loop's batches.
+    Each block is one batch; its features are already in model order. Rows
+    with NaN/Infinity features are masked out by the score stage, so only
+    those rows of a block fail. All rows of a block share one received time,
+    so they are one arrival for the throughput figures (see _throughputs()).
+
+    Yields:
+        (block, received_times, features) tuples.
     """
+    for block in block_source:
+        received_time = time.time()
+        yield block, [received_time] * len(block), block.features
+
 
-    global _scan_running
+def _packet_counts(flows):
+    """Packets of each flow of a batch (vectorized for columnar blocks)."""
+    if hasattr(flows, "packet_counts"):
+        return flows.packet_counts().tolist()
+    return [getattr(flow, 'bidirectional_packets', 0) for flow in flows]
+
+
+def _throughputs(packet_counts, received_times, last_flow_time, invalid=None):
+    """
+    Packets per second of each flow of a batch since the previous arrival.
+    Flows received at the same instant (the rows of a columnar block) are one
+    arrival: each of them gets their combined packets over the interval since
+    the previous arrival, which matches the mean of per-row throughputs over
+    the same rows. Rows masked by invalid are not scored and are skipped.
+
+    Returns:
+        (throughputs, time of the batch's last arrival)
+    """
+    throughputs = [0.0] * len(received_times)
+    start = 0
+    while start < len(received_times):
+        arrival = received_times[start]
+        stop = start + 1
+        while stop < len(received_times) and received_times[stop] == arrival:
+            stop += 1
+        rows = [i for i in range(start, stop) if invalid is None or not invalid[i]]
+        if rows:
+            interval = arrival - last_flow_time
+            if interval > 0:
+                throughput = sum(packet_counts[i] for i in rows) / interval
+                for i in rows:
+                    throughputs[i] = throughput
+            last_flow_time = arrival
+        start = stop
+    return throughputs, last_flow_time
+
+
+def _finite_rows(features):
+    """
+    Mask of the rows of a feature matrix without NaN/Infinity values (some
+    CIC-IDS-2017 rows have them), or None if every row is finite.
+    """
+    valid = np.isfinite(features).all(axis=1)
+    return None if valid.all() else valid
 
-    mode = params.get("mode", "live")  # Default to live capture
 
-    print(f"Scan service started with params:", params)
+def _expand_scores(invalid, labels, confidences):
+    """
+    Spreads the scores of a batch's finite rows back over the whole batch.
+    Rows that were not scored get None for both label and confidence.
+    """
+    all_labels = np.full(len(invalid), None, dtype=object)
+    all_confidences = np.full(len(invalid), None, dtype=object)
+    if labels is not None:
+        all_labels[~invalid] = labels
+        all_confidences[~invalid] = confidences
+    return all_labels, all_confidences
+
+
+def _verify_scorer(scorer, features):
+    """
+    Checks a compiled scorer against the standard pipeline on the finite rows
+    of one batch (rows with NaN/Infinity would make the reference pipeline
+    raise). Returns the verification report, where report["match"] is False
+    on any mismatch, or None if the batch has no finite rows to verify on.
+    """
+    valid = _finite_rows(features)
+    if valid is not None:
+        features = features[valid]
+    if not len(features):
+        return None
+
+    try:
+        report = scorer.verify(features)
+    except Exception as e:
+        report = {"kind": scorer.kind, "match": False, "error": str(e)}
+
+    if report["match"]:
+        print(f"Compiled scorer verified on {report['flows']} flows.")
+    else:
+        print(f"Compiled scorer verification failed ({report}); using standard pipeline.")
+    return report
+
+
+def _emit_metrics_snapshot(emit, log_writer, metrics, total_flows):
+    """Sends a replay_metrics snapshot and appends it to the scan log."""
+    snapshot = {"total_flows": total_flows, **metrics.snapshot()}
+    emit("replay_metrics", snapshot)
+    if log_writer is not None:
+        try:
+            log_writer.write(snapshot, record_type="metrics")
+        except Exception as e:
+            print(f"Error writing metrics snapshot to scan log: {e}", flush=True)
+
+
+def _map_stage(batches, latency=None):
+    """
+    Pipeline map stage: maps features for batches that do not already carry
+    them. A mapping error is passed along in place of the features so the
+    batch can be reported by the emit stage.
+
+    Args:
+        batches: Iterator of (flows, received_times, features) tuples.
+        latency: Optional LatencyHistogram for the mapping time per batch.
+
+    Yields:
+        (flows, received_times, features) tuples.
+    """
+    for flows, received_times, features in batches:
+        if features is None:
+            start = time.perf_counter_ns()
+            try:
+                features = map_features_batch(flows)
+            except Exception as e:
+                features = e
+            if latency is not None:
+                latency.record(time.perf_counter_ns() - start)
+        yield flows, received_times, features
+
+
+def _scan_loop(session):
+    """
+    Long-running scan loop executed in the session's background thread.
+    Terminates cooperatively when session.running is set to False.
+    """
+
+    params = session.params
+    emit = session.emit
+    mode = session.mode  # Default to live capture
+
+    print(f"Scan session {session.session_id} started with params:", params)
     emit("scan_status", {
         "state": "started",
         "mode": mode,
         "message": f"Scan initialized ({mode} mode)"
     })
 
-    # Load preprocessor
+    # Load the shared preprocessor and model from the process-wide registry
+    # (artifacts are only read from disk the first time they are used)
     try:
-        preprocessor = Preprocessor(SCALER_PATH)
+        preprocessor = model_registry.get_preprocessor()
     except Exception as e:
         emit("scan_error", {"error": f"Failed to load preprocessor: {e}"})
         return
 
-    # Determine which model to load based on user input
-    model_type = params.get("model", "randomForest")  # default to randomForest if not specified
+    # Determine which model to use based on user input
+    model_name = resolve_model_name(params.get("model", DEFAULT_MODEL))
     try:
-        match model_type:
-            case "Random Forest":
-                model = ModelInference(RF_MODEL_PATH, ENCODER_PATH)
-            case "Logistic Regression":
-                model = ModelInference(LR_MODEL_PATH, ENCODER_PATH)
-            case "Support Vector Machine":
-                model = ModelInference(SVM_MODEL_PATH, ENCODER_PATH)
-            case "Multilayer Perceptron":
-                model = ModelInference(MLP_MODEL_PATH, ENCODER_PATH)
-            case "Isolation Forest":
-                model = ModelInference(IF_MODEL_PATH, ENCODER_PATH)
-            case _:
-                print(f"Unknown model '{model_type}' selected; defaulting to Random Forest.")
-                model = ModelInference(RF_MODEL_PATH, ENCODER_PATH)
+        model = model_registry.acquire(model_name)
     except Exception as e:
         emit("scan_error", {"error": f"Failed to load model: {e}"})
         return
 
-    # Select flow source based on mode
+    try:
+        if mode == "batch":
+            _run_batch(session, preprocessor, model)
+        else:
+            _run_scan(session, preprocessor, model_name, model)
+    finally:
+        model_registry.release(model_name)
+
+
+def _run_batch(session, preprocessor, model):
+    """
+    Headless bulk scoring of a whole CSV (mode "batch"): no per-flow events,
+    only batch_progress events and one scan_summary with the metrics.
+    """
+    emit = session.emit
+    try:
+        summary = run_batch_scoring(
+            {**session.params, "run_id": session.session_id},
+            preprocessor,
+            model,
+            emit=emit,
+            should_stop=lambda: not session.running
+        )
+    except Exception as e:
+        emit("scan_error", {"error": f"Batch scoring failed: {e}"})
+    else:
+        print(f"Batch scored {summary['total_flows']} flows in {summary['duration_seconds']}s "
+              f"({summary['throughput_flows_per_second']} flows/s); summary: {summary['summary_path']}", flush=True)
+        emit("scan_summary", summary)
+
+    emit("scan_status", {
+        "state": "stopped",
+        "message": "Batch scoring finished"
+    })
+
+
+def _run_scan(session, preprocessor, model_name, model):
+    """
+    Runs the flow source -> features -> inference -> emit pipeline for one scan
+    with the loaded preprocessor and model. Called from _scan_loop(), which
+    holds the model's registry lease for the duration of the scan.
+    """
+    params = session.params
+    emit = session.emit
+    mode = session.mode
+    sampler = _sampler
+
+    # Optionally fuse the scaler and model into a compiled NumPy scorer. It is
+    # verified against the standard pipeline on the first batch before use.
+    scorer = None
+    scorer_report = None
+    if params.get("compiled", False):
+        try:
+            scorer = CompiledScorer(preprocessor, model)
+            print(f"Using compiled scorer ({scorer.kind})")
+        except Exception as e:
+            print(f"Compiled scorer unavailable ({e}); using standard pipeline.")
+            scorer_report = {"match": False, "error": str(e)}
+
+    # Micro-batching configuration (flows are scored together once the batch
+    # fills up or its oldest flow has waited batch_timeout_ms)
+    try:
+        batch_size = max(1, int(params.get("batch_size", DEFAULT_BATCH_SIZE)))
+        block_size = max(1, int(params.get("block_size", DEFAULT_BLOCK_SIZE)))
+        batch_timeout_ms = max(0.0, float(params.get("batch_timeout_ms", DEFAULT_BATCH_TIMEOUT_MS)))
+        workers = max(0, int(params.get("workers", DEFAULT_WORKERS)))
+        queue_size = max(1, int(params.get("queue_size", DEFAULT_QUEUE_SIZE)))
+        stats_interval_ms = max(0.0, float(params.get("stats_interval_ms", DEFAULT_STATS_INTERVAL_MS)))
+        metrics_interval_ms = max(0.0, float(params.get("metrics_interval_ms", DEFAULT_METRICS_INTERVAL_MS)))
+
+        emit_mode = params.get("emit_mode", "flow")
+        emit_rate_hz = float(params.get("emit_rate_hz", DEFAULT_EMIT_RATE_HZ))
+        emit_max_batch = int(params.get("emit_max_batch", DEFAULT_EMIT_MAX_BATCH))
+        wire_format = params.get("wire_format", "json")
+        if emit_mode not in EMIT_MODES:
+            raise ValueError(f"emit_mode must be one of {EMIT_MODES}")
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"wire_format must be one of {WIRE_FORMATS}")
+
+        log_compression = params.get("log_compression", "none")
+        log_rotate_mb = max(0.0, float(params.get("log_rotate_mb", DEFAULT_LOG_ROTATE_MB)))
+        log_rotate_minutes = max(0.0, float(params.get("log_rotate_minutes", 0)))
+        check_compression(log_compression)
+        if emit_rate_hz <= 0 or emit_max_batch < 1:
+            raise ValueError("emit_rate_hz and emit_max_batch must be positive")
+
+        # NFStreamer settings (capture_preset plus individual overrides)
+        live_capture_config = capture_config(params) if mode == "live" else None
+    except (TypeError, ValueError) as e:
+        emit("scan_error", {"error": f"Invalid scan parameters: {e}"})
+        return
+
+    # Select flow source based on mode. Sources yield individual flows, except
+    # columnar replay which yields pre-mapped blocks of rows.
+    batches = None
+    capture = None
+    scan_interface = params.get("interface", "N/A")
     try:
         if mode == "live":
-            interface = params.get("interface")
-            if not interface:
+            interfaces = _live_interfaces(params)
+            if not interfaces:
                 emit("scan_error", {"error": "Missing interface parameter"})
                 return
-            flow_source = capture_live(interface=interface)
+            # One NFStreamer per interface (several interfaces or "all" are
+            # captured in parallel), merged into one stream of
+            # interface-tagged flows with per-interface capture counters
+            capture = MultiInterfaceCapture(
+                [interfaces] if isinstance(interfaces, str) else interfaces,
+                queue_size=params.get("capture_queue_size", DEFAULT_CAPTURE_QUEUE_SIZE),
+                config=live_capture_config,
+                drop_when_full=params.get("capture_drop_when_full", False)
+            )
+            flow_source = iter(capture)
+            if len(capture.interfaces) == 1:
+                scan_interface = capture.interfaces[0]
+            else:
+                scan_interface = capture.interfaces
 
         elif mode == "replay":
             csv_path = params.get("csv_path")
@@ -154,13 +516,34 @@ def _scan_loop(params, emit):
             start_row = params.get("start_row", None)
             end_row = params.get("end_row", None)
 
-            flow_source = replay_from_csv(
-                csv_path=csv_path,
-                delay_ms=delay_ms,
-                max_flows=max_flows,
-                start_row=start_row,
-                end_row=end_row
-            )
+            if params.get("cache", False):
+                # Binary dataset cache implies columnar replay
+                batches = _batch_blocks(replay_blocks_from_cache(
+                    csv_path=csv_path,
+                    block_size=block_size,
+                    delay_ms=delay_ms,
+                    max_flows=max_flows,
+                    start_row=start_row,
+                    end_row=end_row,
+                    limit_mb=params.get("cache_limit_mb", DEFAULT_CACHE_LIMIT_MB)
+                ))
+            elif params.get("columnar", False):
+                batches = _batch_blocks(replay_blocks_from_csv(
+                    csv_path=csv_path,
+                    block_size=block_size,
+                    delay_ms=delay_ms,
+                    max_flows=max_flows,
+                    start_row=start_row,
+                    end_row=end_row
+                ))
+            else:
+                flow_source = replay_from_csv(
+                    csv_path=csv_path,
+                    delay_ms=delay_ms,
+                    max_flows=max_flows,
+                    start_row=start_row,
+                    end_row=end_row
+                )
         else:
             emit("scan_error", {"error": f"Unknown mode: {mode}"})
             return
@@ -169,11 +552,154 @@ def _scan_loop(params, emit):
         emit("scan_error", {"error": f"Failed to initialize flow source: {e}"})
         return
 
+    if batches is None:
+        batches = _batch_flows(flow_source, batch_size, batch_timeout_ms, session.is_running)
+
+    # Per-stage latency histograms (perf_counter_ns), reported periodically
+    # as pipeline_stats events and in the scan summary
+    latencies = StageLatencies(LATENCY_STAGES)
+
+    # Optionally spread scoring over worker processes. Workers run the
+    # standard preprocessor + model path (the compiled scorer is not used).
+    pool = None
+    if workers > 0:
+        try:
+            pool = InferencePool(
+                model_name,
+                model.class_labels,
+                workers,
+                capacity=max(batch_size, block_size),
+                mmap_mode=model_registry.mmap_mode,
+                has_confidence=model.scoring_method != "predict"
+            )
+        except Exception as e:
+            emit("scan_error", {"error": f"Failed to start inference workers: {e}"})
+            return
+        scorer = None
+
+    def score_stage(batches):
+        """
+        Pipeline score stage: scores mapped batches in this thread, or on the
+        worker pool when one is running.
+
+        Rows with NaN/Infinity features are left out of scoring, so only
+        those flows fail instead of their whole batch.
+
+        Yields:
+            (flows, received_times, predicted_labels, confidences, invalid,
+            error, batch_scored_time) tuples in arrival order. invalid is None,
+            or a mask of the rows that were not scored.
+        """
+        nonlocal scorer, scorer_report
+
+        if pool is not None:
+            def pool_items():
+                for flows, received_times, features in batches:
+                    invalid = None
+                    if not isinstance(features, Exception):
+                        valid = _finite_rows(features)
+                        if valid is not None:
+                            invalid = ~valid
+                            features = features[valid] if valid.any() else ValueError(NON_FINITE_ERROR)
+                    yield (flows, received_times, invalid), features
+
+            for (flows, received_times, invalid), labels, confidences, _, error in pool.imap(pool_items()):
+                if invalid is not None and invalid.all():
+                    error = None
+                if invalid is not None and error is None:
+                    labels, confidences = _expand_scores(invalid, labels, confidences)
+                yield flows, received_times, labels, confidences, invalid, error, time.time()
+            return
+
+        for flows, received_times, features in batches:
+            invalid = None
+            try:
+                if isinstance(features, Exception):
+                    raise features
+
+                valid = _finite_rows(features)
+                if valid is not None:
+                    invalid = ~valid
+                    features = features[valid]
+                if not len(features):
+                    yield flows, received_times, *_expand_scores(invalid, None, None), invalid, None, time.time()
+                    continue
+
+                # The compiled scorer is only used once verified (verification
+                # is deferred while a batch has no finite rows)
+                if scorer is not None and scorer_report is None:
+                    scorer_report = _verify_scorer(scorer, features)
+                    if scorer_report is not None and not scorer_report["match"]:
+                        scorer = None
+
+                # Scale and predict the whole batch with a single call each
+                if scorer is not None and scorer_report is not None:
+                    start = time.perf_counter_ns()
+                    predicted_labels, confidences, _ = scorer.score(features)
+                    latencies["model_inference"].record(time.perf_counter_ns() - start)
+                else:
+                    start = time.perf_counter_ns()
+                    df_mapped = pd.DataFrame(features, columns=DATASET_FEATURES, copy=False)
+                    df_preprocessed = preprocessor.transform(df_mapped)
+                    scaled = time.perf_counter_ns()
+                    predicted_labels, confidences, _ = model.score(df_preprocessed)
+                    latencies["preprocessor"].record(scaled - start)
+                    latencies["model_inference"].record(time.perf_counter_ns() - scaled)
+                if invalid is not None:
+                    predicted_labels, confidences = _expand_scores(invalid, predicted_labels, confidences)
+                yield flows, received_times, predicted_labels, confidences, invalid, None, time.time()
+
+            except Exception as e:
+                yield flows, received_times, None, None, None, e, time.time()
+
+    # Capture, feature mapping and scoring each run on their own thread,
+    # connected by bounded queues; this thread is the emit stage
+    pipeline = ScanPipeline(
+        timed(batches, latencies["capture_wait"]),
+        [("map", lambda items: _map_stage(items, latencies["feature_mapping"])), ("score", score_stage)],
+        queue_size=queue_size,
+        item_flows=lambda item: len(item[0])
+    )
+
+    # In batch emit mode, per-flow results are coalesced into
+    # network_data_batch events at emit_rate_hz (or every emit_max_batch flows).
+    # The binary wire format is always batched: the schema and label
+    # dictionary are sent once, then network_data_packed column batches.
+    replay = mode == "replay"
+    label_table = LabelTable(model.class_labels if model.class_labels is not None else ())
+
+    batch_emitter = None
+    if wire_format == "binary":
+        encoder = PackedResultEncoder(
+            label_table,
+            replay=replay,
+            interfaces=capture.interfaces if capture is not None else None
+        )
+        emit(SCHEMA_EVENT, encoder.schema())
+        batch_emitter = BatchEmitter(
+            emit,
+            rate_hz=emit_rate_hz,
+            max_batch=emit_max_batch,
+            encoder=encoder,
+            latency=latencies["emit_flush"]
+        )
+    elif emit_mode == "batch":
+        batch_emitter = BatchEmitter(
+            emit,
+            rate_hz=emit_rate_hz,
+            max_batch=emit_max_batch,
+            serialize=lambda result: result.to_emit_dict(label_table, replay),
+            latency=latencies["emit_flush"]
+        )
+
     # Evaluation metrics (per scan session)
     total_flows = 0
     total_packets = 0      # Total packets across all flows (for throughput calculation)
+    total_batches = 0      # Number of micro-batches scored
     scan_start_time = time.time()
     scan_end_time = 0.0
+    last_stats_time = scan_start_time
+    last_metrics_time = scan_start_time
     last_flow_time = time.time()
     
     # Hardware usage tracking (incremental approach for memory efficiency)
@@ -188,151 +714,221 @@ def _scan_loop(params, emit):
     inference_latency_sum = 0.0  # Running sum of inference latencies
     inference_latency_count = 0  # Number of inference latency readings
 
-    # In-memory list to store flow records for this scan session
-    flow_logs = []
+    # Flow records are streamed to logs/scan_<ts>.ndjson as they are produced
+    log_writer = None
+    try:
+        log_writer = ScanLogWriter(
+            base_name=f"scan_{datetime.fromtimestamp(scan_start_time).strftime('%Y%m%d_%H%M%S')}_{session.session_id}",
+            header={
+                "mode": mode,
+                "model_type": params.get("model", "randomForest"),
+                "interface": scan_interface,
+                "params": params
+            },
+            log_dir=LOG_DIR,
+            compression=log_compression,
+            rotate_mb=log_rotate_mb,
+            rotate_minutes=log_rotate_minutes
+        )
+    except Exception as e:
+        print(f"Error opening scan log; flows will not be logged: {e}", flush=True)
 
-    # Track accuracy metrics for replay mode
-    if mode == "replay":
-        correct_predictions = 0
-        total_predictions = 0
+    # Records are also kept in the indexed columnar store for log queries
+    store_writer = None
+    if params.get("log_store", True):
+        try:
+            store_writer = LogStoreWriter(
+                scan_id=f"scan_{datetime.fromtimestamp(scan_start_time).strftime('%Y%m%d_%H%M%S')}_{session.session_id}",
+                info={
+                    "mode": mode,
+                    "model_type": params.get("model", "randomForest"),
+                    "interface": scan_interface
+                }
+            )
+        except Exception as e:
+            print(f"Error opening log store segment: {e}", flush=True)
+
+    # Replay mode: confusion matrix and per-class metrics against the ground
+    # truth, updated once per batch and sent as periodic replay_metrics snapshots
+    metrics = ClassificationMetrics(label_table) if replay else None
     
     try:
         # UNIFIED PROCESSING LOOP - same for both modes
-        for flow in flow_source:
-            if not _scan_running:
+        for flows, received_times, predicted_labels, confidences, invalid, error, batch_scored_time in pipeline.results():
+            if not session.running:
                 break
 
-            try:
-                # Thread-safe flow number assignment
-                with _flow_counter_lock:
-                    total_flows += 1
-                    current_flow_num = total_flows
+            # Thread-safe flow number assignment (batch keeps arrival order)
+            with session.flow_counter_lock:
+                first_flow_num = total_flows + 1
+                total_flows += len(flows)
+            total_batches += 1
 
-                flow_received_time = time.time()
-                
-                # Map features for this single flow
-                df_mapped = map_features(flow)
-                df_preprocessed = preprocessor.transform(df_mapped)
+            if error is not None:
+                print(f"Error processing flows #{first_flow_num}-#{first_flow_num + len(flows) - 1}: {error}")
+                for offset in range(len(flows)):
+                    emit("scan_error", {
+                        "flow_number": first_flow_num + offset,
+                        "error": str(error)
+                    })
+                continue
 
-                # Predict label and confidence for this single flow
-                predicted_labels, confidences = model.predict_with_confidence(df_preprocessed)
-                predicted_label = predicted_labels[0]
-                
-                # Extract confidence value, handling numpy types
-                conf_value = confidences[0]
-                if conf_value is None:
-                    confidence = None
-                else:
-                    # Convert numpy scalar to Python float
-                    try:
-                        confidence = float(conf_value.item()) if hasattr(conf_value, 'item') else float(conf_value)
-                    except (ValueError, AttributeError):
+            # Flows with NaN/Infinity features were not scored; each one is
+            # reported on its own and skipped below
+            if invalid is not None:
+                for offset in np.flatnonzero(invalid):
+                    print(f"Error processing flow #{first_flow_num + offset}: {NON_FINITE_ERROR}")
+                    emit("scan_error", {
+                        "flow_number": first_flow_num + int(offset),
+                        "error": NON_FINITE_ERROR
+                    })
+
+            # Label strings -> scan-wide label codes, once per batch
+            predicted_codes = [label_table.code(label) for label in predicted_labels]
+
+            # Ground-truth codes (empty labels count as missing)
+            true_codes = None
+            if replay:
+                true_labels = flows.labels if getattr(flows, 'labels', None) is not None \
+                    else [getattr(flow, 'Label', None) for flow in flows]
+                true_codes = [label_table.code(label) if label else MISSING_LABEL for label in true_labels]
+                metrics.update(true_codes, predicted_codes)
+
+            # Packets per second since the previous arrival, per flow
+            packet_counts = _packet_counts(flows)
+            throughputs, last_flow_time = _throughputs(packet_counts, received_times, last_flow_time, invalid)
+
+            # Emit-stage time per batch, split into building, logging and emitting
+            build_ns = log_ns = emit_ns = 0
+
+            for i in range(len(flows)):
+                if invalid is not None and invalid[i]:
+                    continue
+                start = time.perf_counter_ns()
+                flow = flows[i]
+                flow_received_time = received_times[i]
+                current_flow_num = first_flow_num + i
+
+                try:
+                    # Extract confidence value, handling numpy types
+                    conf_value = confidences[i]
+                    if conf_value is None:
                         confidence = None
+                    else:
+                        # Convert numpy scalar to Python float
+                        try:
+                            confidence = float(conf_value.item()) if hasattr(conf_value, 'item') else float(conf_value)
+                        except (ValueError, AttributeError):
+                            confidence = None
 
-                # Calculate derived evaluation metrics
-                inference_latency = time.time() - flow_received_time
-                flow_latency = time.time() - last_flow_time
-                packet_count = getattr(flow, 'bidirectional_packets', 0)
-                total_packets += packet_count  # Accumulate total packets for throughput
-                throughput = packet_count / flow_latency if flow_latency > 0 else 0.0
-                last_flow_time = time.time()
-                
-                # Get current hardware usage and update running statistics
-                cpu_usage = _get_average_cpu()
-                memory_usage = _get_average_memory()
-                
-                cpu_sum += cpu_usage
-                cpu_max = max(cpu_max, cpu_usage)
-                cpu_count += 1
-                
-                memory_sum += memory_usage
-                memory_max = max(memory_max, memory_usage)
-                memory_count += 1
+                    # Calculate derived evaluation metrics. Latency is measured
+                    # from each flow's own arrival, so time spent waiting for
+                    # the batch to fill is included.
+                    inference_latency = batch_scored_time - flow_received_time
+                    total_packets += packet_counts[i]  # Accumulate total packets for throughput
+                    throughput = throughputs[i]
                 
-                # Track inference latency for average calculation
-                inference_latency_sum += inference_latency
-                inference_latency_count += 1
-
-                # For replay mode, compare with ground truth
-                if mode == "replay":
-                    true_label = flow.Label if hasattr(flow, 'Label') else None
-                    
-                    if true_label:
-                        total_predictions += 1
-                        if predicted_label == true_label:
-                            correct_predictions += 1
-                        
-                        accuracy = (correct_predictions / total_predictions) * 100
-                    else:
-                        accuracy = None
-
-                # Construct comprehensive flow log object
-                flow_log = {
-                    "timestamp": datetime.now().isoformat(),
-                    "flow_number": current_flow_num,
-                    "predicted_label": predicted_label,
-                    "confidence": round(confidence, 4) if confidence is not None else None,
-                    "inference_latency": round(inference_latency, 6),
-                    "throughput": round(throughput, 2),
-                    "cpu_usage_percent": round(cpu_usage, 1),
-                    "memory_usage_percent": round(memory_usage, 1),
-                    "flow_details": {
-                        "src_ip": getattr(flow, 'src_ip', 'N/A'),
-                        "dst_ip": getattr(flow, 'dst_ip', 'N/A'),
-                        "src_port": getattr(flow, 'src_port', 0),
-                        "dst_port": getattr(flow, 'dst_port', 0),
-                        "protocol": getattr(flow, 'protocol', 0),
-                        "bidirectional_packets": packet_count,
-                        "bidirectional_bytes": getattr(flow, 'bidirectional_bytes', 0),
-                        "duration_ms": getattr(flow, 'bidirectional_duration_ms', 0)
-                    }
-                }
+                    # Get current hardware usage and update running statistics
+                    # (latest lock-free snapshot of this process and its children)
+                    snapshot = sampler.snapshot if sampler is not None else _NO_SAMPLE
+                    cpu_usage = snapshot.cpu_percent
+                    memory_usage = snapshot.memory_percent
                 
-                # Add replay-specific fields if in replay mode
-                if mode == "replay":
-                    flow_log["true_label"] = true_label
-                    flow_log["accuracy"] = accuracy
+                    cpu_sum += cpu_usage
+                    cpu_max = max(cpu_max, cpu_usage)
+                    cpu_count += 1
                 
-                # Append to in-memory log list for this scan session
-                flow_logs.append(flow_log)
-
-                # Emit data to client
-                emit_data = {
-                    "flow_number": flow_log["flow_number"],
-                    "predicted_label": flow_log["predicted_label"],
-                    "confidence": flow_log["confidence"],
-                    "inference_latency": flow_log["inference_latency"],
-                    "throughput": flow_log["throughput"],
-                    "cpu_usage_percent": flow_log["cpu_usage_percent"],
-                    "memory_usage_percent": flow_log["memory_usage_percent"]
-                }
+                    memory_sum += memory_usage
+                    memory_max = max(memory_max, memory_usage)
+                    memory_count += 1
                 
-                # Add replay-specific fields for client
-                if mode == "replay":
-                    emit_data["true_label"] = true_label
-                    emit_data["accuracy"] = accuracy
+                    # Track inference latency for average calculation
+                    inference_latency_sum += inference_latency
+                    inference_latency_count += 1
+
+                    # Compact result record; dicts are only built at the outputs
+                    result = FlowResult(
+                        current_flow_num,
+                        time.time(),
+                        predicted_codes[i],
+                        confidence,
+                        inference_latency,
+                        throughput,
+                        cpu_usage,
+                        memory_usage,
+                        flow,
+                        true_codes[i] if replay else MISSING_LABEL
+                    )
                 
-                emit("network_data", emit_data)
+                    built = time.perf_counter_ns()
+                    build_ns += built - start
                 
-                # Periodic logging
-                if current_flow_num % 100 == 0:
-                    if mode == "replay" and total_predictions > 0:
-                        print(f"Processed {current_flow_num} flows, Accuracy: {accuracy:.2f}%")
+                    # Append to the scan log file and the log store
+                    if log_writer is not None:
+                        log_writer.write(result.to_log_dict(label_table, replay))
+                    if store_writer is not None:
+                        store_writer.append(result, label_table)
+                    logged = time.perf_counter_ns()
+                    log_ns += logged - built
+
+                    # Emit data to client
+                    if batch_emitter is not None:
+                        batch_emitter.add(result)
                     else:
-                        print(f"Processed {current_flow_num} flows")
+                        emit("network_data", result.to_emit_dict(label_table, replay))
+                    emit_ns += time.perf_counter_ns() - logged
+                
+                    # Periodic logging
+                    if current_flow_num % 100 == 0:
+                        if replay and metrics.total > 0:
+                            print(f"Processed {current_flow_num} flows, Accuracy: {metrics.correct / metrics.total * 100:.2f}%")
+                        else:
+                            print(f"Processed {current_flow_num} flows")
                         
-            except Exception as e:
-                print(f"Error processing flow #{current_flow_num}: {e}")
-                emit("scan_error", {
-                    "flow_number": current_flow_num,
-                    "error": str(e)
+                except Exception as e:
+                    print(f"Error processing flow #{current_flow_num}: {e}")
+                    emit("scan_error", {
+                        "flow_number": current_flow_num,
+                        "error": str(e)
+                    })
+                    continue
+
+            latencies["result_building"].record(build_ns)
+            latencies["log_writing"].record(log_ns)
+            latencies["emit"].record(emit_ns)
+
+            # Periodic per-stage latency and queue statistics
+            now = time.time()
+            if replay and metrics_interval_ms and (now - last_metrics_time) * 1000 >= metrics_interval_ms:
+                last_metrics_time = now
+                _emit_metrics_snapshot(emit, log_writer, metrics, total_flows)
+            if stats_interval_ms and (now - last_stats_time) * 1000 >= stats_interval_ms:
+                last_stats_time = now
+                emit("pipeline_stats", {
+                    "elapsed_seconds": round(now - scan_start_time, 2),
+                    "total_flows": total_flows,
+                    "latency": latencies.to_dict(),
+                    **pipeline.stats(),
+                    **({"capture": capture.stats()} if capture is not None else {})
                 })
-                continue
     
     except KeyboardInterrupt:
         print("Scan interrupted by user")
+
+    except Exception as e:
+        # Raised by the flow source (e.g. capture failed on every interface)
+        print(f"Scan failed: {e}", flush=True)
+        emit("scan_error", {"error": f"Flow capture failed: {e}"})
     
     finally:
+        pipeline.stop()
+        if capture is not None:
+            capture.close()
+        if pool is not None:
+            pool.close()
+        if batch_emitter is not None:
+            batch_emitter.close()
+
         scan_end_time = time.time()
         scan_duration = scan_end_time - scan_start_time
         
@@ -351,18 +947,46 @@ def _scan_loop(params, emit):
             "total_packets": total_packets,
             "throughput_packets_per_second": round(total_throughput, 2),
             "average_inference_latency_seconds": round(avg_inference_latency, 6),
+            "batching": {
+                "batch_size": batch_size,
+                "batch_timeout_ms": batch_timeout_ms,
+                "workers": workers,
+                "columnar": bool(params.get("columnar", False) or params.get("cache", False)),
+                "cache": bool(params.get("cache", False)),
+                "total_batches": total_batches,
+                "average_batch_size": round(total_flows / total_batches, 2) if total_batches > 0 else 0.0
+            },
             "model_type": params.get("model", "randomForest"),
             "mode": mode,
-            "interface": params.get("interface", "N/A"),
+            "interface": scan_interface,
+            "compiled_scorer": scorer_report,
+            "pipeline": pipeline.stats(),
+            "capture": capture.stats() if capture is not None else None,
+            "latency": latencies.to_dict(),
+            "log": {
+                "files": log_writer.paths if log_writer is not None else [],
+                "compression": log_compression,
+                "records": log_writer.records if log_writer is not None else 0,
+                "store_scan_id": store_writer.scan_id if store_writer is not None else None
+            },
+            "emission": {
+                "wire_format": wire_format,
+                **(batch_emitter.stats() if batch_emitter is not None else {"mode": "flow", "event": "network_data"})
+            },
             "hardware_usage": {
                 "cpu_average_percent": round(cpu_avg, 2),
                 "cpu_max_percent": round(cpu_max, 2),
                 "memory_average_percent": round(memory_avg, 2),
-                "memory_max_percent": round(memory_max, 2)
+                "memory_max_percent": round(memory_max, 2),
+                "process": sampler.summary() if sampler is not None else None
             }
         }
         
         # Add replay-specific metadata
+        correct_predictions = metrics.correct if replay else 0
+        total_predictions = metrics.total if replay else 0
+        if replay:
+            scan_metadata["replay_metrics"] = metrics.snapshot()
         if mode == "replay" and total_predictions > 0:
             final_accuracy = (correct_predictions / total_predictions) * 100
             scan_metadata["replay_accuracy"] = {
@@ -383,34 +1007,20 @@ def _scan_loop(params, emit):
                 "accuracy": final_accuracy
             })
 
-        # Export flow logs to file
-        if flow_logs:
+        # Finalize the log store segment (builds its indexes)
+        if store_writer is not None:
             try:
-                # Create logs directory if it doesn't exist
-                logs_dir = "logs"
-                os.makedirs(logs_dir, exist_ok=True)
-                
-                # Generate timestamped filename
-                timestamp_str = datetime.fromtimestamp(scan_start_time).strftime("%Y%m%d_%H%M%S")
-                log_filename = f"scan_{timestamp_str}.json"
-                log_filepath = os.path.join(logs_dir, log_filename)
-                
-                # Prepare complete log data with metadata
-                log_data = {
-                    "scan_metadata": scan_metadata,
-                    "flows": flow_logs
-                }
-                
-                # Write to file with pretty formatting
-                with open(log_filepath, 'w') as f:
-                    json.dump(log_data, f, indent=2)
-                
-                print(f"Flow logs exported to: {log_filepath}", flush=True)
-                
+                store_writer.close()
             except Exception as e:
-                print(f"Error exporting flow logs: {e}", flush=True)
-        else:
-            print("No flows to export.", flush=True)
+                print(f"Error finalizing log store segment: {e}", flush=True)
+
+        # Finish the scan log with the scan metadata as trailer record
+        if log_writer is not None:
+            try:
+                log_writer.close(scan_metadata)
+                print(f"Flow logs written to: {', '.join(log_writer.paths)} ({log_writer.records} flows)", flush=True)
+            except Exception as e:
+                print(f"Error closing scan log: {e}", flush=True)
 
         emit("scan_status", {
             "state": "stopped",
@@ -418,65 +1028,121 @@ def _scan_loop(params, emit):
         })
 
 
+def _acquire_sampler(interval_ms):
+    """Starts the shared resource sampler for the first active session."""
+    global _sampler, _sampler_users
+    with _sessions_lock:
+        if _sampler is None:
+            _sampler = ResourceSampler(interval_ms=interval_ms).start()
+        _sampler_users += 1
+
+
+def _release_sampler():
+    """Stops the shared resource sampler once no session uses it."""
+    global _sampler, _sampler_users
+    sampler = None
+    with _sessions_lock:
+        _sampler_users -= 1
+        if _sampler_users <= 0:
+            sampler, _sampler, _sampler_users = _sampler, None, 0
+    if sampler is not None:
+        sampler.stop()
+
+
+def _run_session(session):
+    """Session thread entry point; unregisters the session when its scan ends."""
+    try:
+        _scan_loop(session)
+    finally:
+        session.running = False
+        with _sessions_lock:
+            if _sessions.get(session.session_id) is session:
+                del _sessions[session.session_id]
+        _release_sampler()
+        print(f"Scan session {session.session_id} finished.", flush=True)
+
+
 def start_scan_service(params, emit):
     """
-    Starts the IDS scan service in a background thread.
+    Starts a new IDS scan session in a background thread. Several sessions
+    (e.g. two interfaces, or two models on the same replay) can run at once.
+
+    Args:
+        params: start_scan parameters; params["session_id"] selects the
+                session id (a new one is generated if omitted).
+        emit: Socket.IO emitter.
+
+    Returns:
+        The session id, or None if a session with that id is already running.
     """
-    global _scan_thread, _scan_running, _monitor_thread, _cpu_samples, _memory_samples
+    session_id = str(params.get("session_id") or new_session_id())
 
-    if _scan_running:
-        print("Scan already running; ignoring start request.")
-        emit("scan_status", {
-            "state": "already_running",
-            "message": "Scan already active"
-        })
-        return
+    with _sessions_lock:
+        if session_id in _sessions:
+            print(f"Scan session {session_id} already running; ignoring start request.")
+            emit("scan_status", {
+                "session_id": session_id,
+                "state": "already_running",
+                "message": f"Scan session {session_id} already active"
+            })
+            return None
+
+        session = ScanSession(session_id, params, emit)
+        session.running = True
+        _sessions[session_id] = session
+
+    # Resource sampling (process CPU, RSS, threads, context switches, I/O) is
+    # shared by all sessions; its interval is set by the first session
+    try:
+        _acquire_sampler(params.get("sample_interval_ms", DEFAULT_SAMPLE_INTERVAL_MS))
+    except Exception:
+        with _sessions_lock:
+            del _sessions[session_id]
+        raise
 
-    # Clear previous samples
-    _cpu_samples.clear()
-    _memory_samples.clear()
-    
-    # update global var and start threads
-    # passes injected emitter so internal scan loop can also send client info
-    _scan_running = True
-    
-    # Start hardware monitoring thread
-    _monitor_thread = threading.Thread(
-        target=_hardware_monitor_loop,
-        daemon=True
-    )
-    _monitor_thread.start()
-    
     # Start scan thread
-    _scan_thread = threading.Thread(
-        target=_scan_loop,
-        args=(params, emit),
+    session.thread = threading.Thread(
+        target=_run_session,
+        args=(session,),
+        name=f"scan-session-{session_id}",
         daemon=True
     )
-    _scan_thread.start()
+    session.thread.start()
+    return session_id
 
 
-def stop_scan_service():
+def stop_scan_service(session_id=None):
     """
-    Stops the IDS scan service and waits for the scan thread
-    to terminate cleanly.
+    Stops one scan session, or all sessions if session_id is None, and waits
+    for their threads to terminate cleanly.
+
+    Returns:
+        List of the session ids that were stopped.
     """
-    global _scan_running, _scan_thread, _monitor_thread
+    with _sessions_lock:
+        if session_id is None:
+            sessions = list(_sessions.values())
+        else:
+            sessions = [_sessions[session_id]] if session_id in _sessions else []
 
-    if not _scan_running:
-        print("Scan is not running; ignoring stop request.")
-        return
+    if not sessions:
+        print("No matching scan session is running; ignoring stop request.")
+        return []
 
-    print("Stopping scan service...")
-    _scan_running = False
+    print(f"Stopping scan session(s): {', '.join(s.session_id for s in sessions)}")
+    for session in sessions:
+        session.running = False
+
+    # Wait for the scan threads to exit
+    for session in sessions:
+        if session.thread and session.thread.is_alive():
+            session.thread.join(timeout=5)
+
+    print("Scan session(s) fully stopped.")
+    return [session.session_id for session in sessions]
 
-    # Wait for both threads to exit
-    if _scan_thread and _scan_thread.is_alive():
-        _scan_thread.join(timeout=5)
-    
-    if _monitor_thread and _monitor_thread.is_alive():
-        _monitor_thread.join(timeout=5)
 
-    _scan_thread = None
-    _monitor_thread = None
-    print("Scan service fully stopped.")
\ No newline at end of file
+def list_scan_sessions() -> list:
+    """Info dicts of the active scan sessions."""
+    with _sessions_lock:
+        return [session.info() for session in _sessions.values()]
@@ -0,0 +1,148 @@
+# ids-project/backend/services/wire_format.py
+
+# -----------------------------------------------------------------------------
+# Compact binary encoding for per-flow scan results (start_scan
+# wire_format: "binary").
+# Once per scan the client receives a "network_data_schema" event with the
+# column layout and the label dictionary. Each batch of results is then sent
+# as a "network_data_packed" event whose columns are little-endian typed
+# arrays, transported as Socket.IO binary attachments. Labels are sent as
+# uint16 dictionary codes; labels first seen mid-scan (e.g. ground-truth
+# labels in replay mode) are announced in the batch that first uses them.
+# Label-type columns with a fixed value set (the capture interfaces of a
+# multi-interface scan) carry their own dictionary in the schema instead.
+# -----------------------------------------------------------------------------
+
+import numpy as np
+
+SCHEMA_EVENT = "network_data_schema"
+PACKED_EVENT = "network_data_packed"
+WIRE_FORMATS = ("json", "binary")
+WIRE_FORMAT_VERSION = 3
+
+MISSING_LABEL = 0xFFFF  # Label code for a missing label
+
+# Column name -> wire type, in the order columns are described in the schema
+_TYPES = {
+    "uint32": "<u4",
+    "float32": "<f4",
+    "label": "<u2"
+}
+FLOW_COLUMNS = [
+    ("flow_number", "uint32"),
+    ("predicted_label", "label"),
+    ("confidence", "float32"),
+    ("inference_latency", "float32"),
+    ("throughput", "float32"),
+    ("cpu_usage_percent", "float32"),
+    ("memory_usage_percent", "float32")
+]
+REPLAY_COLUMNS = [
+    ("true_label", "label")
+]
+# Source interface of each flow; coded against the schema column's own
+# "labels" list rather than the label dictionary
+INTERFACE_COLUMNS = [
+    ("interface", "label")
+]
+
+# Decimal places of the float columns, as rounded in the JSON network_data
+# payload (FlowResult.to_emit_dict). Values are rounded before packing and
+# the schema announces the precision so clients can undo float32 noise.
+FLOAT_DECIMALS = {
+    "confidence": 4,
+    "inference_latency": 6,
+    "throughput": 2,
+    "cpu_usage_percent": 1,
+    "memory_usage_percent": 1
+}
+
+
+class PackedResultEncoder:
+    """
+    Encodes batches of FlowResult records into packed binary columns.
+
+    Args:
+        label_table: The scan's LabelTable; record label codes are sent as-is
+                     and the table doubles as the wire label dictionary.
+        replay: Include the replay-only column (true_label).
+        interfaces: Capture interfaces of a multi-interface live scan; adds
+                    the interface column when there is more than one.
+    """
+
+    event = PACKED_EVENT
+
+    def __init__(self, label_table, replay=False, interfaces=None):
+        self.columns = FLOW_COLUMNS + (REPLAY_COLUMNS if replay else [])
+        # Columns with a fixed dictionary: name -> values (wire code = index)
+        self.dictionaries = {}
+        if interfaces is not None and len(interfaces) > 1:
+            self.columns = self.columns + INTERFACE_COLUMNS
+            self.dictionaries["interface"] = list(interfaces)
+        self._dictionary_codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in self.dictionaries.items()
+        }
+        self.label_table = label_table
+        self._announced = 0
+        self.bytes_encoded = 0
+
+    def schema(self) -> dict:
+        """Schema event payload; announces the current label dictionary."""
+        labels = list(self.label_table.labels)
+        self._announced = len(labels)
+        return {
+            "version": WIRE_FORMAT_VERSION,
+            "labels": labels,
+            "missing_label": MISSING_LABEL,
+            "columns": [self._describe(name, kind) for name, kind in self.columns]
+        }
+
+    def _describe(self, name, kind) -> dict:
+        column = {"name": name, "type": kind}
+        if name in FLOAT_DECIMALS:
+            column["decimals"] = FLOAT_DECIMALS[name]
+        if name in self.dictionaries:
+            column["labels"] = self.dictionaries[name]
+        return column
+
+    def encode(self, items) -> dict:
+        """
+        Packs a list of FlowResult records.
+        Returns:
+            {"count", "new_labels", "columns": {name: bytes}}. Missing float
+            values are encoded as NaN.
+        """
+        n = len(items)
+        # Every code in items is below the current table size
+        labels = self.label_table.labels
+        num_labels = len(labels)
+        if num_labels > MISSING_LABEL:
+            raise ValueError("Label dictionary is full")
+
+        columns = {}
+        for name, kind in self.columns:
+            if name in self._dictionary_codes:
+                lookup = self._dictionary_codes[name]
+                values = np.fromiter(
+                    (lookup.get(getattr(item, name), MISSING_LABEL) for item in items), dtype=_TYPES[kind], count=n
+                )
+            elif kind == "label":
+                codes = np.fromiter((getattr(item, name) for item in items), dtype=np.int64, count=n)
+                values = np.where(codes < 0, MISSING_LABEL, codes).astype(_TYPES[kind])
+            elif kind == "float32":
+                values = np.array(
+                    [np.nan if getattr(item, name) is None else getattr(item, name) for item in items],
+                    dtype=np.float64
+                )
+                if name in FLOAT_DECIMALS:
+                    values = np.round(values, FLOAT_DECIMALS[name])
+                values = values.astype(_TYPES[kind])
+            else:
+                values = np.fromiter((getattr(item, name) or 0 for item in items), dtype=_TYPES[kind], count=n)
+            columns[name] = values.tobytes()
+            self.bytes_encoded += len(columns[name])
+
+        new_labels = labels[self._announced:num_labels]
+        self._announced = num_labels
+        return {"count": n, "new_labels": new_labels, "columns": columns}
@@ -0,0 +1,77 @@
+# test_block_throughput.py
+# Regression test: columnar replay scores a whole block per arrival, so every
+# row of a block must report the block's throughput (packets per second since
+# the previous block), not 0 for all but the first row, and the per-flow
+# figures must agree with row-by-row replay of the same CSV.
+# Runs the scan service in process on a synthetic CIC-IDS-2017 CSV (no
+# websocket server needed). Run from backend/:
+#   python test_block_throughput.py
+#   python -m pytest test_block_throughput.py
+
+import os
+import tempfile
+
+import numpy as np
+
+from src.services import scan_service
+from test_fixtures import write_synthetic_csv
+
+ROWS = 160
+BLOCK_SIZE = 32
+DELAY_MS = 20          # Replay pacing; large next to the per-row scoring time
+MAX_RATIO = 1.35       # Allowed ratio between the two modes' mean throughput
+
+
+def run_replay(csv_path, options):
+    """Replays csv_path through the scan loop. Returns the network_data events."""
+    events = []
+    params = {
+        "mode": "replay",
+        "csv_path": csv_path,
+        "delay_ms": DELAY_MS,
+        "model": "Random Forest",
+        "log_store": False,
+        "stats_interval_ms": 0,
+        **options
+    }
+    session = scan_service.ScanSession("test", params, lambda event, data=None, **kwargs: events.append((event, data)))
+    session.running = True
+    scan_service._scan_loop(session)
+    return [data for event, data in events if event == "network_data"]
+
+
+def mean_throughput(flows):
+    # The first block's interval starts at scan start-up, not at a previous
+    # arrival; leave it out in both modes
+    return float(np.mean([flow["throughput"] for flow in flows if flow["flow_number"] > BLOCK_SIZE]))
+
+
+def check_throughput(csv_path):
+    rows = run_replay(csv_path, {"batch_size": 1})
+    blocks = run_replay(csv_path, {"columnar": True, "block_size": BLOCK_SIZE})
+    assert len(rows) == len(blocks) == ROWS, (len(rows), len(blocks))
+
+    # Every row of a block carries the block's throughput
+    for start in range(0, ROWS, BLOCK_SIZE):
+        values = {flow["throughput"] for flow in blocks[start:start + BLOCK_SIZE]}
+        assert len(values) == 1 and values.pop() > 0, (start, values)
+
+    row_mean, block_mean = mean_throughput(rows), mean_throughput(blocks)
+    ratio = max(row_mean, block_mean) / min(row_mean, block_mean)
+    assert ratio <= MAX_RATIO, (row_mean, block_mean)
+    return row_mean, block_mean
+
+
+def test_block_throughput():
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "throughput.csv")
+        write_synthetic_csv(csv_path, ROWS, seed=2)
+        check_throughput(csv_path)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "throughput.csv")
+        write_synthetic_csv(csv_path, ROWS, seed=2)
+        row_mean, block_mean = check_throughput(csv_path)
+        print(f"✓ mean throughput: rows {row_mean:.1f} pkt/s, blocks of {BLOCK_SIZE} {block_mean:.1f} pkt/s")
@@ -0,0 +1,40 @@
+# test_fixtures.py
+# Shared fixtures for the in-process test scripts (test_*.py). Kept apart
+# from benchmarks/ so benchmark changes cannot alter what the tests replay.
+
+import numpy as np
+import pandas as pd
+
+from src.ml_pipeline.feature_mapping import DATASET_FEATURES
+
+# Label mix of the synthetic CSV and the factor each class scales the
+# feature distribution by
+LABEL_MIX = {"BENIGN": 0.75, "DDoS": 0.15, "PortScan": 0.10}
+LABEL_SCALE = {"BENIGN": 1.0, "DDoS": 3.0, "PortScan": 0.2}
+
+
+def write_synthetic_csv(path, rows, seed=0):
+    """
+    Writes a small CIC-IDS-2017-shaped CSV: positive, heavy-tailed feature
+    values scaled by label, plus the flow identity columns. Column names carry
+    the leading space the CIC files have.
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.array(list(LABEL_MIX))
+    y = rng.choice(len(labels), size=rows, p=list(LABEL_MIX.values()))
+    scale = np.array([LABEL_SCALE[label] for label in labels])[y]
+
+    features = rng.lognormal(mean=4.0, sigma=2.0, size=(rows, len(DATASET_FEATURES))) * scale[:, None]
+    df = pd.DataFrame(np.round(features, 3), columns=DATASET_FEATURES)
+    df["Destination Port"] = rng.choice([22, 53, 80, 443, 8080], size=rows)
+
+    df.insert(0, "Flow ID", [f"test-{i}" for i in range(rows)])
+    df.insert(1, "Source IP", [f"10.0.{(i >> 8) & 255}.{i & 255}" for i in range(rows)])
+    df.insert(2, "Source Port", rng.integers(1024, 65535, size=rows))
+    df.insert(3, "Destination IP", "192.168.10.50")
+    df.insert(4, "Protocol", 6)
+    df.insert(5, "Timestamp", "7/7/2017 3:30")
+    df["Label"] = labels[y]
+
+    df.columns = [name if name == "Flow ID" else f" {name}" for name in df.columns]
+    df.to_csv(path, index=False)
@@ -0,0 +1,88 @@
+# test_non_finite_rows.py
+# Regression test: CSV rows with NaN/Infinity features inside a micro-batch
+# must only fail those flows (one scan_error each), not their whole batch.
+# Runs the scan service in process on a synthetic CIC-IDS-2017 CSV (no
+# websocket server needed). Run from backend/:
+#   python test_non_finite_rows.py
+#   python -m pytest test_non_finite_rows.py
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.services import scan_service
+from test_fixtures import write_synthetic_csv
+
+ROWS = 300
+BAD_ROWS = {10: ("Flow Bytes/s", np.inf), 70: ("Flow Packets/s", np.nan), 75: ("Flow Bytes/s", -np.inf)}
+
+# Scan configurations that score several rows per call
+CONFIGS = [
+    {"batch_size": 1},
+    {"batch_size": 64},
+    {"batch_size": 64, "compiled": True},
+    {"batch_size": 64, "workers": 1},
+    {"columnar": True},
+    {"columnar": True, "block_size": 64, "compiled": True},
+    {"cache": True},
+]
+
+
+def make_csv(directory):
+    """Synthetic CSV with the BAD_ROWS features replaced by NaN/Infinity."""
+    path = os.path.join(directory, "non_finite.csv")
+    write_synthetic_csv(path, ROWS, seed=1)
+    df = pd.read_csv(path)
+    for row, (feature, value) in BAD_ROWS.items():
+        df.loc[row, f" {feature}"] = value
+    df.to_csv(path, index=False)
+    return path
+
+
+def run_replay(csv_path, options):
+    """Replays csv_path through the scan loop. Returns the emitted events."""
+    events = []
+    params = {
+        "mode": "replay",
+        "csv_path": csv_path,
+        "delay_ms": 0,
+        "model": "Random Forest",
+        "log_store": False,
+        "stats_interval_ms": 0,
+        **options
+    }
+    session = scan_service.ScanSession("test", params, lambda event, data=None, **kwargs: events.append((event, data)))
+    session.running = True
+    scan_service._scan_loop(session)
+    return events
+
+
+def check_config(csv_path, options):
+    events = run_replay(csv_path, options)
+    errors = [data for event, data in events if event == "scan_error"]
+    flows = [data for event, data in events if event == "network_data"]
+    summary = next(data for event, data in events if event == "scan_summary")
+
+    bad_flow_numbers = sorted(row + 1 for row in BAD_ROWS)
+    assert sorted(error["flow_number"] for error in errors) == bad_flow_numbers, (options, errors[:5])
+    assert len(flows) == ROWS - len(BAD_ROWS), (options, len(flows))
+    assert summary["replay_metrics"]["total"] == ROWS - len(BAD_ROWS), (options, summary["replay_metrics"]["total"])
+    return summary
+
+
+def test_non_finite_rows():
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = make_csv(directory)
+        for options in CONFIGS:
+            check_config(csv_path, options)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = make_csv(directory)
+        for options in CONFIGS:
+            summary = check_config(csv_path, options)
+            print(f"✓ {options}: {len(BAD_ROWS)} errors, {summary['replay_metrics']['total']} flows scored")
+    print("All configurations passed.")
@@ -12,11 +12,18 @@ from flask import Flask
 from flask_socketio import SocketIO, emit
 
 from src.utils.interface_helper import get_network_interfaces
+from src.ml_pipeline.flow_capture import capture_config
 
 from src.services.scan_service import (
     start_scan_service,
-    stop_scan_service
+    stop_scan_service,
+    list_scan_sessions,
+    new_session_id,
+    valid_session_id,
+    EMIT_MODES
 )
+from src.services.wire_format import WIRE_FORMATS
+from src.services.log_store import log_store
 
 app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins="*")
@@ -39,21 +46,69 @@ def handle_connect():
 def handle_start_scan(data):
     print("Received start_scan request:", data)
 
+    # every scan runs as its own session; the client may pick the session id
+    # (e.g. to correlate events), otherwise a new one is generated
+    session_id = data.get("session_id") or new_session_id()
+    if not valid_session_id(session_id):
+        emit("scan_error", {"error": f"Invalid session_id: {session_id!r} (letters, digits, '_' and '-' only)"})
+        return
+    data = {**data, "session_id": session_id}
+
     # validate required parameters based on mode
     mode = data.get("mode", "live")
 
     if mode == "live":
-        if "interface" not in data:
-            emit("scan_error", {"error": "Missing 'interface' parameter for live mode"})
+        # "interface": one interface; "interfaces": a list (or "all") captured
+        # in parallel and merged into one interface-tagged flow stream
+        if "interface" not in data and not data.get("interfaces"):
+            emit("scan_error", {"session_id": session_id, "error": "Missing 'interface' parameter for live mode"})
             return
-    elif mode == "replay":
+    elif mode in ("replay", "batch"):
         if "csv_path" not in data:
-            emit("scan_error", {"error": "Missing 'csv_path' parameter for replay mode"})
+            emit("scan_error", {"session_id": session_id, "error": f"Missing 'csv_path' parameter for {mode} mode"})
             return
+        # output locations are a batch_score.py CLI option only; socket
+        # clients can merely opt in to a predictions CSV under logs/
+        for key in ("output_dir", "predictions_path"):
+            if key in data:
+                emit("scan_error", {"session_id": session_id, "error": f"'{key}' is not accepted over the socket"})
+                return
     else:
-        emit("scan_error", {"error": f"Invalid mode: {mode}"})
+        emit("scan_error", {"session_id": session_id, "error": f"Invalid mode: {mode}"})
+        return
+
+    # validate result emission options ("flow" = one network_data event per
+    # flow, "batch" = coalesced network_data_batch events; wire_format
+    # "binary" = packed network_data_packed batches)
+    emit_mode = data.get("emit_mode", "flow")
+    if emit_mode not in EMIT_MODES:
+        emit("scan_error", {"session_id": session_id, "error": f"Invalid emit_mode: {emit_mode}"})
+        return
+    wire_format = data.get("wire_format", "json")
+    if wire_format not in WIRE_FORMATS:
+        emit("scan_error", {"session_id": session_id, "error": f"Invalid wire_format: {wire_format}"})
+        return
+    for key in ("emit_rate_hz", "emit_max_batch", "sample_interval_ms", "chunk_rows", "capture_queue_size"):
+        value = data.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0):
+            emit("scan_error", {"session_id": session_id, "error": f"Invalid '{key}' parameter: {value}"})
+            return
+
+    drop_when_full = data.get("capture_drop_when_full")
+    if drop_when_full is not None and not isinstance(drop_when_full, bool):
+        emit("scan_error", {"session_id": session_id, "error": f"Invalid 'capture_drop_when_full' parameter: {drop_when_full}"})
         return
 
+    # validate NFStreamer settings (capture_preset "desktop", "sensor" or
+    # "high-rate", plus overrides such as idle_timeout, n_meters, bpf_filter);
+    # they are forwarded to the scan service with the rest of the request
+    if mode == "live":
+        try:
+            capture_config(data)
+        except ValueError as e:
+            emit("scan_error", {"session_id": session_id, "error": f"Invalid capture settings: {e}"})
+            return
+
     # execute scan_service.py/start_scan_service() as background task
     socketio.start_background_task(
         target=start_scan_service,  # name of function
@@ -63,22 +118,53 @@ def handle_start_scan(data):
 
     emit("service_status", {
         "service": "scan",
-        "status": "started"
+        "status": "started",
+        "session_id": session_id
     })
 
 
 @socketio.on("stop_scan")
-def handle_stop_scan():
-    print("Received stop_scan request")
+def handle_stop_scan(data=None):
+    print("Received stop_scan request:", data)
 
-    # execute scan_service.py/stop_scan_service()
-    stop_scan_service()
+    # execute scan_service.py/stop_scan_service(); without a session_id all
+    # running sessions are stopped
+    session_id = (data or {}).get("session_id")
+    stopped = stop_scan_service(session_id)
 
     emit("service_status", {
         "service": "scan",
-        "status": "stopped"
+        "status": "stopped",
+        "session_id": session_id,
+        "session_ids": stopped
     })
 
+@socketio.on("list_scan_sessions")
+def handle_list_scan_sessions():
+    print("Received list_scan_sessions request")
+    emit("scan_session_list", list_scan_sessions())
+
+@socketio.on("list_scan_logs")
+def handle_list_scan_logs():
+    print("Received list_scan_logs request")
+    emit("scan_log_list", log_store.list_scans())
+
+@socketio.on("query_logs")
+def handle_query_logs(data):
+    print("Received query_logs request:", data)
+
+    # filters: scan_ids, start_time, end_time, labels, src_ip, dst_ip, ip;
+    # pagination: offset, limit. request_id is echoed back for correlation.
+    data = data or {}
+    try:
+        result = log_store.query(data)
+    except ValueError as e:
+        emit("log_query_error", {"request_id": data.get("request_id"), "error": str(e)})
+        return
+
+    result["request_id"] = data.get("request_id")
+    emit("log_query_result", result)
+
 @socketio.on("request_interfaces")
 def handle_interface_request():
     print("Frontend requested interface list...")
@@ -77,11 +77,9 @@ function onScanSummary(summary) {
 }
 
 
-function onNetworkData(data) {
-console.log("Network data received:", data);
-
-// Update network metrics state with new data
-setNetworkMetrics({
+// Convert one flow result from the backend into UI records
+function toNetworkMetrics(data) {
+return {
     flowNumber: data.flow_number || 0,
     predictedLabel: data.predicted_label || 'N/A',
     inferenceLatency: data.inference_latency || 0,
@@ -89,10 +87,11 @@ setNetworkMetrics({
     cpuUsage: data.cpu_usage_percent || 0,
     memoryUsage: data.memory_usage_percent || 0,
     isScanning: true
-});
+};
+}
 
-// Append a data point to the sliding window for the live graph
-const newGraphPoint = {
+function toGraphPoint(data) {
+return {
     time: new Date().toLocaleTimeString(),
     inferenceLatency: data.inference_latency ? parseFloat((data.inference_latency * 1000).toFixed(3)) : 0,
     throughput: data.throughput ? parseFloat(data.throughput.toFixed(2)) : 0,
@@ -100,10 +99,10 @@ const newGraphPoint = {
     memoryUsage: data.memory_usage_percent || 0,
     flowNumber: data.flow_number || 0,
 };
-setTrafficHistory(prev => [...prev, newGraphPoint].slice(-MAX_GRAPH_POINTS));
+}
 
-// Create a new log entry with timestamp and formatted data
-const newLogEntry = {
+function toLogEntry(data) {
+return {
     id: data.flow_number, // Use flow_number as unique ID
     timestamp: new Date().toLocaleTimeString(),
     flowNumber: data.flow_number,
@@ -114,28 +113,64 @@ const newLogEntry = {
     cpu: data.cpu_usage_percent ? `${data.cpu_usage_percent}%` : 'N/A',
     memory: data.memory_usage_percent ? `${data.memory_usage_percent}%` : 'N/A'
 };
+}
+
+function isAlert(data) {
+return data.predicted_label && data.predicted_label.toLowerCase() !== 'benign';
+}
 
-// Add new entry with deduplication - only add if flow_number doesn't already exist
-setLogs(prevLogs => {
-    // Check if this flow_number already exists in the logs
-    const exists = prevLogs.some(log => log.flowNumber === data.flow_number);
-    if (exists) {
-    console.warn(`Duplicate flow #${data.flow_number} ignored`);
-    return prevLogs; // Don't add duplicate
+// Prepend entries (newest first), skipping flow numbers already listed
+function prependEntries(prevEntries, newEntries, maxEntries) {
+const seen = new Set(prevEntries.map(entry => entry.flowNumber));
+const added = [];
+for (let i = newEntries.length - 1; i >= 0; i--) {
+    if (seen.has(newEntries[i].flowNumber)) {
+    console.warn(`Duplicate flow #${newEntries[i].flowNumber} ignored`);
+    continue;
     }
-    return [newLogEntry, ...prevLogs].slice(0, MAX_LOG_ENTRIES);
-});
+    seen.add(newEntries[i].flowNumber);
+    added.push(newEntries[i]);
+}
+if (added.length === 0) return prevEntries;
+return [...added, ...prevEntries].slice(0, maxEntries);
+}
+
+function onNetworkData(data) {
+console.log("Network data received:", data);
+
+// Update network metrics state with new data
+setNetworkMetrics(toNetworkMetrics(data));
+
+// Append a data point to the sliding window for the live graph
+setTrafficHistory(prev => [...prev, toGraphPoint(data)].slice(-MAX_GRAPH_POINTS));
+
+// Add new log entry with deduplication - only add if flow_number doesn't already exist
+const newLogEntry = toLogEntry(data);
+setLogs(prevLogs => prependEntries(prevLogs, [newLogEntry], MAX_LOG_ENTRIES));
 
 // If the flow is non-benign, also add it to alerts
-if (data.predicted_label && data.predicted_label.toLowerCase() !== 'benign') {
-    setAlerts(prevAlerts => {
-    // Check if this flow_number already exists in alerts
-    const exists = prevAlerts.some(alert => alert.flowNumber === data.flow_number);
-    if (exists) {
-        return prevAlerts; // Don't add duplicate
-    }
-    return [newLogEntry, ...prevAlerts].slice(0, MAX_ALERT_ENTRIES);
-    });
+if (isAlert(data)) {
+    setAlerts(prevAlerts => prependEntries(prevAlerts, [newLogEntry], MAX_ALERT_ENTRIES));
+}
+}
+
+// Handles a coalesced network_data_batch event with one state update per
+// panel instead of one per flow
+function onNetworkDataBatch(batch) {
+const flows = batch.flows || [];
+if (flows.length === 0) return;
+
+setNetworkMetrics(toNetworkMetrics(flows[flows.length - 1]));
+
+const graphPoints = flows.slice(-MAX_GRAPH_POINTS).map(toGraphPoint);
+setTrafficHistory(prev => [...prev, ...graphPoints].slice(-MAX_GRAPH_POINTS));
+
+const logEntries = flows.slice(-MAX_LOG_ENTRIES).map(toLogEntry);
+setLogs(prevLogs => prependEntries(prevLogs, logEntries, MAX_LOG_ENTRIES));
+
+const alertEntries = flows.filter(isAlert).slice(-MAX_ALERT_ENTRIES).map(toLogEntry);
+if (alertEntries.length > 0) {
+    setAlerts(prevAlerts => prependEntries(prevAlerts, alertEntries, MAX_ALERT_ENTRIES));
 }
 }
 
@@ -143,7 +178,7 @@ if (data.predicted_label && data.predicted_label.toLowerCase() !== 'benign') {
 // so websocket client is initialized only once on mount.
 useEffect(() => {
 // 1. Initialize WebSocket
-const cleanup = initWebSocket(onAlert, onServiceStatus, onScanStatus, onNetworkData, onScanSummary);
+const cleanup = initWebSocket(onAlert, onServiceStatus, onScanStatus, onNetworkData, onScanSummary, onNetworkDataBatch);
 
 //2. Load Settings from Electron Backend on Startup
 if (window.electronAPI) {
@@ -218,7 +253,9 @@ return () => {
       interface: targetInterface, // Send the GUID or null for auto-detection
       captureInterface: appSettings.captureInterface,
       mode: "live",
-      model: currentActiveModel
+      model: currentActiveModel,
+      emit_mode: "batch", // Coalesced result batches (10 Hz by default)
+      wire_format: "binary" // Packed typed columns instead of per-flow JSON dicts
     });
   };
   
@@ -3,7 +3,54 @@ import { io } from 'socket.io-client';
 // Renderer-local socket client to avoid importing from outside the renderer root
 export const socket = io("http://127.0.0.1:5000");
 
-export function initWebSocket(onAlert, onServiceStatus, onScanStatus, onNetworkData, onScanSummary) {
+// Typed array constructors for the packed (wire_format: "binary") columns
+const PACKED_TYPES = {
+    uint32: Uint32Array,
+    float32: Float32Array,
+    label: Uint16Array
+};
+
+function toArrayBuffer(data) {
+    // Browsers deliver binary attachments as ArrayBuffer, Node as Buffer
+    if (ArrayBuffer.isView(data)) {
+        return data.buffer.slice(data.byteOffset, data.byteOffset + data.byteLength);
+    }
+    return data;
+}
+
+// Decodes a network_data_packed batch into network_data-style flow objects
+export function decodePackedBatch(schema, labels, packet) {
+    const columns = schema.columns.map((column) => ({
+        name: column.name,
+        type: column.type,
+        // float32 values are rounded back to the precision of the JSON payload
+        // (e.g. 12.3 instead of 12.300000190734863)
+        scale: column.decimals !== undefined ? 10 ** column.decimals : null,
+        // label columns with a fixed value set (e.g. the capture interface)
+        // carry their own dictionary; the rest use the session's labels
+        labels: column.labels || labels,
+        values: new PACKED_TYPES[column.type](toArrayBuffer(packet.columns[column.name]))
+    }));
+
+    const flows = new Array(packet.count);
+    for (let i = 0; i < packet.count; i++) {
+        const flow = {};
+        for (const column of columns) {
+            const value = column.values[i];
+            if (column.type === "label") {
+                flow[column.name] = value === schema.missing_label ? null : column.labels[value];
+            } else if (Number.isNaN(value)) {
+                flow[column.name] = null;
+            } else {
+                flow[column.name] = column.scale ? Math.round(value * column.scale) / column.scale : value;
+            }
+        }
+        flows[i] = flow;
+    }
+    return flows;
+}
+
+export function initWebSocket(onAlert, onServiceStatus, onScanStatus, onNetworkData, onScanSummary, onNetworkDataBatch) {
     if (!socket) return;
 
     socket.on("connect", () => {
@@ -30,7 +77,40 @@ export function initWebSocket(onAlert, onServiceStatus, onScanStatus, onNetworkD
         onNetworkData(data);
     });
 
+    // Coalesced results (start_scan emit_mode: "batch"); falls back to
+    // per-flow handling if no batch handler is registered
+    socket.on("network_data_batch", (batch) => {
+        if (onNetworkDataBatch) {
+            onNetworkDataBatch(batch);
+        } else {
+            (batch.flows || []).forEach(onNetworkData);
+        }
+    });
+
+    // Packed results: the schema and label dictionary arrive once per scan
+    // session, new labels are appended by the batches that introduce them.
+    // Concurrent sessions each have their own dictionary, keyed by session_id.
+    const packedSessions = new Map();   // session_id -> { schema, labels }
+
+    socket.on("network_data_schema", (schema) => {
+        packedSessions.set(schema.session_id, { schema, labels: [...schema.labels] });
+    });
+
+    socket.on("network_data_packed", (packet) => {
+        const session = packedSessions.get(packet.session_id);
+        if (!session) return;
+        session.labels.push(...(packet.new_labels || []));
+        const flows = decodePackedBatch(session.schema, session.labels, packet);
+        if (onNetworkDataBatch) {
+            onNetworkDataBatch({ session_id: packet.session_id, count: flows.length, flows });
+        } else {
+            flows.forEach(onNetworkData);
+        }
+    });
+
     socket.on("scan_summary", (summary) => {
+    // the session's packed batches have all been sent by now
+    packedSessions.delete(summary.session_id);
     if (onScanSummary) {
         onScanSummary(summary);
     }
@@ -42,6 +122,9 @@ return () => {
     socket.off("service_status");
     socket.off("scan_status");
     socket.off("network_data");
+    socket.off("network_data_batch");
+    socket.off("network_data_schema");
+    socket.off("network_data_packed");
     socket.off("scan_summary");
     };
 }
@@ -50,6 +133,19 @@ export function startScan(payload) {
     if (socket) socket.emit("start_scan", payload);
 }
 
-export function stopScan() {
-    if (socket) socket.emit("stop_scan");
+// Stops one scan session, or every running session if sessionId is omitted
+export function stopScan(sessionId) {
+    if (socket) socket.emit("stop_scan", sessionId ? { session_id: sessionId } : {});
+}
+
+// Stored scan logs: results arrive as "scan_log_list" / "log_query_result"
+// ("log_query_error" on invalid filters)
+export function listScanLogs() {
+    if (socket) socket.emit("list_scan_logs");
+}
+
+export function queryLogs(query) {
+    // query: { scan_ids, start_time, end_time, labels, src_ip, dst_ip, ip,
+    //          offset, limit, request_id }
+    if (socket) socket.emit("query_logs", query);
 }